@@ -0,0 +1,107 @@
+"""Compare single-call and sharded fact checking against a local fake LLM.
+
+The fake model's latency grows with the number of claims in the prompt
+(``base + per_claim * claims``), mimicking output-token-bound generation.
+
+    python -m benchmarks.fact_check_sharding [--output results.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from typing import List
+from unittest.mock import patch
+
+from geopoliticai.fact_check import fact_checker
+from geopoliticai.models import Claim, Source
+
+
+def _fake_llm_json(base: float, per_claim: float):
+    def fake(system: str, user: str, temperature: float = 0.2) -> dict:
+        claims = [
+            line[2:].split(" (Sources:", 1)[0]
+            for line in user.split("Claims:", 1)[1].split("Preferred", 1)[0].splitlines()
+            if line.startswith("- ")
+        ]
+        time.sleep(base + per_claim * len(claims))
+        return {
+            "results": [
+                {"claim_text": text, "verdict": "TRUE", "rationale": "ok", "source_ids": []}
+                for text in claims
+            ]
+        }
+
+    return fake
+
+
+def _state(claim_count: int) -> dict:
+    claims = [
+        Claim(text=f"Claim {i} about topic {i % 7}.", source_ids=["S1"])
+        for i in range(claim_count)
+    ]
+    sources: List[Source] = [
+        Source(id=f"S{i}", title=f"Topic {i}", url=f"https://example.com/{i}", notes="n")
+        for i in range(1, 13)
+    ]
+    quarter = max(1, claim_count // 4)
+    return {
+        "query": "Benchmark",
+        "left_claims": claims[:quarter],
+        "centrist_claims": claims[quarter : 2 * quarter],
+        "right_claims": claims[2 * quarter : 3 * quarter],
+        "people_claims": claims[3 * quarter :],
+        "fact_sources": sources,
+    }
+
+
+def run(
+    claim_counts: List[int], shard_size: int, base: float, per_claim: float
+) -> List[dict]:
+    results = []
+    fake = _fake_llm_json(base, per_claim)
+    for claim_count in claim_counts:
+        state = _state(claim_count)
+        row = {"claims": claim_count}
+        for mode, size in (("single", 0), ("sharded", shard_size)):
+            os.environ["FACT_CHECK_SHARD_SIZE"] = str(size)
+            with patch("geopoliticai.fact_check.llm_json", fake):
+                started = time.perf_counter()
+                output = fact_checker(state)
+                row[f"{mode}_seconds"] = round(time.perf_counter() - started, 4)
+            assert len(output["fact_checks"]) == claim_count
+        row["speedup"] = round(row["single_seconds"] / row["sharded_seconds"], 2)
+        results.append(row)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--claims", type=int, nargs="+", default=[4, 20, 100])
+    parser.add_argument("--shard-size", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--base-latency", type=float, default=0.05)
+    parser.add_argument("--per-claim-latency", type=float, default=0.01)
+    parser.add_argument("--output", help="Write JSON results to this file.")
+    args = parser.parse_args()
+
+    os.environ["FACT_CHECK_MAX_WORKERS"] = str(args.workers)
+    results = {
+        "benchmark": "fact_check_sharding",
+        "shard_size": args.shard_size,
+        "workers": args.workers,
+        "results": run(
+            args.claims, args.shard_size, args.base_latency, args.per_claim_latency
+        ),
+    }
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
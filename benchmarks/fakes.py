@@ -0,0 +1,283 @@
+"""Local stand-ins for the OpenAI and Tavily clients used by the benchmarks.
+
+The fakes sit at the client level (``get_openai_client``,
+``get_async_openai_client``, ``get_tavily_client`` and ``get_async_tavily_client``)
+so retries, rate limiting, caching and instrumentation run exactly as they
+do in production. Latency, failures and token counts are drawn from a
+random generator seeded per prompt, so a run is reproducible regardless of
+how concurrent calls interleave.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Dict, Iterator, List
+from unittest.mock import patch
+
+import httpx
+import openai
+
+DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+
+@dataclass
+class LatencyModel:
+    """Per-call latency in seconds: a sampled base plus a per-output-token cost."""
+
+    distribution: str = "lognormal"
+    median: float = 0.2
+    spread: float = 0.5
+    per_token: float = 0.0
+
+    def __post_init__(self) -> None:
+        if self.distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {self.distribution}")
+
+    def sample(self, rng: random.Random, output_tokens: int = 0) -> float:
+        if self.distribution == "fixed":
+            base = self.median
+        elif self.distribution == "uniform":
+            base = rng.uniform(
+                max(0.0, self.median * (1 - self.spread)), self.median * (1 + self.spread)
+            )
+        elif self.distribution == "exponential":
+            base = rng.expovariate(1 / self.median) if self.median > 0 else 0.0
+        else:
+            base = rng.lognormvariate(0, self.spread) * self.median
+        return base + self.per_token * output_tokens
+
+
+@dataclass
+class BackendProfile:
+    """Behaviour of one fake upstream."""
+
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    error_rate: float = 0.0
+    completion_tokens: int = 300
+
+
+class _Sampler:
+    """Deterministic per-prompt random streams, safe across threads."""
+
+    def __init__(self, seed: int) -> None:
+        self.seed = seed
+        self._lock = threading.Lock()
+        self._calls: Dict[str, int] = {}
+        self.total_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def rng(self, prompt: str) -> random.Random:
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        with self._lock:
+            attempt = self._calls.get(digest, 0)
+            self._calls[digest] = attempt + 1
+            self.total_calls += 1
+        return random.Random(f"{self.seed}:{digest}:{attempt}")
+
+    def add_tokens(self, prompt_tokens: int, completion_tokens: int) -> None:
+        with self._lock:
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+
+def _claim_lines(user: str) -> List[str]:
+    block = user.split("Claims:", 1)[1].split("Preferred fact-check references", 1)[0]
+    return [
+        line.strip()[2:].split(" (Sources:", 1)[0].strip()
+        for line in block.splitlines()
+        if line.strip().startswith("- ")
+    ]
+
+
+def _source_ids(user: str) -> List[str]:
+    return re.findall(r"^(S\w+): ", user, flags=re.MULTILINE) or ["S1"]
+
+
+def _lens_blocks(user: str) -> Dict[str, str]:
+    """Each lens of a multi-lens claims prompt mapped to its part of the prompt."""
+    blocks = re.split(r"^Lens: (\S+)$", user.split("\nTask:", 1)[0], flags=re.MULTILINE)
+    return dict(zip(blocks[1::2], blocks[2::2]))
+
+
+def _claims(source_ids: List[str], rng: random.Random) -> List[dict]:
+    return [
+        {
+            "text": f"Simulated claim {index} ({rng.random():.6f}).",
+            "source_ids": [source_ids[index % len(source_ids)]],
+        }
+        for index in range(rng.randint(3, 5))
+    ]
+
+
+def fake_completion(user: str, rng: random.Random) -> dict:
+    """Return a well-formed answer for whichever pipeline prompt ``user`` is."""
+    source_ids = _source_ids(user)
+    if "Task: Fact-check each claim" in user:
+        verdicts = ("TRUE", "PARTIALLY TRUE", "MISLEADING", "FALSE")
+        return {
+            "results": [
+                {
+                    "claim_text": text,
+                    "verdict": rng.choice(verdicts),
+                    "rationale": "Simulated rationale grounded in the provided sources.",
+                    "source_ids": source_ids[:1],
+                }
+                for text in _claim_lines(user)
+            ]
+        }
+    if "Task: Provide a neutral synthesis" in user:
+        return {"synthesis": "Simulated synthesis of consensus and disputes."}
+    if "Task: For each lens above" in user:
+        return {
+            "claims_by_lens": {
+                lens: _claims(_source_ids(block), rng)
+                for lens, block in _lens_blocks(user).items()
+            }
+        }
+    if "analytically cautious claims" in user:
+        return {"claims": _claims(source_ids, rng)}
+    return {}
+
+
+def _status_error(status: int) -> openai.APIStatusError:
+    request = httpx.Request("POST", "https://fake-openai.local/v1/chat/completions")
+    response = httpx.Response(status, headers={"retry-after": "0"}, request=request)
+    if status == 429:
+        return openai.RateLimitError("Simulated rate limit", response=response, body=None)
+    return openai.InternalServerError("Simulated server error", response=response, body=None)
+
+
+class FakeOpenAI:
+    """Chat-completions-only client; ``responses.create`` is rejected like old SDKs."""
+
+    def __init__(self, profile: BackendProfile, sampler: _Sampler) -> None:
+        self.profile = profile
+        self.sampler = sampler
+        self.responses = SimpleNamespace(create=self._reject)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    @staticmethod
+    def _reject(**kwargs: object) -> None:
+        raise TypeError("create() got an unexpected keyword argument 'response_format'")
+
+    def _plan(self, kwargs: dict) -> tuple[float, object]:
+        user = kwargs["messages"][-1]["content"]
+        rng = self.sampler.rng(user)
+        # A multi-lens answer carries one claim list per lens.
+        answers = max(1, len(_lens_blocks(user)))
+        completion_tokens = answers * max(
+            1, int(rng.gauss(self.profile.completion_tokens, 50))
+        )
+        delay = self.profile.latency.sample(rng, completion_tokens)
+        if rng.random() < self.profile.error_rate:
+            return delay, _status_error(rng.choice((429, 500, 503)))
+        prompt_tokens = sum(len(m["content"]) for m in kwargs["messages"]) // 4
+        self.sampler.add_tokens(prompt_tokens, completion_tokens)
+        message = SimpleNamespace(content=json.dumps(fake_completion(user, rng)))
+        usage = SimpleNamespace(
+            prompt_tokens=prompt_tokens, completion_tokens=completion_tokens
+        )
+        return delay, SimpleNamespace(
+            choices=[SimpleNamespace(message=message)], usage=usage
+        )
+
+    def _create(self, **kwargs: object) -> object:
+        delay, outcome = self._plan(kwargs)
+        time.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+class FakeAsyncOpenAI(FakeOpenAI):
+    @staticmethod
+    async def _reject(**kwargs: object) -> None:
+        raise TypeError("create() got an unexpected keyword argument 'response_format'")
+
+    async def _create(self, **kwargs: object) -> object:
+        delay, outcome = self._plan(kwargs)
+        await asyncio.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+class FakeTavily:
+    """Search client returning deterministic results for each query."""
+
+    def __init__(self, profile: BackendProfile, sampler: _Sampler, **_: object) -> None:
+        self.profile = profile
+        self.sampler = sampler
+        self.api_key = "fake"
+
+    def _plan(self, query: str, max_results: int) -> tuple[float, object]:
+        rng = self.sampler.rng(query)
+        delay = self.profile.latency.sample(rng)
+        if rng.random() < self.profile.error_rate:
+            return delay, ConnectionError("Simulated Tavily failure")
+        results = [
+            {
+                "title": f"Result {index} for {query[:40]}",
+                "url": f"https://news.example/{rng.randrange(10**8)}",
+                "content": f"Simulated article body {index} " * 8,
+            }
+            for index in range(1, max_results + 1)
+        ]
+        return delay, {"results": results}
+
+    def search(self, query: str, max_results: int = 5, **_: object) -> dict:
+        delay, outcome = self._plan(query, max_results)
+        time.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+class FakeAsyncTavily(FakeTavily):
+    async def search(self, query: str, max_results: int = 5, **_: object) -> dict:
+        delay, outcome = self._plan(query, max_results)
+        await asyncio.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@dataclass
+class FakeBackends:
+    llm: BackendProfile = field(default_factory=BackendProfile)
+    search: BackendProfile = field(
+        default_factory=lambda: BackendProfile(LatencyModel(median=0.3, spread=0.4))
+    )
+    seed: int = 0
+    llm_sampler: _Sampler = field(init=False)
+    search_sampler: _Sampler = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.llm_sampler = _Sampler(self.seed)
+        self.search_sampler = _Sampler(self.seed)
+
+    @contextmanager
+    def installed(self) -> Iterator["FakeBackends"]:
+        """Route every OpenAI and Tavily call in the process to the fakes."""
+        sync_llm = FakeOpenAI(self.llm, self.llm_sampler)
+        async_llm = FakeAsyncOpenAI(self.llm, self.llm_sampler)
+        sync_search = FakeTavily(self.search, self.search_sampler)
+        with patch("geopoliticai.llm.get_openai_client", lambda: sync_llm), patch(
+            "geopoliticai.llm.get_async_openai_client", lambda: async_llm
+        ), patch(
+            "geopoliticai.search.get_tavily_client", lambda api_key: sync_search
+        ), patch(
+            "geopoliticai.search.get_async_tavily_client",
+            lambda api_key: FakeAsyncTavily(self.search, self.search_sampler),
+        ):
+            yield self
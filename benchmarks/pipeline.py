@@ -0,0 +1,383 @@
+"""End-to-end pipeline benchmarks against simulated OpenAI and Tavily backends.
+
+Scenarios:
+
+* ``cli``   - sequential ``geopoliticai.cli.main`` invocations (sync graph).
+* ``api``   - ``POST /run_pipeline`` from 1, 10 and 100 concurrent clients.
+* ``batch`` - ``run_pipeline_batch`` over a list of queries.
+
+Each scenario runs in a fresh process so peak RSS is attributable to it.
+Results (p50/p95/p99 latency, throughput, errors, peak RSS, LLM calls and
+tokens) are printed as JSON and can be written to a file to compare commits:
+
+    python -m benchmarks.pipeline --output before.json
+    python -m benchmarks.pipeline --scenarios api --clients 1 10 100 \\
+        --llm-latency lognormal:0.4:0.5 --llm-error-rate 0.02
+
+``--expert-modes per_lens multi_lens`` runs every scenario in both expert
+modes and adds an ``expert_modes`` section with the reduction in LLM round
+trips and prompt tokens per request.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from typing import Dict, List, Optional, Sequence
+
+from benchmarks.fakes import BackendProfile, FakeBackends, LatencyModel
+
+SCENARIOS = ("cli", "api", "batch")
+
+# Benchmarks measure the pipeline itself: caches and client-side rate limits
+# are off unless --cache / --rate-limits ask for them.
+_ISOLATION_ENV = {
+    "OPENAI_API_KEY": "benchmark",
+    "TAVILY_KEY": "benchmark",
+    "LLM_CACHE_ENABLED": "0",
+    "SEARCH_CACHE_ENABLED": "0",
+    "SEMANTIC_CACHE_ENABLED": "0",
+    "LLM_RPM": "0",
+    "LLM_TPM": "0",
+    "SEARCH_RPS": "0",
+    "LLM_RETRY_BASE_DELAY": "0.01",
+}
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Linear-interpolated percentile (``q`` in 0-100) of ``values``."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS.
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def summarize(latencies: List[float], errors: int, wall: float) -> dict:
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 3) if wall > 0 else 0.0,
+        "latency_seconds": {
+            "p50": round(percentile(latencies, 50), 4),
+            "p95": round(percentile(latencies, 95), 4),
+            "p99": round(percentile(latencies, 99), 4),
+            "mean": round(sum(latencies) / len(latencies), 4) if latencies else 0.0,
+            "max": round(max(latencies), 4) if latencies else 0.0,
+        },
+    }
+
+
+def _queries(count: int, offset: int = 0) -> List[str]:
+    return [f"Benchmark query {offset + index}" for index in range(count)]
+
+
+def _bench_cli(requests: int) -> dict:
+    from geopoliticai import cli
+
+    latencies: List[float] = []
+    errors = 0
+    started = time.perf_counter()
+    for query in _queries(requests):
+        stdout = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+        begin = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(stdout):
+                cli.main([query])
+        except Exception:
+            errors += 1
+        else:
+            latencies.append(time.perf_counter() - begin)
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def _bench_api(clients: int, requests_per_client: int) -> dict:
+    import httpx
+
+    from geopoliticai.api import app
+
+    latencies: List[float] = []
+    errors = 0
+
+    async def client_loop(http: httpx.AsyncClient, client_id: int) -> None:
+        nonlocal errors
+        for query in _queries(requests_per_client, offset=client_id * 10_000):
+            begin = time.perf_counter()
+            response = await http.post("/run_pipeline", json={"query": query})
+            if response.status_code == 200:
+                latencies.append(time.perf_counter() - begin)
+            else:
+                errors += 1
+
+    transport = httpx.ASGITransport(app=app)
+    with tempfile.TemporaryDirectory() as store_dir:
+        os.environ["JOB_STORE_PATH"] = os.path.join(store_dir, "jobs.sqlite3")
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://benchmark", timeout=None
+            ) as http:
+                started = time.perf_counter()
+                await asyncio.gather(*(client_loop(http, i) for i in range(clients)))
+                wall = time.perf_counter() - started
+    result = summarize(latencies, errors, wall)
+    result["clients"] = clients
+    return result
+
+
+async def _bench_batch(requests: int, concurrency: int) -> dict:
+    from geopoliticai.batch import BatchItem, run_pipeline_batch
+
+    items = [BatchItem(id=str(i), query=q) for i, q in enumerate(_queries(requests))]
+    latencies: List[float] = []
+    errors = 0
+    started = time.perf_counter()
+    async for record in run_pipeline_batch(items, concurrency=concurrency):
+        if record["status"] == "ok":
+            latencies.append(record["elapsed"])
+        else:
+            errors += 1
+    result = summarize(latencies, errors, time.perf_counter() - started)
+    result["concurrency"] = concurrency
+    return result
+
+
+def _backend(spec: dict) -> BackendProfile:
+    return BackendProfile(
+        latency=LatencyModel(**spec["latency"]),
+        error_rate=spec["error_rate"],
+        completion_tokens=spec["completion_tokens"],
+    )
+
+
+def run_scenario(name: str, params: dict, backends: dict, env: Dict[str, str]) -> dict:
+    """Run one scenario in the current process with fake backends installed."""
+    os.environ.update(env)
+    fakes = FakeBackends(
+        llm=_backend(backends["llm"]),
+        search=_backend(backends["search"]),
+        seed=backends["seed"],
+    )
+    with fakes.installed():
+        if name == "cli":
+            result = _bench_cli(params["requests"])
+        elif name == "api":
+            result = asyncio.run(_bench_api(params["clients"], params["requests"]))
+        elif name == "batch":
+            result = asyncio.run(_bench_batch(params["requests"], params["concurrency"]))
+        else:
+            raise ValueError(f"Unknown scenario: {name}")
+    result.update(
+        scenario=name,
+        expert_mode=os.getenv("EXPERT_MODE", "per_lens"),
+        llm_calls=fakes.llm_sampler.total_calls,
+        llm_prompt_tokens=fakes.llm_sampler.prompt_tokens,
+        llm_completion_tokens=fakes.llm_sampler.completion_tokens,
+        search_calls=fakes.search_sampler.total_calls,
+        peak_rss_mb=peak_rss_mb(),
+    )
+    return result
+
+
+def _reduction(before: float, after: float) -> float:
+    # "+ 0.0" turns a rounded -0.0 into 0.0.
+    return round(1 - after / before, 3) + 0.0 if before else 0.0
+
+
+def compare_expert_modes(results: List[dict]) -> List[dict]:
+    """Per scenario, how multi-lens experts compare with per-lens ones."""
+    comparisons = []
+
+    def key(result: dict) -> tuple:
+        return result["scenario"], result.get("clients"), result["requests"]
+
+    baseline = {key(r): r for r in results if r["expert_mode"] == "per_lens"}
+    for result in results:
+        before = baseline.get(key(result))
+        if result["expert_mode"] != "multi_lens" or before is None:
+            continue
+        per_request = {
+            metric: (
+                before[metric] / before["requests"],
+                result[metric] / result["requests"],
+            )
+            for metric in ("llm_calls", "llm_prompt_tokens", "llm_completion_tokens")
+        }
+        comparisons.append(
+            {
+                "scenario": result["scenario"],
+                "clients": result.get("clients"),
+                "llm_calls_per_request": [round(v, 2) for v in per_request["llm_calls"]],
+                "prompt_tokens_per_request": [
+                    round(v) for v in per_request["llm_prompt_tokens"]
+                ],
+                "round_trip_reduction": _reduction(*per_request["llm_calls"]),
+                "prompt_token_reduction": _reduction(*per_request["llm_prompt_tokens"]),
+                "completion_token_reduction": _reduction(
+                    *per_request["llm_completion_tokens"]
+                ),
+                "p50_latency_seconds": [
+                    before["latency_seconds"]["p50"],
+                    result["latency_seconds"]["p50"],
+                ],
+            }
+        )
+    return comparisons
+
+
+def _isolated(name: str, params: dict, backends: dict, env: Dict[str, str]) -> dict:
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(run_scenario, (name, params, backends, env))
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _latency(spec: str) -> LatencyModel:
+    """Parse ``distribution:median[:spread[:per_token]]``."""
+    parts = spec.split(":")
+    values = [float(part) for part in parts[1:]]
+    fields = ("median", "spread", "per_token")
+    return LatencyModel(parts[0], **dict(zip(fields, values)))
+
+
+def _profile(latency: LatencyModel, error_rate: float, tokens: int) -> dict:
+    return {
+        "latency": asdict(latency),
+        "error_rate": error_rate,
+        "completion_tokens": tokens,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS)
+    )
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument(
+        "--requests", type=int, default=5, help="Requests per API client / CLI runs."
+    )
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--batch-concurrency", type=int, default=8)
+    parser.add_argument(
+        "--llm-latency",
+        type=_latency,
+        default=LatencyModel("lognormal", 0.2, 0.5, 0.0005),
+        help="distribution:median[:spread[:per_token]] (fixed, uniform, "
+        "exponential, lognormal).",
+    )
+    parser.add_argument(
+        "--search-latency", type=_latency, default=LatencyModel("lognormal", 0.3, 0.4)
+    )
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--search-error-rate", type=float, default=0.0)
+    parser.add_argument("--completion-tokens", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--cache", action="store_true", help="Keep LLM/search caches on."
+    )
+    parser.add_argument(
+        "--rate-limits", action="store_true", help="Keep client-side rate limits on."
+    )
+    parser.add_argument(
+        "--in-process",
+        action="store_true",
+        help="Run scenarios in this process (faster; peak RSS becomes cumulative).",
+    )
+    parser.add_argument(
+        "--expert-modes",
+        nargs="+",
+        choices=("per_lens", "multi_lens"),
+        default=["per_lens"],
+        help="EXPERT_MODE values to run every scenario with.",
+    )
+    parser.add_argument("--output", help="Write JSON results to this file.")
+    args = parser.parse_args(argv)
+
+    env = dict(_ISOLATION_ENV)
+    if args.cache:
+        env.pop("LLM_CACHE_ENABLED")
+        env.pop("SEARCH_CACHE_ENABLED")
+    if args.rate_limits:
+        for name in ("LLM_RPM", "LLM_TPM", "SEARCH_RPS"):
+            env.pop(name)
+    backends = {
+        "llm": _profile(args.llm_latency, args.llm_error_rate, args.completion_tokens),
+        "search": _profile(args.search_latency, args.search_error_rate, 0),
+        "seed": args.seed,
+    }
+    plan: List[tuple[str, dict]] = []
+    for name in args.scenarios:
+        if name == "cli":
+            plan.append((name, {"requests": args.requests}))
+        elif name == "api":
+            plan += [(name, {"clients": c, "requests": args.requests}) for c in args.clients]
+        else:
+            plan.append(
+                (name, {"requests": args.batch_size, "concurrency": args.batch_concurrency})
+            )
+
+    runner = run_scenario if args.in_process else _isolated
+    results = []
+    for (name, params), mode in itertools.product(plan, args.expert_modes):
+        result = runner(name, params, backends, {**env, "EXPERT_MODE": mode})
+        print(
+            f"{name} {params} {mode}: p50={result['latency_seconds']['p50']}s "
+            f"p99={result['latency_seconds']['p99']}s "
+            f"throughput={result['throughput_rps']}/s rss={result['peak_rss_mb']}MB",
+            file=sys.stderr,
+        )
+        results.append(result)
+
+    report = {
+        "benchmark": "pipeline",
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "backends": backends,
+        "environment": env,
+        "results": results,
+    }
+    if len(args.expert_modes) > 1:
+        report["expert_modes"] = compare_expert_modes(results)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
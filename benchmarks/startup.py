@@ -0,0 +1,96 @@
+"""Measure cold-start import cost of the CLI and API with ``-X importtime``.
+
+Each target runs in a fresh interpreter; the report gives the cumulative
+import time of the entry module and which heavy SDKs were loaded on the
+way. Neither entry point should load a heavy SDK before a command runs.
+
+    python -m benchmarks.startup [--repeats 5] [--output startup.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Sequence, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Top-level packages that only the pipeline itself needs.
+HEAVY_MODULES = ("langgraph", "langchain_core", "openai", "httpx", "tavily", "numpy")
+TARGETS: Dict[str, Sequence[str]] = {
+    "cli_import": ("-c", "import geopoliticai.cli"),
+    "cli_help": ("-m", "geopoliticai.cli", "--help"),
+    "api_import": ("-c", "import geopoliticai.api"),
+}
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """``(module, depth, cumulative microseconds)`` per ``-X importtime`` line."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue  # the header line
+        # Names are indented two spaces per level below the first import.
+        name = fields[2][1:]
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), depth, int(fields[1])))
+    return rows
+
+
+def measure(args: Sequence[str]) -> dict:
+    """Run ``python -X importtime *args`` once and summarise its imports."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    rows = parse_importtime(completed.stderr)
+    return {
+        "returncode": completed.returncode,
+        "total_ms": round(sum(us for _, depth, us in rows if depth == 0) / 1000, 2),
+        "modules": len(rows),
+        "heavy": sorted({name.split(".")[0] for name, _, _ in rows} & set(HEAVY_MODULES)),
+    }
+
+
+def run(targets: Dict[str, Sequence[str]] = TARGETS, repeats: int = 5) -> List[dict]:
+    results = []
+    for name, args in targets.items():
+        samples = [measure(args) for _ in range(repeats)]
+        results.append(
+            {
+                "target": name,
+                "median_ms": statistics.median(s["total_ms"] for s in samples),
+                "max_ms": max(s["total_ms"] for s in samples),
+                "modules": samples[0]["modules"],
+                "heavy": samples[0]["heavy"],
+                "returncode": samples[0]["returncode"],
+            }
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", help="Write JSON results to this file.")
+    args = parser.parse_args()
+
+    results = {"benchmark": "startup", "results": run(repeats=args.repeats)}
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
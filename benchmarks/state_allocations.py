@@ -0,0 +1,278 @@
+"""Measure pipeline-state allocations per run with ``tracemalloc``.
+
+Drives the compiled graph end to end against a local fake LLM, once as
+built by :func:`geopoliticai.graph.build_graph` and once as a legacy graph
+with the former state handling: the fact checker, summarizer and
+supervisor return ``{**state, ...}`` full copies, later stages concatenate
+the claims again instead of reading ``all_claims``, and sources, claims
+and verdicts are the former plain dataclasses with a ``__dict__`` each.
+Both graphs share the current node bodies, so the difference is the state
+representation alone; the fake LLM answers instantly so it does not
+dominate the time.
+
+    python -m benchmarks.state_allocations [--claims 40 400] [--sources 40 400]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, TypedDict, get_type_hints
+from unittest.mock import patch
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import END, START, StateGraph
+
+from geopoliticai.config import get_infosphere_sources
+from geopoliticai.fact_check import fact_checker
+from geopoliticai.graph import (
+    EXPERT_LENSES,
+    SEARCH_AGENTS,
+    _initial_state,
+    _make_expert,
+    _run_config,
+    build_graph,
+)
+from geopoliticai.metrics import timed_stage
+from geopoliticai.models import PipelineResult, PipelineState, Source
+from geopoliticai.search import web_searcher
+from geopoliticai.summarizer import summarizer_judge
+
+_REPEATS = 20
+_TRACED_RUNS = 5
+
+
+# The former models: mutable dataclasses without slots.
+@dataclass
+class _LegacySource:
+    id: str
+    title: str
+    url: str
+    notes: str
+
+
+@dataclass
+class _LegacyClaim:
+    text: str
+    source_ids: List[str]
+
+
+@dataclass
+class _LegacyFactCheckResult:
+    claim: _LegacyClaim
+    verdict: str
+    rationale: str
+
+
+# The former schema: no all_claims.
+_LegacyState = TypedDict(  # type: ignore[misc]
+    "_LegacyState",
+    {
+        key: hint
+        for key, hint in get_type_hints(PipelineState).items()
+        if key != "all_claims"
+    },
+)
+
+
+def _claim_lines(user: str) -> List[str]:
+    block = user.split("Claims:", 1)[1].split("Preferred", 1)[0]
+    return [
+        line[2:].split(" (Sources:", 1)[0]
+        for line in block.splitlines()
+        if line.startswith("- ")
+    ]
+
+
+def _fake_llm_json(claims_per_expert: int):
+    def fake(system: str, user: str, temperature: float = 0.2) -> dict:
+        if "Task: Fact-check each claim" in user:
+            return {
+                "results": [
+                    {"claim_text": text, "verdict": "TRUE", "rationale": "ok"}
+                    for text in _claim_lines(user)
+                ]
+            }
+        if "Task: Provide a neutral synthesis" in user:
+            return {"synthesis": "Benchmark synthesis."}
+        ids = re.findall(r"^(S\w+): ", user, flags=re.MULTILINE) or ["S1"]
+        lens = re.search(r"perspective: (\S+)", user)
+        name = lens.group(1) if lens else "lens"
+        return {
+            "claims": [
+                {"text": f"{name} claim {i}.", "source_ids": [ids[i % len(ids)]]}
+                for i in range(claims_per_expert)
+            ]
+        }
+
+    return fake
+
+
+@contextmanager
+def _fake_llm(claims: int) -> Iterator[None]:
+    fake = _fake_llm_json(max(1, claims // len(EXPERT_LENSES)))
+    with patch("geopoliticai.claims.llm_json", fake), patch(
+        "geopoliticai.fact_check.llm_json", fake
+    ), patch("geopoliticai.summarizer.llm_json", fake):
+        yield
+
+
+@contextmanager
+def _legacy_models() -> Iterator[None]:
+    with patch("geopoliticai.claims.Claim", _LegacyClaim), patch(
+        "geopoliticai.fact_check.Claim", _LegacyClaim
+    ), patch("geopoliticai.fact_check.FactCheckResult", _LegacyFactCheckResult):
+        yield
+
+
+def _seed_sources(sources: int, source_type: type = Source) -> Dict[str, List[Any]]:
+    per_agent = max(1, sources // len(SEARCH_AGENTS))
+    return {
+        agent: [
+            source_type(
+                id=f"S{agent}{i}",
+                title=f"{agent} report {i}",
+                url=f"https://example.com/{agent}/{i}",
+                notes=f"Notes for {agent} report {i}.",
+            )
+            for i in range(per_agent)
+        ]
+        for agent in SEARCH_AGENTS
+    }
+
+
+def legacy_graph(infosphere: str = "english") -> Any:
+    """The parallel graph with the former full-state-copy nodes."""
+    language = "polish" if infosphere == "polish" else "english"
+    infosphere_sources = get_infosphere_sources(infosphere)
+    graph = StateGraph(_LegacyState)
+
+    def make_searcher(agent_key: str):
+        def searcher(state: dict, config: RunnableConfig) -> dict:
+            seeds = config["configurable"]["seed_sources"]
+            return {
+                f"{agent_key}_sources": web_searcher(
+                    state, agent_key, infosphere_sources[agent_key], seeds
+                )
+            }
+
+        return searcher
+
+    def fact_node(state: dict) -> dict:
+        update = fact_checker(state, infosphere_sources["fact"], language)
+        return {
+            **state,
+            "source_registry": update["source_registry"],
+            "fact_checks": update["fact_checks"],
+        }
+
+    def summarizer_node(state: dict) -> dict:
+        return {**state, **summarizer_judge(state, language)}
+
+    def supervisor(state: dict) -> dict:
+        return {**state, "result": PipelineResult.from_state(state, infosphere)}
+
+    for agent_key in SEARCH_AGENTS:
+        name = f"{agent_key}_searcher"
+        graph.add_node(name, timed_stage(name, make_searcher(agent_key)))
+        graph.add_edge(START, name)
+    for agent_key in EXPERT_LENSES:
+        graph.add_node(
+            f"{agent_key}_expert",
+            _make_expert(agent_key, infosphere_sources, language, batched=False),
+        )
+        graph.add_edge(f"{agent_key}_searcher", f"{agent_key}_expert")
+    graph.add_node("fact_checker", timed_stage("fact_checker", fact_node))
+    graph.add_node("summarizer_judge", timed_stage("summarizer_judge", summarizer_node))
+    graph.add_node("supervisor", timed_stage("supervisor", supervisor))
+    graph.add_edge(
+        [f"{agent_key}_expert" for agent_key in EXPERT_LENSES] + ["fact_searcher"],
+        "fact_checker",
+    )
+    graph.add_edge("fact_checker", "summarizer_judge")
+    graph.add_edge("summarizer_judge", "supervisor")
+    graph.add_edge("supervisor", END)
+    return graph.compile()
+
+
+def run_once(app: Any, claims: int, sources: int, legacy: bool = False) -> dict:
+    """Final state of one run of ``app`` over ``sources`` seeds.
+
+    With ``legacy`` the run builds the former unslotted models.
+    """
+    seeds = _seed_sources(sources, _LegacySource if legacy else Source)
+    with _fake_llm(claims), _legacy_models() if legacy else nullcontext():
+        return app.invoke(_initial_state("Benchmark", "english"), _run_config(seeds))
+
+
+def _traced(app: Any, claims: int, sources: int, legacy: bool) -> tuple[int, int]:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        state = run_once(app, claims, sources, legacy)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert state["result"].fact_checks
+    return current - before, peak - before
+
+
+def measure(app: Any, claims: int, sources: int, legacy: bool = False) -> dict:
+    """Memory held by the final state and transient peak, plus time per run.
+
+    Memory is the median of a few traced runs; branch threads make single
+    runs noisy.
+    """
+    # Warm up interned strings and import-time caches.
+    run_once(app, claims, sources, legacy)
+    traced = [_traced(app, claims, sources, legacy) for _ in range(_TRACED_RUNS)]
+    started = time.perf_counter()
+    for _ in range(_REPEATS):
+        run_once(app, claims, sources, legacy)
+    elapsed = (time.perf_counter() - started) / _REPEATS
+    return {
+        "retained_kib": round(statistics.median(c for c, _ in traced) / 1024, 1),
+        "peak_kib": round(statistics.median(p for _, p in traced) / 1024, 1),
+        "ms": round(elapsed * 1000, 3),
+    }
+
+
+def run(claim_counts: List[int], source_counts: List[int]) -> List[dict]:
+    legacy, partial = legacy_graph(), build_graph()
+    results = []
+    for claims in claim_counts:
+        for sources in source_counts:
+            row = {"claims": claims, "sources": sources}
+            row["legacy"] = measure(legacy, claims, sources, legacy=True)
+            row["partial"] = measure(partial, claims, sources)
+            for metric in ("retained_kib", "peak_kib", "ms"):
+                row[f"{metric}_ratio"] = round(
+                    row["partial"][metric] / row["legacy"][metric], 2
+                )
+            results.append(row)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--claims", type=int, nargs="+", default=[40, 400])
+    parser.add_argument("--sources", type=int, nargs="+", default=[40, 400])
+    parser.add_argument("--output", help="Write JSON results to this file.")
+    args = parser.parse_args()
+
+    results = {"benchmark": "state_allocations", "results": run(args.claims, args.sources)}
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, AsyncIterator
 
 
 def run_pipeline(*args: Any, **kwargs: Any) -> str:
@@ -12,4 +12,18 @@ def run_pipeline(*args: Any, **kwargs: Any) -> str:
     return _run_pipeline(*args, **kwargs)
 
 
-__all__ = ["run_pipeline"]
+async def arun_pipeline(*args: Any, **kwargs: Any) -> str:
+    """Lazily import and execute the async pipeline."""
+    from geopoliticai.graph import arun_pipeline as _arun_pipeline
+
+    return await _arun_pipeline(*args, **kwargs)
+
+
+def run_pipeline_batch(*args: Any, **kwargs: Any) -> AsyncIterator[dict]:
+    """Lazily import the batch runner; yields one result dict per query."""
+    from geopoliticai.batch import run_pipeline_batch as _run_pipeline_batch
+
+    return _run_pipeline_batch(*args, **kwargs)
+
+
+__all__ = ["arun_pipeline", "run_pipeline", "run_pipeline_batch"]
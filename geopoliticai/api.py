@@ -1,12 +1,49 @@
-"""FastAPI application for the GeopoliticAI pipeline."""
+"""FastAPI application for the GeopoliticAI pipeline.
+
+The pipeline (langgraph, openai, httpx) is imported on first use rather than
+with this module, which keeps ``uvicorn --reload`` restarts fast. With
+API_PREWARM (on by default) startup imports it in the background, compiles
+the graphs and builds the pooled clients; ``/health`` answers 503 until
+that has finished. A failed prewarm is retried with backoff while
+``/health`` reports ``degraded``: requests still work, doing the same setup
+on first use.
+"""
 
 from __future__ import annotations
 
-from fastapi import FastAPI, HTTPException
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import asdict
+from typing import AsyncIterator, List, Optional, Union
+
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import (
+    JSONResponse,
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
 from pydantic import BaseModel, Field
 
-from geopoliticai.config import init_environment, require_env
-from geopoliticai.graph import run_pipeline
+from geopoliticai.clients import aclose_clients, get_client_manager
+from geopoliticai.config import (
+    env_flag,
+    env_float,
+    env_int,
+    get_infosphere_sources,
+    init_environment,
+    require_env,
+)
+from geopoliticai.jobs import IdempotencyKeyReused, JobManager, JobQueueFull, JobStore
+from geopoliticai.metrics import render_metrics, trace_scope
+from geopoliticai.ratelimit import INTERACTIVE, rate_limit_metrics, rate_limit_scope
+from geopoliticai.resilience import RetryPolicy, UpstreamUnavailableError, backoff_delay
+from geopoliticai.serialization import JSON, MSGPACK, TEXT, dumps, media_types, negotiate
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="GeopoliticAI API", version="1.0.0")
 
@@ -16,10 +53,57 @@ class RunPipelineRequest(BaseModel):
     infosphere: str = Field(
         "english", description="Which infosphere sources to use: english or polish"
     )
+    trace: bool = Field(
+        False, description="Return per-stage timings, tokens and cost with the output"
+    )
+    incremental: bool = Field(
+        False,
+        description="Reuse claims and fact checks from the last run of this query "
+        "where its sources are unchanged",
+    )
+    structured: bool = Field(
+        False,
+        description="Return sources, claims per perspective, fact checks and "
+        "synthesis instead of the text report (implied by Accept: application/msgpack)",
+    )
 
 
 class RunPipelineResponse(BaseModel):
     output: str
+    trace: Optional[dict] = None
+
+
+class JobProgress(BaseModel):
+    completed: int
+    total: int
+
+
+class JobResponse(BaseModel):
+    id: str
+    query: str
+    infosphere: str
+    incremental: bool = False
+    status: str
+    stages: List[str]
+    progress: JobProgress
+    result: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+
+
+def _job_response(job) -> JobResponse:
+    data = job.as_dict()
+    if data["result"] is not None:
+        data["result"] = _sanitize_output(data["result"])
+    return JobResponse(**data)
+
+
+def _jobs() -> JobManager:
+    manager: JobManager | None = getattr(app.state, "jobs", None)
+    if manager is None:
+        raise HTTPException(status_code=503, detail="Job queue is not running.")
+    return manager
 
 
 def _sanitize_output(text: str) -> str:
@@ -27,6 +111,46 @@ def _sanitize_output(text: str) -> str:
     return text.encode("utf-8", errors="replace").decode("utf-8")
 
 
+def _stream_event(node: str, update: dict) -> dict | None:
+    """Translate a graph node update into a client-facing stream event."""
+    if node.endswith("_searcher"):
+        perspective = node[: -len("_searcher")]
+        sources = update.get(f"{perspective}_sources", [])
+        return {
+            "event": "sources",
+            "perspective": perspective,
+            "sources": [asdict(source) for source in sources],
+        }
+    if node.endswith("_expert"):
+        perspective = node[: -len("_expert")]
+        claims = update.get(f"{perspective}_claims", [])
+        return {
+            "event": "claims",
+            "perspective": perspective,
+            "claims": [asdict(claim) for claim in claims],
+        }
+    if node == "fact_checker":
+        results = update.get("fact_checks", [])
+        return {"event": "fact_checks", "fact_checks": [asdict(r) for r in results]}
+    if node == "summarizer_judge":
+        return {"event": "synthesis", "synthesis": update.get("synthesis", "")}
+    if node == "supervisor":
+        result = update.get("result")
+        return {"event": "final", "output": result.text if result is not None else ""}
+    return None
+
+
+def _ndjson(event: dict) -> str:
+    return _sanitize_output(json.dumps(event, ensure_ascii=False)) + "\n"
+
+
+@app.exception_handler(UpstreamUnavailableError)
+async def upstream_unavailable_handler(
+    request: Request, exc: UpstreamUnavailableError
+) -> JSONResponse:
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+
 @app.on_event("startup")
 def startup() -> None:
     init_environment()
@@ -34,17 +158,249 @@ def startup() -> None:
         require_env()
     except ValueError as exc:
         raise RuntimeError(str(exc)) from exc
+    # Pool settings are read once, after .env has been loaded.
+    get_client_manager()
+
+
+async def _prewarm() -> None:
+    """Compile the graphs and build the pooled clients off the request path.
+
+    Failed attempts are retried until one succeeds (``API_PREWARM_RETRY_DELAY``
+    seconds at first, backing off to a minute); ``app.state.prewarm_failures``
+    counts them for ``/health``.
+    """
+    started = time.perf_counter()
+    policy = RetryPolicy(
+        base_delay=env_float("API_PREWARM_RETRY_DELAY", 1.0), max_delay=60.0
+    )
+
+    def compile_all() -> None:
+        from geopoliticai.graph import compile_graphs
+
+        compile_graphs()
+
+    while True:
+        try:
+            await asyncio.to_thread(compile_all)
+            # Async pools belong to the loop they are opened on: the server's.
+            manager = get_client_manager()
+            manager.async_openai()
+            manager.async_tavily(os.environ["TAVILY_KEY"])
+        except Exception:
+            app.state.prewarm_failures += 1
+            delay = backoff_delay(app.state.prewarm_failures, policy)
+            logger.exception("Prewarm failed; retrying in %.1fs", delay)
+            await asyncio.sleep(delay)
+            continue
+        break
+    app.state.prewarm_failures = 0
+    logger.info("Prewarm finished in %.2fs", time.perf_counter() - started)
+
+
+@app.on_event("startup")
+async def start_prewarm() -> None:
+    app.state.prewarm = None
+    app.state.prewarm_failures = 0
+    if env_flag("API_PREWARM", True):
+        app.state.prewarm = asyncio.create_task(_prewarm())
+
+
+@app.on_event("startup")
+async def start_jobs() -> None:
+    store = JobStore(os.getenv("JOB_STORE_PATH", "geopoliticai_jobs.sqlite3"))
+    app.state.jobs = JobManager(
+        store,
+        workers=env_int("JOB_WORKERS", 4),
+        max_queue=env_int("JOB_QUEUE_SIZE", 100),
+        idempotency_ttl=env_float("JOB_IDEMPOTENCY_TTL", 3600.0),
+    )
+    await app.state.jobs.start()
+
+
+@app.on_event("shutdown")
+async def stop_jobs() -> None:
+    manager: JobManager | None = getattr(app.state, "jobs", None)
+    if manager is not None:
+        await manager.stop()
+        manager.store.close()
+        app.state.jobs = None
+
+
+@app.on_event("shutdown")
+async def close_http_clients() -> None:
+    prewarm: asyncio.Task | None = getattr(app.state, "prewarm", None)
+    if prewarm is not None and not prewarm.done():
+        prewarm.cancel()
+        await asyncio.gather(prewarm, return_exceptions=True)
+    # Runs after the job workers have stopped, so no call is mid-flight.
+    await aclose_clients()
 
 
 @app.get("/health")
-def healthcheck() -> dict[str, str]:
-    return {"status": "ok"}
+def healthcheck(response: Response) -> dict[str, str]:
+    """``ok`` once the prewarm (if enabled) has finished, 503 while it starts.
+
+    While a failed prewarm is being retried the app still serves, so the
+    answer is 200 ``degraded`` rather than a 503 that gets it restarted.
+    """
+    prewarm: asyncio.Task | None = getattr(app.state, "prewarm", None)
+    if prewarm is None or (prewarm.done() and not prewarm.cancelled()):
+        return {"status": "ok"}
+    if app.state.prewarm_failures:
+        return {"status": "degraded"}
+    response.status_code = 503
+    return {"status": "starting"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.get("/rate_limits")
+def rate_limits() -> dict[str, dict]:
+    """Queue depth, in-flight calls and token availability per upstream."""
+    return rate_limit_metrics()
+
+
+@app.post(
+    "/run_pipeline",
+    response_model=RunPipelineResponse,
+    responses={
+        200: {
+            "content": {MSGPACK: {}, TEXT: {}},
+            "description": "The text report as JSON (default), the structured "
+            "result as JSON or MessagePack, or the bare report as text/plain.",
+        },
+        406: {"description": "No acceptable media type."},
+    },
+)
+async def run_pipeline_endpoint(
+    payload: RunPipelineRequest, accept: Optional[str] = Header(None)
+) -> Union[RunPipelineResponse, Response]:
+    """Run the pipeline; the response format follows the ``Accept`` header.
+
+    Structured payloads carry ``schema_version``; ``trace`` is added as a
+    top-level key when requested. text/plain returns the report alone.
+    """
+    offered = media_types() + (TEXT,)
+    media_type = negotiate(accept, offered)
+    if media_type is None:
+        raise HTTPException(
+            status_code=406, detail=f"Supported media types: {', '.join(offered)}"
+        )
+    from geopoliticai.graph import arun_pipeline
+
+    try:
+        with rate_limit_scope(INTERACTIVE), trace_scope() as trace:
+            result = await arun_pipeline(
+                payload.query,
+                infosphere=payload.infosphere,
+                incremental=payload.incremental,
+                structured=True,
+            )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if media_type == TEXT:
+        return PlainTextResponse(_sanitize_output(result.text))
+    extra = {"trace": trace.as_dict()} if payload.trace else None
+    if payload.structured or media_type != JSON:
+        return Response(dumps(result, media_type, extra), media_type=media_type)
+    return RunPipelineResponse(
+        output=_sanitize_output(result.text),
+        trace=extra["trace"] if extra else None,
+    )
+
 
+@app.post("/run_pipeline/stream")
+async def run_pipeline_stream_endpoint(payload: RunPipelineRequest) -> StreamingResponse:
+    """Stream NDJSON events as each pipeline stage completes.
 
-@app.post("/run_pipeline", response_model=RunPipelineResponse)
-def run_pipeline_endpoint(payload: RunPipelineRequest) -> RunPipelineResponse:
+    Event types: ``sources`` and ``claims`` (per perspective), ``fact_checks``,
+    ``synthesis`` and ``final``, whose ``output`` matches ``/run_pipeline``.
+    Failures after the stream has started are reported as an ``error`` event.
+    """
     try:
-        output = run_pipeline(payload.query, infosphere=payload.infosphere)
+        get_infosphere_sources(payload.infosphere)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
-    return RunPipelineResponse(output=_sanitize_output(output))
+
+    from geopoliticai.graph import astream_pipeline
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            with rate_limit_scope(INTERACTIVE), trace_scope() as trace:
+                async for node, update in astream_pipeline(
+                    payload.query,
+                    infosphere=payload.infosphere,
+                    incremental=payload.incremental,
+                ):
+                    event = _stream_event(node, update)
+                    if event is None:
+                        continue
+                    if event["event"] == "final" and payload.trace:
+                        event["trace"] = trace.as_dict()
+                    yield _ndjson(event)
+        except (ValueError, UpstreamUnavailableError) as exc:
+            yield _ndjson({"event": "error", "detail": str(exc)})
+        except Exception:
+            logger.exception("Streaming pipeline failed")
+            yield _ndjson({"event": "error", "detail": "Pipeline failed."})
+
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+async def submit_job(
+    payload: RunPipelineRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+) -> JobResponse:
+    """Queue an analysis; duplicate submissions attach to the existing job.
+
+    Jobs keep the text report, so ``structured`` and ``trace`` are rejected.
+    Reusing an ``Idempotency-Key`` for a different request is a 409.
+    """
+    try:
+        get_infosphere_sources(payload.infosphere)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if payload.structured or payload.trace:
+        raise HTTPException(
+            status_code=400,
+            detail="Jobs return the text report; structured and trace are not supported.",
+        )
+    try:
+        job, _ = _jobs().submit(
+            payload.query,
+            payload.infosphere,
+            idempotency_key,
+            incremental=payload.incremental,
+        )
+    except IdempotencyKeyReused as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    except JobQueueFull as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    return _job_response(job)
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str) -> JobResponse:
+    job = _jobs().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return _job_response(job)
+
+
+@app.delete("/jobs/{job_id}", response_model=JobResponse)
+async def cancel_job(job_id: str) -> JobResponse:
+    job = _jobs().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return _job_response(job)
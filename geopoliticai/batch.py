@@ -0,0 +1,151 @@
+"""Batch execution of many queries through the pipeline."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Set, Union
+
+from geopoliticai.graph import arun_pipeline, compile_graphs
+from geopoliticai.models import Source
+from geopoliticai.ratelimit import BATCH, rate_limit_scope
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+@dataclass
+class BatchItem:
+    id: str
+    query: str
+    infosphere: str = "english"
+
+
+def read_batch_items(
+    lines: Iterable[str], default_infosphere: str = "english"
+) -> Iterator[BatchItem]:
+    """Parse JSONL input: each line is a query string or an object with a query.
+
+    Objects may carry ``id`` and ``infosphere``; missing ids default to the
+    1-based line number so that resuming the same file is stable.
+    """
+    for line_no, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Invalid JSON on line {line_no}: {exc}") from exc
+        if isinstance(record, str):
+            record = {"query": record}
+        if not isinstance(record, dict) or not str(record.get("query") or "").strip():
+            raise ValueError(f"Line {line_no} has no query")
+        yield BatchItem(
+            id=str(record.get("id") or line_no),
+            query=str(record["query"]).strip(),
+            infosphere=str(record.get("infosphere") or default_infosphere),
+        )
+
+
+def load_checkpoint(path: str) -> Set[str]:
+    """Return the ids of items already completed successfully in ``path``."""
+    completed: Set[str] = set()
+    if not os.path.exists(path):
+        return completed
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash mid-write can leave a truncated final line.
+                continue
+            if record.get("status") == "ok":
+                completed.add(str(record.get("id")))
+    return completed
+
+
+async def _run_item(
+    item: BatchItem,
+    seed_sources: Optional[Union[List[Source], Dict[str, List[Source]]]],
+) -> dict:
+    started = time.perf_counter()
+    record = {"id": item.id, "query": item.query, "infosphere": item.infosphere}
+    try:
+        with rate_limit_scope(BATCH, caller=f"batch:{item.id}"):
+            output = await arun_pipeline(
+                item.query, seed_sources=seed_sources, infosphere=item.infosphere
+            )
+    except Exception as exc:
+        logger.warning("Batch item %s failed: %s", item.id, exc)
+        record.update(status="error", error=f"{type(exc).__name__}: {exc}")
+    else:
+        record.update(status="ok", output=output)
+    record["elapsed"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+async def run_pipeline_batch(
+    items: Iterable[BatchItem],
+    concurrency: int = 4,
+    completed: Optional[Set[str]] = None,
+    seed_sources: Optional[Union[List[Source], Dict[str, List[Source]]]] = None,
+) -> AsyncIterator[dict]:
+    """Run many queries with bounded concurrency, yielding results as they finish.
+
+    Items whose id is in ``completed`` are skipped. All runs share the
+    process-wide compiled graphs, LLM/search clients and caches.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    completed = completed or set()
+    compile_graphs()
+    pending: "asyncio.Queue[object]" = asyncio.Queue(maxsize=concurrency * 2)
+    results: "asyncio.Queue[object]" = asyncio.Queue()
+
+    async def feed() -> None:
+        cancelled = False
+        try:
+            for item in items:
+                if item.id in completed:
+                    logger.info("Batch item %s already completed, skipping", item.id)
+                    continue
+                await pending.put(item)
+        except asyncio.CancelledError:
+            # The consumer stopped early and the workers are cancelled with
+            # us; waiting for room in the queue would never finish.
+            cancelled = True
+            raise
+        finally:
+            if not cancelled:
+                for _ in range(concurrency):
+                    await pending.put(_DONE)
+
+    async def worker() -> None:
+        while True:
+            item = await pending.get()
+            if item is _DONE:
+                await results.put(_DONE)
+                return
+            await results.put(await _run_item(item, seed_sources))
+
+    tasks = [asyncio.create_task(feed())]
+    tasks += [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        finished_workers = 0
+        while finished_workers < concurrency:
+            result = await results.get()
+            if result is _DONE:
+                finished_workers += 1
+                continue
+            yield result
+        await tasks[0]
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
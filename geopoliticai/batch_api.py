@@ -0,0 +1,301 @@
+"""Provider Batch API backends for offline bulk runs.
+
+A backend takes a JSONL file of chat-completion requests in the OpenAI
+Batch format, processes it asynchronously and hands back one answer per
+``custom_id``. :class:`OpenAIBatchBackend` submits to the provider;
+:class:`LocalBatchBackend` works through the file in-process with a fake
+model, so bulk runs can be exercised without network access.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import shutil
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Protocol
+
+from openai import OpenAI
+
+from geopoliticai.llm import RESPONSE_FORMAT, get_openai_client
+from geopoliticai.prompts import count_tokens
+
+logger = logging.getLogger(__name__)
+
+ENDPOINT = "/v1/chat/completions"
+COMPLETED = "completed"
+IN_PROGRESS = "in_progress"
+# Provider statuses after which a batch no longer changes.
+TERMINAL_STATUSES = (COMPLETED, "failed", "expired", "cancelled")
+
+# (system, user, temperature) -> JSON answer, the signature of ``llm_json``.
+Responder = Callable[[str, str, float], dict]
+
+
+@dataclass
+class BatchAnswer:
+    """One line of a batch's output: the decoded JSON answer or an error."""
+
+    custom_id: str
+    data: Optional[dict] = None
+    error: Optional[str] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+class BatchBackend(Protocol):
+    def submit(self, path: str) -> str:
+        """Submit the request file at ``path``; returns the batch id."""
+
+    def status(self, batch_id: str) -> str:
+        """Current provider status, e.g. ``in_progress`` or ``completed``."""
+
+    def results(self, batch_id: str) -> Iterator[BatchAnswer]:
+        """Answers of a batch in a terminal status, successes and failures."""
+
+
+def batch_request(
+    custom_id: str, model: str, system: str, user: str, temperature: float = 0.2
+) -> dict:
+    """One input line: the same request ``llm_json`` sends, addressed by ``custom_id``."""
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": ENDPOINT,
+        "body": {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system},
+                {"role": "user", "content": user},
+            ],
+            "temperature": temperature,
+            "response_format": RESPONSE_FORMAT,
+        },
+    }
+
+
+def write_requests(path: str, requests: Iterable[dict]) -> int:
+    """Write ``requests`` as a batch input file; returns how many were written."""
+    count = 0
+    with open(path, "w", encoding="utf-8") as handle:
+        for request in requests:
+            handle.write(json.dumps(request, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def _error_text(error: Any) -> str:
+    if isinstance(error, dict):
+        return str(error.get("message") or error.get("code") or error)
+    return str(error)
+
+
+def parse_output_line(line: str) -> BatchAnswer:
+    """Decode one line of a batch output or error file."""
+    record = json.loads(line)
+    answer = BatchAnswer(custom_id=str(record["custom_id"]))
+    response = record.get("response") or {}
+    body = response.get("body") or {}
+    if record.get("error") or response.get("status_code") != 200:
+        answer.error = _error_text(
+            record.get("error")
+            or body.get("error")
+            or f"HTTP {response.get('status_code')}"
+        )
+        return answer
+    usage = body.get("usage") or {}
+    answer.prompt_tokens = usage.get("prompt_tokens") or 0
+    answer.completion_tokens = usage.get("completion_tokens") or 0
+    try:
+        answer.data = json.loads(body["choices"][0]["message"]["content"])
+    except (KeyError, IndexError, TypeError, ValueError) as exc:
+        answer.error = f"Unreadable answer: {type(exc).__name__}: {exc}"
+    return answer
+
+
+def _output_lines(text: str) -> Iterator[BatchAnswer]:
+    for line in text.splitlines():
+        if line.strip():
+            yield parse_output_line(line)
+
+
+class OpenAIBatchBackend:
+    """Runs batch files through the provider's Batch API (24h completion window)."""
+
+    def __init__(self, client: Optional[OpenAI] = None) -> None:
+        self._client = client
+
+    @property
+    def client(self) -> OpenAI:
+        return self._client or get_openai_client()
+
+    def submit(self, path: str) -> str:
+        with open(path, "rb") as handle:
+            uploaded = self.client.files.create(file=handle, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id, endpoint=ENDPOINT, completion_window="24h"
+        )
+        logger.info("Submitted batch %s (%s)", batch.id, os.path.basename(path))
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def results(self, batch_id: str) -> Iterator[BatchAnswer]:
+        batch = self.client.batches.retrieve(batch_id)
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                yield from _output_lines(self.client.files.content(file_id).text)
+
+
+_SOURCE_ID_RE = re.compile(r"^(S[\w-]*): ", re.MULTILINE)
+_LENS_RE = re.compile(r"from the perspective: ([^.\n]+)\.")
+
+
+def _listed_claims(user: str) -> List[str]:
+    texts = []
+    for line in user.split("Claims:", 1)[1].splitlines()[1:]:
+        if not line.startswith("- "):
+            break
+        texts.append(line[2:].split(" (Sources:", 1)[0].strip())
+    return texts
+
+
+def simulated_answer(system: str, user: str, temperature: float = 0.2) -> dict:
+    """A deterministic, well-formed answer to any pipeline prompt.
+
+    Claims cite the prompt's own source ids and every claim gets a
+    verdict, so the whole pipeline runs end to end; the content is
+    placeholder text.
+    """
+    source_ids = _SOURCE_ID_RE.findall(user)
+    if "Task: Fact-check each claim" in user:
+        return {
+            "results": [
+                {
+                    "claim_text": text,
+                    "verdict": "PARTIALLY TRUE",
+                    "rationale": "Simulated verdict; not checked against the sources.",
+                    "source_ids": source_ids[:1],
+                }
+                for text in _listed_claims(user)
+            ]
+        }
+    if "Task: Provide a neutral synthesis" in user:
+        return {"synthesis": f"Simulated synthesis of {len(_listed_claims(user))} claims."}
+    lens = _LENS_RE.search(user)
+    if lens is not None:
+        cited = source_ids[:3] or [""]
+        return {
+            "claims": [
+                {
+                    "text": f"Simulated {lens.group(1)} claim {index}.",
+                    "source_ids": [sid] if sid else [],
+                }
+                for index, sid in enumerate(cited, start=1)
+            ]
+        }
+    raise ValueError("Unrecognised prompt")
+
+
+class LocalBatchBackend:
+    """Processes batch files in-process with a fake model; no network.
+
+    Batches are kept as files under ``directory``, so an instance created
+    after a restart picks up batches an earlier one accepted. Each batch
+    reports ``in_progress`` for ``polls`` status checks before it is
+    processed, which lets callers exercise their polling and resume paths.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        responder: Responder = simulated_answer,
+        polls: int = 0,
+    ) -> None:
+        self.directory = directory
+        self.responder = responder
+        self.polls = polls
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, batch_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{batch_id}.{suffix}")
+
+    def _load(self, batch_id: str) -> dict:
+        with open(self._path(batch_id, "json"), encoding="utf-8") as handle:
+            return json.load(handle)
+
+    def _save(self, batch_id: str, meta: dict) -> None:
+        with open(self._path(batch_id, "json"), "w", encoding="utf-8") as handle:
+            json.dump(meta, handle)
+
+    def submit(self, path: str) -> str:
+        batch_id = f"batch_local_{uuid.uuid4().hex[:16]}"
+        shutil.copyfile(path, self._path(batch_id, "input.jsonl"))
+        self._save(batch_id, {"status": IN_PROGRESS, "polls": 0})
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        meta = self._load(batch_id)
+        if meta["status"] in TERMINAL_STATUSES:
+            return meta["status"]
+        if meta["polls"] < self.polls:
+            meta["polls"] += 1
+        else:
+            self._process(batch_id)
+            meta["status"] = COMPLETED
+        self._save(batch_id, meta)
+        return meta["status"]
+
+    def _answer(self, request: dict) -> dict:
+        body = request["body"]
+        messages = {message["role"]: message["content"] for message in body["messages"]}
+        system, user = messages.get("system", ""), messages.get("user", "")
+        try:
+            content = json.dumps(
+                self.responder(system, user, body.get("temperature", 0.2)),
+                ensure_ascii=False,
+            )
+        except Exception as exc:
+            return {
+                "custom_id": request["custom_id"],
+                "response": None,
+                "error": {"code": type(exc).__name__, "message": str(exc)},
+            }
+        return {
+            "custom_id": request["custom_id"],
+            "response": {
+                "status_code": 200,
+                "body": {
+                    "model": body.get("model"),
+                    "choices": [
+                        {"index": 0, "message": {"role": "assistant", "content": content}}
+                    ],
+                    "usage": {
+                        "prompt_tokens": count_tokens(system) + count_tokens(user),
+                        "completion_tokens": count_tokens(content),
+                    },
+                },
+            },
+            "error": None,
+        }
+
+    def _process(self, batch_id: str) -> None:
+        with open(self._path(batch_id, "input.jsonl"), encoding="utf-8") as source:
+            lines = [
+                json.dumps(self._answer(json.loads(line)), ensure_ascii=False)
+                for line in source
+                if line.strip()
+            ]
+        with open(self._path(batch_id, "output.jsonl"), "w", encoding="utf-8") as output:
+            output.write("".join(f"{line}\n" for line in lines))
+
+    def results(self, batch_id: str) -> Iterator[BatchAnswer]:
+        path = self._path(batch_id, "output.jsonl")
+        if not os.path.exists(path):
+            return
+        with open(path, encoding="utf-8") as handle:
+            yield from _output_lines(handle.read())
@@ -0,0 +1,438 @@
+"""Offline bulk runs through a provider Batch API.
+
+A bulk run moves every query through the pipeline one phase at a time:
+all searches, then one batch of ``build_claims`` requests, one batch of
+fact-check shards and one batch of syntheses. Each phase only starts once
+the previous batch is back, and everything a phase needs is persisted in
+the run directory, so a restarted run continues with the phase (and the
+submitted batch) it stopped at instead of starting over.
+
+Run directory layout:
+
+* ``manifest.json`` - current phase and the batch id submitted per phase.
+* ``items.json`` - the run's queries, written before the first search.
+* ``searched.jsonl`` - one line per searched query, appended as searches
+  finish; a restart only searches the queries missing from it.
+* ``states.json`` - every query's pipeline state, rewritten after each phase.
+* ``<phase>.requests.jsonl`` - the batch input file of each LLM phase.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from geopoliticai.batch import BatchItem
+from geopoliticai.batch_api import (
+    COMPLETED,
+    TERMINAL_STATUSES,
+    BatchAnswer,
+    BatchBackend,
+    batch_request,
+    write_requests,
+)
+from geopoliticai.claims import claims_request, parse_claims
+from geopoliticai.config import get_infosphere_sources, get_model
+from geopoliticai.fact_check import fact_check_requests, merge_fact_check_answers
+from geopoliticai.graph import EXPERT_LENSES, SEARCH_AGENTS
+from geopoliticai.llm import estimate_cost
+from geopoliticai.models import (
+    Claim,
+    FactCheckResult,
+    PipelineResult,
+    PipelineState,
+    Source,
+)
+from geopoliticai.ratelimit import BATCH, rate_limit_scope
+from geopoliticai.search import web_searcher
+from geopoliticai.summarizer import parse_summary, summary_request
+
+logger = logging.getLogger(__name__)
+
+SEARCH = "search"
+CLAIMS = "claims"
+FACT_CHECK = "fact_check"
+SUMMARY = "summary"
+DONE = "done"
+PHASES = (SEARCH, CLAIMS, FACT_CHECK, SUMMARY, DONE)
+
+
+class BulkBatchError(RuntimeError):
+    """Raised when a phase's batch ends without completing.
+
+    The batch id is forgotten first, so running again resubmits the phase.
+    """
+
+
+def _language(infosphere: str) -> str:
+    return "polish" if infosphere == "polish" else "english"
+
+
+def _claim(data: dict) -> Claim:
+    return Claim(text=data["text"], source_ids=list(data.get("source_ids", [])))
+
+
+def _dump_state(state: PipelineState) -> dict:
+    data = {key: state[key] for key in ("query", "language", "synthesis") if key in state}
+    for agent_key in SEARCH_AGENTS:
+        data[f"{agent_key}_sources"] = [asdict(s) for s in state[f"{agent_key}_sources"]]
+    for agent_key in EXPERT_LENSES:
+        data[f"{agent_key}_claims"] = [asdict(c) for c in state[f"{agent_key}_claims"]]
+    data["fact_checks"] = [asdict(result) for result in state["fact_checks"]]
+    return data
+
+
+def _load_state(data: dict) -> PipelineState:
+    # The source registry is left out: SourceRegistry.from_state rebuilds it
+    # from the source lists in pipeline order, as the fact checker does.
+    state = {
+        "query": data["query"],
+        "language": data["language"],
+        "synthesis": data.get("synthesis", ""),
+        "fact_checks": [
+            FactCheckResult(
+                claim=_claim(item["claim"]),
+                verdict=item["verdict"],
+                rationale=item["rationale"],
+            )
+            for item in data.get("fact_checks", [])
+        ],
+        "result": None,
+    }
+    for agent_key in SEARCH_AGENTS:
+        key = f"{agent_key}_sources"
+        state[key] = [Source(**item) for item in data.get(key, [])]
+    for agent_key in EXPERT_LENSES:
+        key = f"{agent_key}_claims"
+        state[key] = [_claim(item) for item in data.get(key, [])]
+    return state
+
+
+def _write_json(path: str, data: object) -> None:
+    # Replace atomically so a crash never leaves a half-written file behind.
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as handle:
+        json.dump(data, handle, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+class BulkRun:
+    """A resumable bulk run over a fixed list of queries, kept in ``directory``.
+
+    Items are read once, when the run directory is first used; restarting
+    with the same directory resumes that run. ``seed_sources`` replaces web
+    search as in :func:`~geopoliticai.graph.run_pipeline`.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        backend: BatchBackend,
+        poll_interval: float = 60.0,
+        search_concurrency: int = 4,
+        seed_sources: Optional[Union[List[Source], Dict[str, List[Source]]]] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if search_concurrency < 1:
+            raise ValueError("search_concurrency must be at least 1")
+        self.directory = directory
+        self.backend = backend
+        self.poll_interval = poll_interval
+        self.search_concurrency = search_concurrency
+        self.seed_sources = seed_sources
+        self._sleep = sleep
+        os.makedirs(directory, exist_ok=True)
+        self.manifest = self._read_json("manifest.json") or {
+            "phase": SEARCH,
+            "model": get_model(),
+            "batches": {},
+        }
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _read_json(self, name: str) -> Optional[dict]:
+        path = self._path(name)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as handle:
+            return json.load(handle)
+
+    def _save_manifest(self) -> None:
+        _write_json(self._path("manifest.json"), self.manifest)
+
+    @property
+    def phase(self) -> str:
+        return self.manifest["phase"]
+
+    def _advance(self, phase: str) -> None:
+        logger.info("Bulk run %s: phase %s -> %s", self.directory, self.phase, phase)
+        self.manifest["phase"] = phase
+        self._save_manifest()
+
+    # -- search -------------------------------------------------------------
+
+    def _items(self, items: Iterable[BatchItem]) -> List[BatchItem]:
+        """The run's items: persisted ones on a resumed run, else ``items``."""
+        persisted = self._read_json("items.json")
+        if persisted is not None:
+            return [BatchItem(**item) for item in persisted]
+        items = list(items)
+        if not items:
+            raise ValueError("Bulk run has no items; pass the input to start a run")
+        ids = [item.id for item in items]
+        if len(set(ids)) != len(ids):
+            raise ValueError("Bulk item ids must be unique")
+        _write_json(self._path("items.json"), [asdict(item) for item in items])
+        return items
+
+    def _searched(self) -> Dict[str, dict]:
+        records: Dict[str, dict] = {}
+        path = self._path("searched.jsonl")
+        if not os.path.exists(path):
+            return records
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-write can leave a truncated final line.
+                    continue
+                records[record["id"]] = record
+        return records
+
+    def _search_item(self, item: BatchItem) -> dict:
+        record = {"id": item.id, "query": item.query, "infosphere": item.infosphere}
+        try:
+            references = get_infosphere_sources(item.infosphere)
+            state = {"query": item.query}
+            with rate_limit_scope(BATCH, caller=f"bulk:{item.id}"):
+                record["sources"] = {
+                    agent_key: [
+                        asdict(source)
+                        for source in web_searcher(
+                            state, agent_key, references[agent_key], self.seed_sources
+                        )
+                    ]
+                    for agent_key in SEARCH_AGENTS
+                }
+        except Exception as exc:
+            logger.warning("Bulk item %s search failed: %s", item.id, exc)
+            record["error"] = f"search: {type(exc).__name__}: {exc}"
+        return record
+
+    def _run_search(self, items: List[BatchItem]) -> None:
+        searched = self._searched()
+        pending = [item for item in items if item.id not in searched]
+        logger.info("Bulk search: pending=%d done=%d", len(pending), len(searched))
+        with open(self._path("searched.jsonl"), "a", encoding="utf-8") as output, (
+            ThreadPoolExecutor(max_workers=self.search_concurrency)
+        ) as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, self._search_item, item)
+                for item in pending
+            ]
+            for future in futures:
+                record = future.result()
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                output.flush()
+                searched[record["id"]] = record
+
+        entries = []
+        for item in items:
+            record = searched[item.id]
+            state = {"query": item.query, "language": _language(item.infosphere)}
+            for agent_key, sources in record.get("sources", {}).items():
+                state[f"{agent_key}_sources"] = sources
+            entries.append(
+                {
+                    "id": item.id,
+                    "infosphere": item.infosphere,
+                    "error": record.get("error"),
+                    "state": state,
+                }
+            )
+        _write_json(self._path("states.json"), entries)
+        self._advance(CLAIMS)
+
+    # -- LLM phases ------------------------------------------------------------
+
+    def _requests(
+        self, phase: str, entry: dict, state: PipelineState
+    ) -> List[Tuple[str, Tuple[str, str]]]:
+        """``(part, (system, user))`` for every request ``phase`` needs for one item."""
+        references = get_infosphere_sources(entry["infosphere"])
+        language = state["language"]
+        if phase == CLAIMS:
+            return [
+                (
+                    agent_key,
+                    claims_request(
+                        state,
+                        lens,
+                        state[f"{agent_key}_sources"],
+                        references[agent_key],
+                        language,
+                    ),
+                )
+                for agent_key, lens in EXPERT_LENSES.items()
+            ]
+        if phase == FACT_CHECK:
+            return [
+                (str(index), messages)
+                for index, messages in enumerate(
+                    fact_check_requests(state, references["fact"], language)
+                )
+            ]
+        return [("synthesis", summary_request(state, language))]
+
+    def _apply(
+        self,
+        phase: str,
+        state: PipelineState,
+        answers: Dict[str, BatchAnswer],
+        parts: List[str],
+    ) -> None:
+        """Fold one item's answers into ``state``; raises if the item cannot continue."""
+        if phase == FACT_CHECK:
+            outcomes = [
+                ValueError(answer.error) if answer.error else answer.data
+                for answer in (answers[part] for part in parts)
+            ]
+            state.update(merge_fact_check_answers(state, outcomes))
+            return
+        for part in parts:
+            answer = answers[part]
+            if answer.error is not None:
+                raise ValueError(f"{part}: {answer.error}")
+            if phase == CLAIMS:
+                state[f"{part}_claims"] = parse_claims(answer.data)
+            else:
+                state.update(parse_summary(answer.data))
+
+    def _wait(self, batch_id: str) -> str:
+        while True:
+            status = self.backend.status(batch_id)
+            if status in TERMINAL_STATUSES:
+                return status
+            logger.info("Bulk batch %s: %s", batch_id, status)
+            self._sleep(self.poll_interval)
+
+    def _run_llm_phase(self, phase: str, next_phase: str) -> None:
+        entries = self._read_json("states.json")
+        states = {
+            entry["id"]: _load_state(entry["state"])
+            for entry in entries
+            if entry["error"] is None
+        }
+        # Prompts are rebuilt from the persisted states on every pass, so a
+        # resumed run maps answers back without storing the requests.
+        parts: Dict[str, List[str]] = {}
+        requests = []
+        model = self.manifest["model"]
+        for index, entry in enumerate(entries):
+            if entry["error"] is not None:
+                continue
+            item_parts = []
+            for part, (system, user) in self._requests(phase, entry, states[entry["id"]]):
+                item_parts.append(part)
+                requests.append(batch_request(f"{index}:{part}", model, system, user))
+            parts[entry["id"]] = item_parts
+
+        batches = self.manifest["batches"]
+        if requests and phase not in batches:
+            path = self._path(f"{phase}.requests.jsonl")
+            count = write_requests(path, requests)
+            batches[phase] = self.backend.submit(path)
+            self._save_manifest()
+            logger.info(
+                "Bulk %s: submitted %d requests as %s", phase, count, batches[phase]
+            )
+
+        answers: Dict[str, BatchAnswer] = {}
+        if requests:
+            batch_id = batches[phase]
+            status = self._wait(batch_id)
+            if status != COMPLETED:
+                del batches[phase]
+                self._save_manifest()
+                raise BulkBatchError(f"Batch {batch_id} for {phase} ended {status}")
+            answers = {
+                answer.custom_id: answer for answer in self.backend.results(batch_id)
+            }
+            self._log_usage(phase, answers.values())
+
+        missing = BatchAnswer(custom_id="", error="No answer in batch output")
+        for index, entry in enumerate(entries):
+            if entry["error"] is not None:
+                continue
+            state = states[entry["id"]]
+            by_part = {
+                part: answers.get(f"{index}:{part}", missing)
+                for part in parts[entry["id"]]
+            }
+            try:
+                self._apply(phase, state, by_part, parts[entry["id"]])
+            except Exception as exc:
+                logger.warning("Bulk item %s %s failed: %s", entry["id"], phase, exc)
+                entry["error"] = f"{phase}: {type(exc).__name__}: {exc}"
+                continue
+            entry["state"] = _dump_state(state)
+        _write_json(self._path("states.json"), entries)
+        self._advance(next_phase)
+
+    def _log_usage(self, phase: str, answers: Iterable[BatchAnswer]) -> None:
+        prompt_tokens = completion_tokens = 0
+        for answer in answers:
+            prompt_tokens += answer.prompt_tokens
+            completion_tokens += answer.completion_tokens
+        logger.info(
+            "Bulk %s usage: prompt_tokens=%d completion_tokens=%d cost=$%.4f "
+            "(list price; batch discounts not applied)",
+            phase,
+            prompt_tokens,
+            completion_tokens,
+            estimate_cost(self.manifest["model"], prompt_tokens, completion_tokens),
+        )
+
+    # -- driver ----------------------------------------------------------------
+
+    def _records(self) -> Iterator[dict]:
+        for entry in self._read_json("states.json"):
+            state = entry["state"]
+            record = {
+                "id": entry["id"],
+                "query": state["query"],
+                "infosphere": entry["infosphere"],
+            }
+            if entry["error"] is not None:
+                record.update(status="error", error=entry["error"])
+            else:
+                result = PipelineResult.from_state(
+                    _load_state(state), entry["infosphere"]
+                )
+                record.update(status="ok", output=result.text)
+            yield record
+
+    def run(self, items: Iterable[BatchItem] = ()) -> Iterator[dict]:
+        """Drive the run to completion, then yield one record per query.
+
+        Records have the shape :func:`~geopoliticai.batch.run_pipeline_batch`
+        yields, in input order. ``items`` is only read when the run directory
+        is new; a resumed run may pass nothing.
+        """
+        if self.phase == SEARCH:
+            self._run_search(self._items(items))
+        if self.phase == CLAIMS:
+            self._run_llm_phase(CLAIMS, FACT_CHECK)
+        if self.phase == FACT_CHECK:
+            self._run_llm_phase(FACT_CHECK, SUMMARY)
+        if self.phase == SUMMARY:
+            self._run_llm_phase(SUMMARY, DONE)
+        yield from self._records()
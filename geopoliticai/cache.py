@@ -0,0 +1,341 @@
+"""Caching primitives shared by the LLM and search layers."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from geopoliticai.ratelimit import PriorityBoost, priority_boost
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Return a stable content hash for the given JSON-serialisable parts."""
+    encoded = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    disk_hits: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    coalesced: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache with a per-entry time-to-live."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        default_ttl: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.stats = CacheStats()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Return ``(value, age_seconds)`` for a live entry, or ``None``."""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            stored_at, expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return value, now - stored_at
+
+    def get(self, key: str) -> Any:
+        entry = self.get_entry(key)
+        return None if entry is None else entry[0]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        now = self._clock()
+        expires_at = now + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (now, expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteStore:
+    """On-disk cache tier storing JSON values with an absolute expiry."""
+
+    def __init__(self, path: str, max_entries: int = 10000) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)"
+            )
+
+    def get(self, key: str) -> Any:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+            self._conn.execute(
+                "UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now + ttl, now),
+            )
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN ("
+                "SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "boost")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.boost = PriorityBoost()
+
+
+class _Flight:
+    __slots__ = ("task", "waiters", "boost")
+
+    def __init__(self, task: "asyncio.Future[Any]", boost: PriorityBoost) -> None:
+        self.task = task
+        self.waiters = 0
+        self.boost = boost
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into a single execution.
+
+    The execution runs in the first caller's context, but its upstream calls
+    queue at the most urgent rate-limit priority of every caller waiting on
+    it, so an interactive caller never waits on a batch-priority execution.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._tasks: Dict[Tuple[int, str], _Flight] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run ``fn`` once per key; returns ``(result, shared)``."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.boost.join()
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            with priority_boost(call.boost):
+                call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result, False
+
+    async def ado(
+        self, key: str, fn: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """Async variant of :meth:`do`; followers await the leader's task.
+
+        The shared task is reference counted: a cancelled caller detaches
+        from it, and only when the last caller is cancelled is the task
+        itself cancelled.
+        """
+        task_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            flight = self._tasks.get(task_key)
+            shared = flight is not None
+            if shared:
+                flight.boost.join()
+            else:
+                boost = PriorityBoost()
+                # The task copies the current context, boost included.
+                with priority_boost(boost):
+                    task = asyncio.ensure_future(fn())
+                flight = self._tasks[task_key] = _Flight(task, boost)
+                flight.task.add_done_callback(lambda _: self._forget(task_key, flight))
+            flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task), shared
+        except asyncio.CancelledError:
+            if not flight.task.done():
+                self._detach(task_key, flight)
+            raise
+        finally:
+            with self._lock:
+                flight.waiters -= 1
+
+    def _detach(self, task_key: Tuple[int, str], flight: _Flight) -> None:
+        with self._lock:
+            if flight.waiters > 1:
+                return
+            # Later callers must start afresh rather than join a dying task.
+            if self._tasks.get(task_key) is flight:
+                del self._tasks[task_key]
+        flight.task.cancel()
+
+    def _forget(self, task_key: Tuple[int, str], flight: _Flight) -> None:
+        with self._lock:
+            if self._tasks.get(task_key) is flight:
+                del self._tasks[task_key]
+
+
+class ResponseCache:
+    """Two-tier (memory + optional disk) cache with single-flight fills."""
+
+    def __init__(
+        self,
+        memory: TTLCache,
+        disk: Optional[SQLiteStore] = None,
+        ttl: Optional[float] = None,
+    ) -> None:
+        self.memory = memory
+        self.disk = disk
+        self.ttl = memory.default_ttl if ttl is None else ttl
+        self._flight = SingleFlight()
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.memory.stats
+
+    def get(self, key: str) -> Any:
+        value = self.memory.get(key)
+        if value is not None or self.disk is None:
+            return value
+        value = self.disk.get(key)
+        if value is not None:
+            self.memory.stats.disk_hits += 1
+            self.memory.set(key, value, self.ttl)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, value, self.ttl)
+        if self.disk is not None:
+            self.disk.set(key, value, self.ttl)
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def get_or_compute(self, key: str, fn: Callable[[], Any]) -> Any:
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        def fill() -> Any:
+            value = fn()
+            self.set(key, value)
+            return value
+
+        value, shared = self._flight.do(key, fill)
+        if shared:
+            self.memory.stats.coalesced += 1
+        return value
+
+    async def aget_or_compute(
+        self, key: str, fn: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        async def fill() -> Any:
+            value = await fn()
+            self.set(key, value)
+            return value
+
+        value, shared = await self._flight.ado(key, fill)
+        if shared:
+            self.memory.stats.coalesced += 1
+        return value
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
@@ -2,27 +2,45 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import List
+import os
+import threading
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
 
-from geopoliticai.config import ENGLISH_INFOSPHERE_SOURCES
-from geopoliticai.llm import llm_json
+from geopoliticai.config import ENGLISH_INFOSPHERE_SOURCES, env_int
+from geopoliticai.llm import allm_json, llm_json
 from geopoliticai.models import Claim, PipelineState, Source
+from geopoliticai.prompts import build_prompt, compact_sources, source_lines
 
 logger = logging.getLogger(__name__)
 
 
-def build_claims(
+_CLAIMS_SYSTEM = "You are a political analyst who writes precise, source-grounded claims."
+_REFERENCES_HEADER = "Preferred references (use for framing; do not invent citations):"
+
+PER_LENS = "per_lens"
+MULTI_LENS = "multi_lens"
+
+# (lens, sources, preferred references) for one perspective of a multi-lens request.
+LensInput = Tuple[str, List[Source], Sequence[Tuple[str, str]]]
+
+
+def expert_mode() -> str:
+    """EXPERT_MODE: one claims request per lens, or one for all lenses."""
+    mode = os.getenv("EXPERT_MODE", PER_LENS).strip().lower()
+    if mode not in (PER_LENS, MULTI_LENS):
+        raise ValueError(f"Unknown EXPERT_MODE: {mode}")
+    return mode
+
+
+def _claims_prompt(
     state: PipelineState,
     lens: str,
     sources: List[Source],
-    references: List[tuple[str, str]] | None = None,
+    references: Sequence[tuple[str, str]] | None = None,
     language: str | None = None,
-) -> List[Claim]:
-    logger.info("Building claims: lens=%s sources=%d", lens, len(sources))
-    source_block = "\n".join(
-        f"{s.id}: {s.title} - {s.notes} ({s.url})" for s in sources
-    )
+) -> str:
     if references is None:
         if lens == "leftist":
             reference_sources_list = ENGLISH_INFOSPHERE_SOURCES["left"]
@@ -34,19 +52,19 @@ def build_claims(
             reference_sources_list = ENGLISH_INFOSPHERE_SOURCES["right"]
     else:
         reference_sources_list = references
-    reference_block = "\n".join(
-        f"- {name} ({url})" for name, url in reference_sources_list
-    )
+    reference_lines = [f"- {name} ({url})" for name, url in reference_sources_list]
     response_language = "Polish" if language == "polish" else "English"
-    user = f"""
+
+    def render(blocks: dict[str, str]) -> str:
+        return f"""
 Query: {state['query']}
 Response language: {response_language}
 
 Sources:
-{source_block}
+{blocks["sources"]}
 
-Preferred references (use for framing; do not invent citations):
-{reference_block}
+{_REFERENCES_HEADER}
+{blocks["references"]}
 
 Task: Provide 3-5 analytically cautious claims from the perspective: {lens}.
 - Use only the sources provided.
@@ -54,10 +72,28 @@ Task: Provide 3-5 analytically cautious claims from the perspective: {lens}.
 Return JSON: {{"claims": [{{"text": "...", "source_ids": ["S1", "S2"]}}]}}.
 """.strip()
 
-    data = llm_json(
-        system="You are a political analyst who writes precise, source-grounded claims.",
-        user=user,
+    return build_prompt(
+        f"claims:{lens}",
+        render,
+        {"sources": source_lines(compact_sources(sources)), "references": reference_lines},
+        drop_order=(("references", 0), ("sources", 1)),
+        budget=env_int("PROMPT_BUDGET_CLAIMS", 3000),
+        raw_sections={"sources": source_lines(sources), "references": reference_lines},
     )
+
+
+def claims_request(
+    state: PipelineState,
+    lens: str,
+    sources: List[Source],
+    references: Sequence[tuple[str, str]] | None = None,
+    language: str | None = None,
+) -> Tuple[str, str]:
+    """``(system, user)`` messages asking for one lens's claims."""
+    return _CLAIMS_SYSTEM, _claims_prompt(state, lens, sources, references, language)
+
+
+def parse_claims(data: dict) -> List[Claim]:
     claims = []
     for item in data.get("claims", []):
         text = (item.get("text") or "").strip()
@@ -67,22 +103,196 @@ Return JSON: {{"claims": [{{"text": "...", "source_ids": ["S1", "S2"]}}]}}.
     return claims
 
 
-def leftist_expert(state: PipelineState) -> PipelineState:
-    return {
-        **state,
-        "left_claims": build_claims(state, "leftist", state["left_sources"]),
-    }
+def _multi_lens_prompt(
+    state: PipelineState, lenses: Sequence[LensInput], language: str | None = None
+) -> str:
+    response_language = "Polish" if language == "polish" else "English"
+    names = [lens for lens, _, _ in lenses]
+    sections: Dict[str, List[str]] = {}
+    raw_sections: Dict[str, List[str]] = {}
+    for lens, sources, references in lenses:
+        reference_lines = [f"- {name} ({url})" for name, url in references]
+        sections[f"{lens}:sources"] = source_lines(compact_sources(sources))
+        sections[f"{lens}:references"] = reference_lines
+        raw_sections[f"{lens}:sources"] = source_lines(sources)
+        raw_sections[f"{lens}:references"] = reference_lines
 
+    def render(blocks: dict[str, str]) -> str:
+        parts = [f"Query: {state['query']}", f"Response language: {response_language}"]
+        for lens in names:
+            parts.append(
+                f"""
+Lens: {lens}
+Sources:
+{blocks[f"{lens}:sources"]}
 
-def centrist_expert(state: PipelineState) -> PipelineState:
-    return {
-        **state,
-        "centrist_claims": build_claims(state, "centrist", state["centrist_sources"]),
-    }
+{_REFERENCES_HEADER}
+{blocks[f"{lens}:references"]}"""
+            )
+        parts.append(
+            f"""
+Task: For each lens above, provide 3-5 analytically cautious claims from that perspective.
+- Use only the sources listed under that lens.
+- Each claim must cite one or more source IDs from that lens.
+Return JSON with one key per lens ({", ".join(names)}): \
+{{"claims_by_lens": {{"{names[0]}": [{{"text": "...", "source_ids": ["S1", "S2"]}}]}}}}."""
+        )
+        return "\n".join(parts).strip()
+
+    return build_prompt(
+        "claims:multi_lens",
+        render,
+        sections,
+        drop_order=[(f"{lens}:references", 0) for lens in names]
+        + [(f"{lens}:sources", 1) for lens in names],
+        budget=env_int("PROMPT_BUDGET_CLAIMS", 3000) * len(names),
+        raw_sections=raw_sections,
+    )
+
+
+def _parse_multi_lens(
+    data: dict, lenses: Sequence[LensInput]
+) -> Dict[str, List[Claim]]:
+    """Claims of each lens whose answer is usable; failed lenses are left out.
+
+    A lens passes when it has at least one claim and every claim cites a
+    source of that lens (when the lens has sources at all).
+    """
+    by_lens = data.get("claims_by_lens") if isinstance(data, dict) else None
+    if not isinstance(by_lens, dict):
+        return {}
+    valid: Dict[str, List[Claim]] = {}
+    for lens, sources, _ in lenses:
+        items = by_lens.get(lens)
+        if not isinstance(items, list):
+            continue
+        try:
+            claims = parse_claims({"claims": items})
+        except AttributeError:
+            continue
+        known = {source.id for source in sources}
+        if claims and (
+            not known or all(known.intersection(claim.source_ids) for claim in claims)
+        ):
+            valid[lens] = claims
+    return valid
+
+
+def build_claims(
+    state: PipelineState,
+    lens: str,
+    sources: List[Source],
+    references: Sequence[tuple[str, str]] | None = None,
+    language: str | None = None,
+) -> List[Claim]:
+    logger.info("Building claims: lens=%s sources=%d", lens, len(sources))
+    system, user = claims_request(state, lens, sources, references, language)
+    data = llm_json(system=system, user=user)
+    return parse_claims(data)
 
 
-def right_expert(state: PipelineState) -> PipelineState:
+async def abuild_claims(
+    state: PipelineState,
+    lens: str,
+    sources: List[Source],
+    references: Sequence[tuple[str, str]] | None = None,
+    language: str | None = None,
+) -> List[Claim]:
+    logger.info("Building claims (async): lens=%s sources=%d", lens, len(sources))
+    system, user = claims_request(state, lens, sources, references, language)
+    data = await allm_json(system=system, user=user)
+    return parse_claims(data)
+
+
+def build_multi_lens_claims(
+    state: PipelineState, lenses: Sequence[LensInput], language: str | None = None
+) -> Dict[str, List[Claim]]:
+    """Claims for several lenses from one request.
+
+    Lenses missing from the answer or failing validation are retried with
+    their own :func:`build_claims` call.
+    """
+    logger.info("Building claims: lenses=%s", ",".join(lens for lens, _, _ in lenses))
+    try:
+        data = llm_json(
+            system=_CLAIMS_SYSTEM, user=_multi_lens_prompt(state, lenses, language)
+        )
+    except ValueError as exc:
+        logger.warning("Multi-lens claims request failed (%s); falling back", exc)
+        data = {}
+    claims = _parse_multi_lens(data, lenses)
+    for lens, sources, references in lenses:
+        if lens not in claims:
+            logger.warning("Multi-lens answer invalid for lens=%s; asking separately", lens)
+            claims[lens] = build_claims(state, lens, sources, references, language)
+    return claims
+
+
+async def abuild_multi_lens_claims(
+    state: PipelineState, lenses: Sequence[LensInput], language: str | None = None
+) -> Dict[str, List[Claim]]:
+    logger.info(
+        "Building claims (async): lenses=%s", ",".join(lens for lens, _, _ in lenses)
+    )
+    try:
+        data = await allm_json(
+            system=_CLAIMS_SYSTEM, user=_multi_lens_prompt(state, lenses, language)
+        )
+    except ValueError as exc:
+        logger.warning("Multi-lens claims request failed (%s); falling back", exc)
+        data = {}
+    claims = _parse_multi_lens(data, lenses)
+    failed = [item for item in lenses if item[0] not in claims]
+    for lens, _, _ in failed:
+        logger.warning("Multi-lens answer invalid for lens=%s; asking separately", lens)
+    retried = await asyncio.gather(
+        *(
+            abuild_claims(state, lens, sources, references, language)
+            for lens, sources, references in failed
+        )
+    )
+    claims.update((lens, result) for (lens, _, _), result in zip(failed, retried))
+    return claims
+
+
+class ExpertBatch:
+    """A multi-lens claims request shared by the expert nodes of one run.
+
+    In the parallel graph all four experts run in the same step, after
+    every searcher has finished, so the first expert to run can ask for
+    all lenses at once; the others wait for it and take their share.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._claims: Optional[Dict[str, List[Claim]]] = None
+        self._task: Optional["asyncio.Future[Dict[str, List[Claim]]]"] = None
+
+    def claims(
+        self, compute: Callable[[], Dict[str, List[Claim]]]
+    ) -> Dict[str, List[Claim]]:
+        with self._lock:
+            if self._claims is None:
+                self._claims = compute()
+            return self._claims
+
+    async def aclaims(
+        self, compute: Callable[[], Awaitable[Dict[str, List[Claim]]]]
+    ) -> Dict[str, List[Claim]]:
+        if self._task is None:
+            self._task = asyncio.ensure_future(compute())
+        return await self._task
+
+
+def leftist_expert(state: PipelineState) -> dict:
+    return {"left_claims": build_claims(state, "leftist", state["left_sources"])}
+
+
+def centrist_expert(state: PipelineState) -> dict:
     return {
-        **state,
-        "right_claims": build_claims(state, "right-wing", state["right_sources"]),
+        "centrist_claims": build_claims(state, "centrist", state["centrist_sources"])
     }
+
+
+def right_expert(state: PipelineState) -> dict:
+    return {"right_claims": build_claims(state, "right-wing", state["right_sources"])}
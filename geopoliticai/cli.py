@@ -1,19 +1,193 @@
-"""Command-line interface for the GeopoliticAI pipeline."""
+"""Command-line interface for the GeopoliticAI pipeline.
+
+The pipeline modules (and through them langgraph, openai and httpx) are
+imported only once a command actually runs, so ``--help`` and argument
+errors return without loading them.
+"""
 
 from __future__ import annotations
 
 import argparse
+import json
+import os
 import sys
+from typing import IO, Optional, Sequence
 
 from geopoliticai.config import init_environment, require_env
-from geopoliticai.graph import run_pipeline
 
 
-def main() -> None:
-    init_environment()
+def _write_line(stream: IO[bytes], text: str) -> None:
+    stream.write(text.encode("utf-8", errors="replace") + b"\n")
+    stream.flush()
+
+
+async def _run_batch(args: argparse.Namespace) -> int:
+    from geopoliticai.batch import load_checkpoint, read_batch_items, run_pipeline_batch
+    from geopoliticai.clients import aclose_clients
+
+    completed = load_checkpoint(args.checkpoint) if args.checkpoint else set()
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    output = (
+        sys.stdout.buffer if args.output == "-" else open(args.output, "ab")
+    )
+    checkpoint = open(args.checkpoint, "ab") if args.checkpoint else None
+    failures = 0
+    try:
+        items = read_batch_items(source, default_infosphere=args.infosphere)
+        async for record in run_pipeline_batch(
+            items, concurrency=args.concurrency, completed=completed
+        ):
+            line = json.dumps(record, ensure_ascii=False)
+            _write_line(output, line)
+            if checkpoint is not None:
+                _write_line(checkpoint, line)
+            if record["status"] != "ok":
+                failures += 1
+    except ValueError as exc:
+        # A malformed input line.
+        print(f"geopoliticai batch: {exc}", file=sys.stderr)
+        return 2
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout.buffer:
+            output.close()
+        if checkpoint is not None:
+            checkpoint.close()
+        await aclose_clients()
+    return 1 if failures else 0
+
+
+def batch_main(argv: Sequence[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="geopoliticai batch",
+        description="Run many queries (JSONL) through the pipeline.",
+    )
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default="-",
+        help="JSONL file with one query string or {id, query, infosphere} per line "
+        "('-' for stdin).",
+    )
+    parser.add_argument(
+        "--output", default="-", help="Where to append JSONL results ('-' for stdout)."
+    )
+    parser.add_argument(
+        "--checkpoint",
+        help="JSONL checkpoint file; ids already completed there are skipped.",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Maximum queries in flight."
+    )
+    parser.add_argument(
+        "--infosphere",
+        choices=("english", "polish"),
+        default="english",
+        help="Default infosphere for lines that do not set one.",
+    )
+    args = parser.parse_args(argv)
+    require_env()
+
+    import asyncio
+
+    return asyncio.run(_run_batch(args))
+
+
+def _run_bulk(args: argparse.Namespace) -> int:
+    from geopoliticai.batch import read_batch_items
+    from geopoliticai.batch_api import LocalBatchBackend, OpenAIBatchBackend
+    from geopoliticai.bulk import BulkRun
+    from geopoliticai.clients import close_clients
+
+    if args.simulate:
+        backend = LocalBatchBackend(os.path.join(args.workdir, "local_batches"))
+    else:
+        backend = OpenAIBatchBackend()
+    run = BulkRun(
+        args.workdir,
+        backend,
+        poll_interval=args.poll_interval,
+        search_concurrency=args.concurrency,
+    )
+    items = ()
+    if args.input is not None:
+        with open(args.input, encoding="utf-8") as source:
+            items = list(read_batch_items(source, default_infosphere=args.infosphere))
+    output = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    failures = 0
+    try:
+        for record in run.run(items):
+            _write_line(output, json.dumps(record, ensure_ascii=False))
+            if record["status"] != "ok":
+                failures += 1
+    except ValueError as exc:
+        print(f"geopoliticai bulk: {exc}", file=sys.stderr)
+        return 2
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+        close_clients()
+    return 1 if failures else 0
+
+
+def bulk_main(argv: Sequence[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="geopoliticai bulk",
+        description="Run many queries (JSONL) through the provider Batch API, one "
+        "pipeline phase at a time. Rerun with the same --workdir to resume.",
+    )
+    parser.add_argument(
+        "input",
+        nargs="?",
+        help="JSONL file with one query string or {id, query, infosphere} per line; "
+        "only read when the run directory is new.",
+    )
+    parser.add_argument(
+        "--workdir", required=True, help="Run directory holding the persisted phases."
+    )
+    parser.add_argument(
+        "--output", default="-", help="Where to write JSONL results ('-' for stdout)."
+    )
+    parser.add_argument(
+        "--simulate",
+        action="store_true",
+        help="Process batches locally with a fake model instead of the provider.",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=60.0,
+        help="Seconds between batch status checks.",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Maximum searches in flight."
+    )
+    parser.add_argument(
+        "--infosphere",
+        choices=("english", "polish"),
+        default="english",
+        help="Default infosphere for lines that do not set one.",
+    )
+    args = parser.parse_args(argv)
     require_env()
+    return _run_bulk(args)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    init_environment()
+
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv and argv[0] == "batch":
+        sys.exit(batch_main(argv[1:]))
+    if argv and argv[0] == "bulk":
+        sys.exit(bulk_main(argv[1:]))
 
-    parser = argparse.ArgumentParser(description="Run GeopoliticAI POC pipeline.")
+    parser = argparse.ArgumentParser(
+        description="Run GeopoliticAI POC pipeline.",
+        epilog="Use 'batch --help' to run many queries from a JSONL file, or "
+        "'bulk --help' to run them offline through the Batch API.",
+    )
     parser.add_argument("query", help="Query to analyze")
     parser.add_argument(
         "--infosphere",
@@ -21,12 +195,46 @@ def main() -> None:
         default="english",
         help="Which infosphere sources to use.",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse claims and fact checks from the last run of this query where "
+        "its sources are unchanged (snapshots in SNAPSHOT_STORE_PATH).",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("text", "json", "msgpack"),
+        default="text",
+        help="Print the text report, or the structured result as JSON or MessagePack.",
+    )
+    args = parser.parse_args(argv)
+    if args.format == "msgpack":
+        from geopoliticai.serialization import msgpack_available
 
-    output = run_pipeline(args.query, infosphere=args.infosphere)
-    data = str(output).encode("utf-8", errors="replace")
-    sys.stdout.buffer.write(data + b"\n")
-    sys.stdout.flush()
+        # Fail before the run, not after paying for it.
+        if not msgpack_available():
+            parser.error("--format msgpack needs ormsgpack or msgpack installed.")
+    require_env()
+
+    from geopoliticai.graph import run_pipeline
+    from geopoliticai.serialization import JSON, MSGPACK, dumps
+
+    result = run_pipeline(
+        args.query,
+        infosphere=args.infosphere,
+        incremental=args.incremental,
+        structured=True,
+    )
+    if args.format == "text":
+        _write_line(sys.stdout.buffer, result.text)
+        return
+    media_type = JSON if args.format == "json" else MSGPACK
+    try:
+        data = dumps(result, media_type)
+    except ValueError as exc:
+        parser.error(str(exc))
+    sys.stdout.buffer.write(data + (b"\n" if media_type == JSON else b""))
+    sys.stdout.buffer.flush()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,300 @@
+"""Long-lived, pooled HTTP clients for OpenAI and Tavily.
+
+Every upstream call goes through one :class:`ClientManager`, which owns a
+keep-alive ``httpx`` connection pool per provider and per sync/async
+flavour, so TLS handshakes happen once per connection instead of once per
+call. Pool sizes come from the environment:
+
+* ``HTTP_MAX_CONNECTIONS`` - connections per pool (default 100).
+* ``HTTP_MAX_KEEPALIVE_CONNECTIONS`` - idle connections kept open (default 20).
+* ``HTTP_KEEPALIVE_EXPIRY`` - seconds an idle connection is kept (default 30).
+* ``HTTP2_ENABLED`` - negotiate HTTP/2 (default on); needs ``h2``, which the
+  ``httpx[http2]`` requirement installs.
+* ``SEARCH_TIMEOUT`` - seconds per Tavily request (default 60); OpenAI calls
+  carry their own per-attempt timeout (``LLM_TIMEOUT``).
+
+The API opens and closes the manager with the application; the CLI closes
+it when a batch run ends. ``httpx`` and the OpenAI SDK are imported when the
+first client is built, not with this module.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from geopoliticai.config import env_flag, env_float, env_int
+
+if TYPE_CHECKING:
+    import httpx
+    from openai import AsyncOpenAI, OpenAI
+
+logger = logging.getLogger(__name__)
+
+TAVILY_API_URL = "https://api.tavily.com"
+
+_client_manager: "ClientManager | None" = None
+_client_manager_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = True
+    search_timeout: float = 60.0
+
+    @classmethod
+    def from_env(cls) -> "PoolSettings":
+        return cls(
+            max_connections=env_int("HTTP_MAX_CONNECTIONS", 100),
+            max_keepalive_connections=env_int("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20),
+            keepalive_expiry=env_float("HTTP_KEEPALIVE_EXPIRY", 30.0),
+            http2=env_flag("HTTP2_ENABLED", True),
+            search_timeout=env_float("SEARCH_TIMEOUT", 60.0),
+        )
+
+    @property
+    def limits(self) -> httpx.Limits:
+        import httpx
+
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def client_options(self) -> dict:
+        """Keyword arguments shared by every pooled ``httpx`` client."""
+        # httpx only speaks HTTP/2 with the optional h2 package installed.
+        http2 = self.http2 and importlib.util.find_spec("h2") is not None
+        return {"limits": self.limits, "http2": http2}
+
+
+def _tavily_payload(
+    query: str, max_results: int, search_depth: str, **options: Any
+) -> dict:
+    return {
+        "query": query,
+        "max_results": max_results,
+        "search_depth": search_depth,
+        **options,
+    }
+
+
+class TavilySearchClient:
+    """Tavily ``/search`` over a shared connection pool.
+
+    Stands in for the SDK's ``TavilyClient``, whose sync client goes through
+    ``requests`` and whose async client opens a new ``httpx.AsyncClient`` per
+    call; neither accepts a caller's pool. Only ``search`` is offered: a POST
+    of the SDK's JSON body to ``/search`` with Bearer auth, answered with the
+    SDK's response dict. Non-2xx answers raise ``httpx.HTTPStatusError``.
+    """
+
+    def __init__(self, api_key: str, http_client: httpx.Client) -> None:
+        self.api_key = api_key
+        self._http = http_client
+
+    def search(
+        self,
+        query: str,
+        max_results: int = 5,
+        search_depth: str = "basic",
+        **options: Any,
+    ) -> dict:
+        response = self._http.post(
+            "/search",
+            json=_tavily_payload(query, max_results, search_depth, **options),
+            headers={"Authorization": f"Bearer {self.api_key}"},
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+class AsyncTavilySearchClient:
+    """Async counterpart of :class:`TavilySearchClient`."""
+
+    def __init__(self, api_key: str, http_client: httpx.AsyncClient) -> None:
+        self.api_key = api_key
+        self._http = http_client
+
+    async def search(
+        self,
+        query: str,
+        max_results: int = 5,
+        search_depth: str = "basic",
+        **options: Any,
+    ) -> dict:
+        response = await self._http.post(
+            "/search",
+            json=_tavily_payload(query, max_results, search_depth, **options),
+            headers={"Authorization": f"Bearer {self.api_key}"},
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class _AsyncPools:
+    """The async clients opened on one event loop."""
+
+    __slots__ = ("openai", "tavily_http")
+
+    def __init__(self) -> None:
+        self.openai: AsyncOpenAI | None = None
+        self.tavily_http: httpx.AsyncClient | None = None
+
+    async def aclose(self) -> None:
+        if self.openai is not None:
+            await self.openai.close()
+        if self.tavily_http is not None:
+            await self.tavily_http.aclose()
+
+
+class ClientManager:
+    """Owns the pooled sync and async clients of both providers.
+
+    Clients are created on first use and reused until :meth:`close` (sync
+    pools) or :meth:`aclose` (all pools). Async pools belong to the event
+    loop they were opened on, since connections cannot move between loops;
+    each loop (e.g. a second ``asyncio.run``) gets its own pools, kept until
+    :meth:`aclose` or until their loop is closed.
+    """
+
+    def __init__(self, settings: Optional[PoolSettings] = None) -> None:
+        self.settings = settings or PoolSettings.from_env()
+        self._lock = threading.Lock()
+        self._openai: OpenAI | None = None
+        self._tavily_http: httpx.Client | None = None
+        self._async_pools: Dict[Optional[asyncio.AbstractEventLoop], _AsyncPools] = {}
+
+    def openai(self) -> OpenAI:
+        import httpx
+        from openai import OpenAI
+
+        with self._lock:
+            if self._openai is None:
+                # Retries are handled by llm._request_json so backoff and the
+                # breaker see them.
+                self._openai = OpenAI(
+                    max_retries=0,
+                    http_client=httpx.Client(**self.settings.client_options()),
+                )
+            return self._openai
+
+    def tavily(self, api_key: str) -> TavilySearchClient:
+        import httpx
+
+        with self._lock:
+            if self._tavily_http is None:
+                self._tavily_http = httpx.Client(
+                    base_url=TAVILY_API_URL,
+                    timeout=self.settings.search_timeout,
+                    **self.settings.client_options(),
+                )
+            return TavilySearchClient(api_key, self._tavily_http)
+
+    def _loop_pools(self) -> _AsyncPools:
+        """The running loop's pools; callers must hold ``_lock``."""
+        for loop in [loop for loop in self._async_pools if loop and loop.is_closed()]:
+            # Their connections died with their loop; nothing left to close.
+            del self._async_pools[loop]
+        loop = _running_loop()
+        pools = self._async_pools.get(loop)
+        if pools is None:
+            pools = self._async_pools[loop] = _AsyncPools()
+        return pools
+
+    def async_openai(self) -> AsyncOpenAI:
+        import httpx
+        from openai import AsyncOpenAI
+
+        with self._lock:
+            pools = self._loop_pools()
+            if pools.openai is None:
+                pools.openai = AsyncOpenAI(
+                    max_retries=0,
+                    http_client=httpx.AsyncClient(**self.settings.client_options()),
+                )
+            return pools.openai
+
+    def async_tavily(self, api_key: str) -> AsyncTavilySearchClient:
+        import httpx
+
+        with self._lock:
+            pools = self._loop_pools()
+            if pools.tavily_http is None:
+                pools.tavily_http = httpx.AsyncClient(
+                    base_url=TAVILY_API_URL,
+                    timeout=self.settings.search_timeout,
+                    **self.settings.client_options(),
+                )
+            return AsyncTavilySearchClient(api_key, pools.tavily_http)
+
+    def close(self) -> None:
+        """Close the sync pools; async pools are left to :meth:`aclose`."""
+        with self._lock:
+            openai_client, self._openai = self._openai, None
+            tavily_http, self._tavily_http = self._tavily_http, None
+        if openai_client is not None:
+            openai_client.close()
+        if tavily_http is not None:
+            tavily_http.close()
+
+    async def aclose(self) -> None:
+        """Close every pool.
+
+        The running loop's pools are closed here; pools of another loop that
+        is still open are closed on that loop, once it runs.
+        """
+        self.close()
+        with self._lock:
+            async_pools, self._async_pools = self._async_pools, {}
+        running = _running_loop()
+        for loop, pools in async_pools.items():
+            if loop is running:
+                await pools.aclose()
+            elif loop is not None and not loop.is_closed():
+                asyncio.run_coroutine_threadsafe(pools.aclose(), loop)
+
+
+def get_client_manager() -> ClientManager:
+    """Return the process-wide client manager, creating it on first use."""
+    global _client_manager
+    if _client_manager is None:
+        with _client_manager_lock:
+            if _client_manager is None:
+                _client_manager = ClientManager()
+    return _client_manager
+
+
+def set_client_manager(manager: Optional[ClientManager]) -> None:
+    global _client_manager
+    with _client_manager_lock:
+        _client_manager = manager
+
+
+def close_clients() -> None:
+    """Close the process-wide sync pools; the next call opens new ones."""
+    manager = _client_manager
+    if manager is not None:
+        manager.close()
+
+
+async def aclose_clients() -> None:
+    """Close all process-wide pools; the next call opens new ones."""
+    manager = _client_manager
+    if manager is not None:
+        await manager.aclose()
@@ -4,7 +4,8 @@ from __future__ import annotations
 
 import logging
 import os
-from collections.abc import Sequence
+from collections.abc import Mapping, Sequence
+from types import MappingProxyType
 
 from dotenv import load_dotenv
 
@@ -88,20 +89,70 @@ def get_model() -> str:
     return os.getenv("OPENAI_MODEL", DEFAULT_MODEL)
 
 
-def get_infosphere_sources(infosphere: str) -> dict[str, list[tuple[str, str]]]:
-    if infosphere == "english":
-        return ENGLISH_INFOSPHERE_SOURCES
-    if infosphere == "polish":
-        combined: dict[str, list[tuple[str, str]]] = {}
-        for key, english_sources in ENGLISH_INFOSPHERE_SOURCES.items():
-            merged = english_sources + POLISH_INFOSPHERE_SOURCES.get(key, [])
-            seen: set[str] = set()
-            unique: list[tuple[str, str]] = []
-            for name, url in merged:
-                if url in seen:
-                    continue
-                seen.add(url)
-                unique.append((name, url))
-            combined[key] = unique
-        return combined
-    raise ValueError(f"Unsupported infosphere: {infosphere}")
+def env_flag(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return int(value)
+    except ValueError as exc:
+        raise ValueError(f"{name} must be an integer, got {value!r}") from exc
+
+
+def env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return float(value)
+    except ValueError as exc:
+        raise ValueError(f"{name} must be a number, got {value!r}") from exc
+
+
+InfosphereSources = Mapping[str, tuple[tuple[str, str], ...]]
+INFOSPHERES = ("english", "polish")
+
+
+def _merge_infosphere(
+    base: dict[str, list[tuple[str, str]]],
+    extra: dict[str, list[tuple[str, str]]],
+) -> dict[str, list[tuple[str, str]]]:
+    combined: dict[str, list[tuple[str, str]]] = {}
+    for key, base_sources in base.items():
+        merged = base_sources + extra.get(key, [])
+        seen: set[str] = set()
+        unique: list[tuple[str, str]] = []
+        for name, url in merged:
+            if url in seen:
+                continue
+            seen.add(url)
+            unique.append((name, url))
+        combined[key] = unique
+    return combined
+
+
+def _freeze(sources: dict[str, list[tuple[str, str]]]) -> InfosphereSources:
+    return MappingProxyType({key: tuple(value) for key, value in sources.items()})
+
+
+_INFOSPHERE_TABLES: dict[str, InfosphereSources] = {
+    "english": _freeze(ENGLISH_INFOSPHERE_SOURCES),
+    "polish": _freeze(
+        _merge_infosphere(ENGLISH_INFOSPHERE_SOURCES, POLISH_INFOSPHERE_SOURCES)
+    ),
+}
+
+
+def get_infosphere_sources(infosphere: str) -> InfosphereSources:
+    """Return the precomputed, read-only reference table for an infosphere."""
+    try:
+        return _INFOSPHERE_TABLES[infosphere]
+    except KeyError:
+        raise ValueError(f"Unsupported infosphere: {infosphere}") from None
@@ -2,69 +2,92 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextvars
 import logging
-from typing import List
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Sequence, Tuple
 
-from geopoliticai.config import ENGLISH_INFOSPHERE_SOURCES
-from geopoliticai.llm import llm_json
-from geopoliticai.models import Claim, FactCheckResult, PipelineState
+from geopoliticai.config import ENGLISH_INFOSPHERE_SOURCES, env_int
+from geopoliticai.llm import allm_json, forget_llm_response, llm_json
+from geopoliticai.models import (
+    Claim,
+    FactCheckResult,
+    PipelineState,
+    Source,
+    all_claims,
+)
+from geopoliticai.prompts import build_prompt, compact_sources, source_lines
+from geopoliticai.sources import SourceRegistry
 
 logger = logging.getLogger(__name__)
 
 
-def fact_checker(
-    state: PipelineState,
-    references: List[tuple[str, str]] | None = None,
+_FACT_CHECK_SYSTEM = "You are a meticulous fact-checker who only uses the provided sources."
+_WORD_RE = re.compile(r"\w{4,}", re.UNICODE)
+
+
+class ShardError(RuntimeError):
+    """Raised when a shard's response cannot be used.
+
+    Not a ``ValueError``: the model, not the caller's input, is at fault.
+    """
+
+
+def _fact_check_prompt(
+    claims: Sequence[Claim],
+    sources: Sequence[Source],
+    references: Sequence[tuple[str, str]] | None = None,
     language: str | None = None,
-) -> PipelineState:
-    logger.info(
-        "Fact checking: claims=%d",
-        len(state["left_claims"])
-        + len(state["centrist_claims"])
-        + len(state["right_claims"])
-        + len(state["people_claims"]),
-    )
-    source_block = "\n".join(
-        f"{s.id}: {s.title} - {s.notes} ({s.url})" for s in state["fact_sources"]
-    )
-    claims = (
-        state["left_claims"]
-        + state["centrist_claims"]
-        + state["right_claims"]
-        + state["people_claims"]
-    )
-    claims_block = "\n".join(
+) -> str:
+    claim_lines = [
         f"- {c.text} (Sources: {', '.join(c.source_ids) if c.source_ids else 'none'})"
         for c in claims
-    )
+    ]
     if references is None:
         reference_sources_list = ENGLISH_INFOSPHERE_SOURCES["fact"]
     else:
         reference_sources_list = references
-    reference_block = "\n".join(
-        f"- {name} ({url})" for name, url in reference_sources_list
-    )
+    reference_lines = [f"- {name} ({url})" for name, url in reference_sources_list]
     response_language = "Polish" if language == "polish" else "English"
-    user = f"""
+
+    def render(blocks: dict[str, str]) -> str:
+        return f"""
 Sources:
-{source_block}
+{blocks["sources"]}
 
 Claims:
-{claims_block}
+{blocks["claims"]}
 
 Preferred fact-check references (use for methods; do not invent citations):
-{reference_block}
+{blocks["references"]}
 
 Task: Fact-check each claim against the sources. Use verdicts: TRUE, PARTIALLY TRUE, MISLEADING, FALSE.
 Write the rationale in {response_language}. Keep the verdict labels exactly as specified.
 Return JSON: {{"results": [{{"claim_text": "...", "verdict": "...", "rationale": "...", "source_ids": ["S1"]}}]}}.
 """.strip()
 
-    data = llm_json(
-        system="You are a meticulous fact-checker who only uses the provided sources.",
-        user=user,
+    # Every claim must stay in the prompt; only context is truncated.
+    return build_prompt(
+        "fact_check",
+        render,
+        {
+            "sources": source_lines(compact_sources(sources)),
+            "claims": claim_lines,
+            "references": reference_lines,
+        },
+        drop_order=(("references", 0), ("sources", 1)),
+        budget=env_int("PROMPT_BUDGET_FACT_CHECK", 6000),
+        raw_sections={
+            "sources": source_lines(sources),
+            "claims": claim_lines,
+            "references": reference_lines,
+        },
     )
 
+
+def _parse_fact_checks(data: dict) -> List[FactCheckResult]:
     results: List[FactCheckResult] = []
     for item in data.get("results", []):
         claim_text = (item.get("claim_text") or "").strip()
@@ -79,5 +102,278 @@ Return JSON: {{"results": [{{"claim_text": "...", "verdict": "...", "rationale":
                     rationale=rationale,
                 )
             )
+    return results
+
+
+def _words(text: str) -> set[str]:
+    return {word.lower() for word in _WORD_RE.findall(text)}
+
+
+def _relevant_sources(
+    claims: Sequence[Claim], sources: Sequence[Source], limit: int
+) -> List[Source]:
+    """Pick the fact sources sharing the most vocabulary with the shard's claims."""
+    if len(sources) <= limit:
+        return list(sources)
+    claim_words = set().union(*(_words(claim.text) for claim in claims))
+    scored = [
+        (len(claim_words & _words(f"{s.title} {s.notes}")), -index, s)
+        for index, s in enumerate(sources)
+    ]
+    scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
+    return [source for _, _, source in scored[:limit]]
+
+
+def _shards(claims: List[Claim], shard_size: int) -> List[List[Claim]]:
+    if shard_size <= 0 or len(claims) <= shard_size:
+        return [claims]
+    return [claims[i : i + shard_size] for i in range(0, len(claims), shard_size)]
+
+
+def _with_cited(
+    claims: Sequence[Claim], sources: List[Source], registry: SourceRegistry
+) -> List[Source]:
+    """``sources`` followed by the perspective sources ``claims`` cite."""
+    listed = {source.id for source in sources}
+    cited = registry.resolve(sid for claim in claims for sid in claim.source_ids)
+    return sources + [source for source in cited if source.id not in listed]
+
+
+def _shard_prompts(
+    claims: List[Claim],
+    fact_sources: Sequence[Source],
+    registry: SourceRegistry,
+    references: Sequence[tuple[str, str]] | None,
+    language: str | None,
+) -> List[str]:
+    shards = _shards(claims, env_int("FACT_CHECK_SHARD_SIZE", 8))
+    if len(shards) == 1:
+        sources = _with_cited(claims, list(fact_sources), registry)
+        return [_fact_check_prompt(claims, sources, references, language)]
+    limit = env_int("FACT_CHECK_SOURCES_PER_SHARD", 6)
+    logger.info("Fact checking in %d shards", len(shards))
+    return [
+        _fact_check_prompt(
+            shard,
+            _with_cited(shard, _relevant_sources(shard, fact_sources, limit), registry),
+            references,
+            language,
+        )
+        for shard in shards
+    ]
+
+
+def _checked_results(data: dict) -> List[FactCheckResult]:
+    if not isinstance(data, dict) or not isinstance(data.get("results"), list):
+        raise ShardError("Fact-check response has no results list")
+    return _parse_fact_checks(data)
+
+
+def _order_by_claims(
+    results: List[FactCheckResult], claims: Sequence[Claim]
+) -> List[FactCheckResult]:
+    position: Dict[str, int] = {}
+    for index, claim in enumerate(claims):
+        position.setdefault(claim.text.strip().lower(), index)
+    return sorted(
+        results,
+        key=lambda r: position.get(r.claim.text.strip().lower(), len(claims)),
+    )
+
+
+def _pending_claims(
+    claims: Sequence[Claim], known: Sequence[FactCheckResult]
+) -> List[Claim]:
+    """Claims without a verdict in ``known`` (matched on normalized text)."""
+    checked = {result.claim.text.strip().lower() for result in known}
+    return [claim for claim in claims if claim.text.strip().lower() not in checked]
+
+
+def _check_shard(prompt: str, attempts: int) -> List[FactCheckResult]:
+    """Check one shard, re-asking only when the answer is unusable.
+
+    ``llm_json`` already retries transport errors within its own deadline and
+    circuit breaker, so upstream failures are raised straight away.
+    """
+    for attempt in range(1, attempts + 1):
+        data = llm_json(system=_FACT_CHECK_SYSTEM, user=prompt)
+        try:
+            return _checked_results(data)
+        except ShardError as exc:
+            # The unusable answer is cached; drop it so a retry asks again.
+            forget_llm_response(_FACT_CHECK_SYSTEM, prompt)
+            if attempt == attempts:
+                raise
+            logger.warning("Fact-check shard attempt %d/%d failed: %s", attempt, attempts, exc)
+    return []
+
+
+async def _acheck_shard(prompt: str, attempts: int) -> List[FactCheckResult]:
+    for attempt in range(1, attempts + 1):
+        data = await allm_json(system=_FACT_CHECK_SYSTEM, user=prompt)
+        try:
+            return _checked_results(data)
+        except ShardError as exc:
+            forget_llm_response(_FACT_CHECK_SYSTEM, prompt)
+            if attempt == attempts:
+                raise
+            logger.warning("Fact-check shard attempt %d/%d failed: %s", attempt, attempts, exc)
+    return []
+
+
+def _merge_shards(
+    outcomes: Sequence[List[FactCheckResult] | BaseException], claims: Sequence[Claim]
+) -> List[FactCheckResult]:
+    """Merge shard results in claim order; a failed shard only loses its own verdicts.
+
+    When every shard failed, an upstream error is raised; if the model
+    answered but nothing was usable the run continues without verdicts.
+    """
+    failures = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+    if failures and len(failures) == len(outcomes):
+        upstream = [f for f in failures if not isinstance(f, ShardError)]
+        if upstream:
+            raise upstream[0]
+        logger.error("No usable fact-check answer; continuing without verdicts")
+        return []
+    for failure in failures:
+        logger.error("Fact-check shard dropped after retries: %s", failure)
+    results = [
+        result
+        for outcome in outcomes
+        if not isinstance(outcome, BaseException)
+        for result in outcome
+    ]
+    return _order_by_claims(results, claims)
+
+
+def _attempts() -> int:
+    return 1 + env_int("FACT_CHECK_SHARD_RETRIES", 2)
+
+
+def _run_shards(prompts: List[str]) -> List[List[FactCheckResult] | BaseException]:
+    attempts = _attempts()
+
+    def run(prompt: str) -> List[FactCheckResult] | BaseException:
+        try:
+            return _check_shard(prompt, attempts)
+        except Exception as exc:
+            return exc
+
+    if len(prompts) == 1:
+        return [run(prompts[0])]
+    workers = min(len(prompts), env_int("FACT_CHECK_MAX_WORKERS", 4))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Carry the caller's context so rate-limit priority and tracing follow.
+        futures = [
+            executor.submit(contextvars.copy_context().run, run, prompt)
+            for prompt in prompts
+        ]
+        return [future.result() for future in futures]
+
+
+def fact_check_requests(
+    state: PipelineState,
+    references: Sequence[tuple[str, str]] | None = None,
+    language: str | None = None,
+) -> List[Tuple[str, str]]:
+    """``(system, user)`` messages per shard for checking every claim in ``state``."""
+    claims = all_claims(state)
+    if not claims:
+        return []
+    prompts = _shard_prompts(
+        claims,
+        state["fact_sources"],
+        SourceRegistry.from_state(state),
+        references,
+        language,
+    )
+    return [(_FACT_CHECK_SYSTEM, prompt) for prompt in prompts]
+
+
+def merge_fact_check_answers(
+    state: PipelineState, answers: Sequence[dict | BaseException]
+) -> dict:
+    """State update from the answers to :func:`fact_check_requests`, in shard order.
+
+    Unusable shards lose only their own verdicts, as in :func:`fact_checker`.
+    """
+    outcomes: List[List[FactCheckResult] | BaseException] = []
+    for answer in answers:
+        try:
+            outcomes.append(
+                answer if isinstance(answer, BaseException) else _checked_results(answer)
+            )
+        except ShardError as exc:
+            outcomes.append(exc)
+    claims = all_claims(state)
+    return {
+        "all_claims": claims,
+        "source_registry": SourceRegistry.from_state(state),
+        "fact_checks": _merge_shards(outcomes, claims),
+    }
+
 
-    return {**state, "fact_checks": results}
+def fact_checker(
+    state: PipelineState,
+    references: Sequence[tuple[str, str]] | None = None,
+    language: str | None = None,
+    known: Sequence[FactCheckResult] = (),
+) -> dict:
+    """Fact-check every claim in ``state``; returns the state update.
+
+    The update also carries the run's source registry and claim list, built
+    here once at the join for the later stages.
+
+    ``known`` holds verdicts carried over from an earlier run; their claims
+    are not sent to the model again.
+    """
+    claims = all_claims(state)
+    registry = SourceRegistry.from_state(state)
+    pending = _pending_claims(claims, known)
+    logger.info(
+        "Fact checking: claims=%d reused=%d", len(pending), len(claims) - len(pending)
+    )
+    results = list(known)
+    if pending:
+        outcomes = _run_shards(
+            _shard_prompts(pending, state["fact_sources"], registry, references, language)
+        )
+        results += _merge_shards(outcomes, pending)
+    return {
+        "all_claims": claims,
+        "source_registry": registry,
+        "fact_checks": _order_by_claims(results, claims),
+    }
+
+
+async def afact_checker(
+    state: PipelineState,
+    references: Sequence[tuple[str, str]] | None = None,
+    language: str | None = None,
+    known: Sequence[FactCheckResult] = (),
+) -> dict:
+    claims = all_claims(state)
+    registry = SourceRegistry.from_state(state)
+    pending = _pending_claims(claims, known)
+    logger.info(
+        "Fact checking (async): claims=%d reused=%d", len(pending), len(claims) - len(pending)
+    )
+    results = list(known)
+    if pending:
+        attempts = _attempts()
+        outcomes = await asyncio.gather(
+            *(
+                _acheck_shard(prompt, attempts)
+                for prompt in _shard_prompts(
+                    pending, state["fact_sources"], registry, references, language
+                )
+            ),
+            return_exceptions=True,
+        )
+        results += _merge_shards(outcomes, pending)
+    return {
+        "all_claims": claims,
+        "source_registry": registry,
+        "fact_checks": _order_by_claims(results, claims),
+    }
@@ -2,227 +2,409 @@
 
 from __future__ import annotations
 
-from typing import Callable, Dict, List, Optional, Union
-
-from langgraph.graph import END, StateGraph
-
-from geopoliticai.claims import build_claims
-from geopoliticai.config import get_infosphere_sources
-from geopoliticai.fact_check import fact_checker
-from geopoliticai.models import PipelineState, Source
-from geopoliticai.render import (
-    merge_sources,
-    render_claims,
-    render_fact_checks,
-    render_reference_list,
-    render_sources,
+import asyncio
+import logging
+import re
+import threading
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
 )
-from geopoliticai.search import web_searcher
-from geopoliticai.summarizer import summarizer_judge
 
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langgraph.graph import END, START, StateGraph
 
-def _make_supervisor_finalize(
-    infosphere_sources: dict[str, list[tuple[str, str]]],
-    language: str,
-) -> Callable[[PipelineState], PipelineState]:
-    if language == "polish":
-        labels = {
-            "factual": "1. 🔎 Tło faktograficzne (z wyszukiwania)",
-            "left": "2. 🔴 Perspektywa lewicowa",
-            "centrist": "3. 🟡 Perspektywa centrowa",
-            "right": "4. 🔵 Perspektywa prawicowa",
-            "people": "5. 🟢 Perspektywa społeczna",
-            "fact": "6. ✅ Wyniki weryfikacji faktów",
-            "synthesis": "7. ⚖️ Synteza i najlepiej potwierdzone wnioski",
-            "refs": "Preferowane źródła:",
+from geopoliticai.cache import SingleFlight, make_cache_key
+from geopoliticai.claims import (
+    MULTI_LENS,
+    ExpertBatch,
+    LensInput,
+    abuild_claims,
+    abuild_multi_lens_claims,
+    build_claims,
+    build_multi_lens_claims,
+    expert_mode,
+)
+from geopoliticai.config import (
+    INFOSPHERES,
+    InfosphereSources,
+    env_flag,
+    get_infosphere_sources,
+    get_model,
+)
+from geopoliticai.fact_check import afact_checker, fact_checker
+from geopoliticai.metrics import PIPELINE_RUNS, Span, record, timed_stage
+from geopoliticai.models import PipelineResult, PipelineState, Source
+from geopoliticai.search import aweb_searcher, web_searcher
+from geopoliticai.semantic_cache import SemanticCache, get_semantic_cache
+from geopoliticai.serialization import dumps, loads
+from geopoliticai.snapshots import RunSnapshot, get_snapshot_store
+from geopoliticai.summarizer import asummarizer_judge, summarizer_judge
+
+logger = logging.getLogger(__name__)
+
+
+def _make_supervisor_finalize(infosphere: str) -> Callable[[PipelineState], dict]:
+    def supervisor_finalize(state: PipelineState) -> dict:
+        # The text report is rendered lazily from the result, only when asked for.
+        return {"result": PipelineResult.from_state(state, infosphere)}
+
+    return supervisor_finalize
+
+
+EXPERT_LENSES: Dict[str, str] = {
+    "left": "leftist",
+    "centrist": "centrist",
+    "right": "right-wing",
+    "people": "people",
+}
+SEARCH_AGENTS = ("left", "centrist", "right", "people", "fact")
+PIPELINE_STAGES = (
+    *(f"{agent_key}_searcher" for agent_key in SEARCH_AGENTS),
+    *(f"{agent_key}_expert" for agent_key in EXPERT_LENSES),
+    "fact_checker",
+    "summarizer_judge",
+    "supervisor",
+)
+
+
+def _node(
+    name: str,
+    func: Callable[[PipelineState], dict],
+    afunc: Callable[[PipelineState], Awaitable[dict]],
+) -> RunnableLambda:
+    """Pair a sync node with its async twin so both invoke and ainvoke stay native.
+
+    Both are timed as the ``name`` stage.
+    """
+    return RunnableLambda(timed_stage(name, func), afunc=timed_stage(name, afunc))
+
+
+def _seed_sources(
+    config: Optional[RunnableConfig],
+) -> Optional[Union[List[Source], Dict[str, List[Source]]]]:
+    return ((config or {}).get("configurable") or {}).get("seed_sources")
+
+
+def _snapshot(config: Optional[RunnableConfig]) -> Optional[RunSnapshot]:
+    return ((config or {}).get("configurable") or {}).get("snapshot")
+
+
+def _make_searcher(
+    agent_key: str,
+    references: Sequence[tuple[str, str]],
+) -> RunnableLambda:
+    def searcher(state: PipelineState, config: RunnableConfig) -> dict:
+        return {
+            f"{agent_key}_sources": web_searcher(
+                state, agent_key, references, _seed_sources(config)
+            )
         }
-    else:
-        labels = {
-            "factual": "1. 🔎 Factual Background (from Web Searcher)",
-            "left": "2. 🔴 Left Perspective",
-            "centrist": "3. 🟡 Centrist Perspective",
-            "right": "4. 🔵 Right Perspective",
-            "people": "5. 🟢 People's Perspective",
-            "fact": "6. ✅ Fact Check Results",
-            "synthesis": "7. ⚖️ Synthesis & Best-Supported Conclusion",
-            "refs": "Preferred references:",
+
+    async def asearcher(state: PipelineState, config: RunnableConfig) -> dict:
+        return {
+            f"{agent_key}_sources": await aweb_searcher(
+                state, agent_key, references, _seed_sources(config)
+            )
         }
 
-    def supervisor_finalize(state: PipelineState) -> PipelineState:
-        output: List[str] = []
-        output.append(labels["factual"])
-        output.append(render_sources(merge_sources(state)))
-        output.append("")
-        output.append(labels["left"])
-        output.append(labels["refs"])
-        output.append(render_reference_list(infosphere_sources["left"]))
-        output.append(render_claims(state["left_claims"]))
-        output.append("")
-        output.append(labels["centrist"])
-        output.append(labels["refs"])
-        output.append(render_reference_list(infosphere_sources["centrist"]))
-        output.append(render_claims(state["centrist_claims"]))
-        output.append("")
-        output.append(labels["right"])
-        output.append(labels["refs"])
-        output.append(render_reference_list(infosphere_sources["right"]))
-        output.append(render_claims(state["right_claims"]))
-        output.append("")
-        output.append(labels["people"])
-        output.append(labels["refs"])
-        output.append(render_reference_list(infosphere_sources["people"]))
-        output.append(render_claims(state["people_claims"]))
-        output.append("")
-        output.append(labels["fact"])
-        output.append(labels["refs"])
-        output.append(render_reference_list(infosphere_sources["fact"]))
-        output.append(render_fact_checks(state["fact_checks"]))
-        output.append("")
-        output.append(labels["synthesis"])
-        output.append(state["synthesis"])
-        return {**state, "final_output": "\n".join(output)}
+    return _node(f"{agent_key}_searcher", searcher, asearcher)
 
-    return supervisor_finalize
+
+def _reused_claims(
+    agent_key: str, state: PipelineState, config: RunnableConfig
+) -> Optional[list]:
+    snapshot = _snapshot(config)
+    if snapshot is None:
+        return None
+    return snapshot.reusable_claims(agent_key, state[f"{agent_key}_sources"])
+
+
+def _expert_batch(config: Optional[RunnableConfig]) -> Optional[ExpertBatch]:
+    return ((config or {}).get("configurable") or {}).get("expert_batch")
+
+
+def _make_expert(
+    agent_key: str,
+    infosphere_sources: InfosphereSources,
+    language: str,
+    batched: bool,
+) -> RunnableLambda:
+    """Expert node; with ``batched`` it may share a multi-lens request.
+
+    Batching needs every perspective's sources in the expert's state, which
+    only the parallel graph guarantees, so sequential graphs never batch.
+    """
+    lens = EXPERT_LENSES[agent_key]
+    references = infosphere_sources[agent_key]
+
+    def reused(state: PipelineState, config: RunnableConfig) -> Optional[dict]:
+        claims = _reused_claims(agent_key, state, config)
+        if claims is None:
+            return None
+        logger.info("Reusing %d %s claims from snapshot", len(claims), agent_key)
+        return {f"{agent_key}_claims": claims}
+
+    def batch_for(config: RunnableConfig) -> Optional[ExpertBatch]:
+        if not batched or expert_mode() != MULTI_LENS:
+            return None
+        return _expert_batch(config)
+
+    def pending(state: PipelineState, config: RunnableConfig) -> List[LensInput]:
+        return [
+            (EXPERT_LENSES[key], state[f"{key}_sources"], infosphere_sources[key])
+            for key in EXPERT_LENSES
+            if _reused_claims(key, state, config) is None
+        ]
+
+    def expert(state: PipelineState, config: RunnableConfig) -> dict:
+        update = reused(state, config)
+        if update is not None:
+            return update
+        batch = batch_for(config)
+        if batch is not None:
+            by_lens = batch.claims(
+                lambda: build_multi_lens_claims(state, pending(state, config), language)
+            )
+            return {f"{agent_key}_claims": by_lens[lens]}
+        return {
+            f"{agent_key}_claims": build_claims(
+                state, lens, state[f"{agent_key}_sources"], references, language
+            )
+        }
+
+    async def aexpert(state: PipelineState, config: RunnableConfig) -> dict:
+        update = reused(state, config)
+        if update is not None:
+            return update
+        batch = batch_for(config)
+        if batch is not None:
+            by_lens = await batch.aclaims(
+                lambda: abuild_multi_lens_claims(state, pending(state, config), language)
+            )
+            return {f"{agent_key}_claims": by_lens[lens]}
+        return {
+            f"{agent_key}_claims": await abuild_claims(
+                state, lens, state[f"{agent_key}_sources"], references, language
+            )
+        }
+
+    return _node(f"{agent_key}_expert", expert, aexpert)
 
 
 def build_graph(
     seed_sources: Optional[Union[List[Source], Dict[str, List[Source]]]] = None,
     infosphere: str = "english",
+    parallel: bool = True,
 ):
+    """Compile the pipeline graph.
+
+    With ``parallel`` the five searcher/expert branches fan out from START and
+    join at ``fact_checker``; each branch writes only its own state keys.
+    Seed sources are read from ``config["configurable"]["seed_sources"]`` at
+    run time; passing them here only binds them as a default.
+    """
     language = "polish" if infosphere == "polish" else "english"
     infosphere_sources = get_infosphere_sources(infosphere)
     graph = StateGraph(PipelineState)
 
+    for agent_key in SEARCH_AGENTS:
+        graph.add_node(
+            f"{agent_key}_searcher",
+            _make_searcher(agent_key, infosphere_sources[agent_key]),
+        )
+    for agent_key in EXPERT_LENSES:
+        graph.add_node(
+            f"{agent_key}_expert",
+            _make_expert(agent_key, infosphere_sources, language, batched=parallel),
+        )
+    fact_references = infosphere_sources["fact"]
+
+    def known_checks(state: PipelineState, config: RunnableConfig) -> list:
+        snapshot = _snapshot(config)
+        return [] if snapshot is None else snapshot.reusable_fact_checks(state)
+
+    def fact_node(state: PipelineState, config: RunnableConfig) -> dict:
+        return fact_checker(state, fact_references, language, known_checks(state, config))
+
+    async def afact_node(state: PipelineState, config: RunnableConfig) -> dict:
+        return await afact_checker(
+            state, fact_references, language, known_checks(state, config)
+        )
+
+    async def asummarizer_node(state: PipelineState) -> dict:
+        return await asummarizer_judge(state, language)
+
     graph.add_node(
-        "left_searcher",
-        lambda state: {
-            **state,
-            "left_sources": web_searcher(
-                state, "left", infosphere_sources["left"], seed_sources
-            ),
-        },
-    )
-    graph.add_node(
-        "centrist_searcher",
-        lambda state: {
-            **state,
-            "centrist_sources": web_searcher(
-                state, "centrist", infosphere_sources["centrist"], seed_sources
-            ),
-        },
-    )
-    graph.add_node(
-        "right_searcher",
-        lambda state: {
-            **state,
-            "right_sources": web_searcher(
-                state, "right", infosphere_sources["right"], seed_sources
-            ),
-        },
-    )
-    graph.add_node(
-        "people_searcher",
-        lambda state: {
-            **state,
-            "people_sources": web_searcher(
-                state, "people", infosphere_sources["people"], seed_sources
-            ),
-        },
-    )
-    graph.add_node(
-        "fact_searcher",
-        lambda state: {
-            **state,
-            "fact_sources": web_searcher(
-                state, "fact", infosphere_sources["fact"], seed_sources
-            ),
-        },
-    )
-    graph.add_node(
-        "left_expert",
-        lambda state: {
-            **state,
-            "left_claims": build_claims(
-                state,
-                "leftist",
-                state["left_sources"],
-                infosphere_sources["left"],
-                language,
-            ),
-        },
-    )
-    graph.add_node(
-        "centrist_expert",
-        lambda state: {
-            **state,
-            "centrist_claims": build_claims(
-                state,
-                "centrist",
-                state["centrist_sources"],
-                infosphere_sources["centrist"],
-                language,
-            ),
-        },
-    )
-    graph.add_node(
-        "right_expert",
-        lambda state: {
-            **state,
-            "right_claims": build_claims(
-                state,
-                "right-wing",
-                state["right_sources"],
-                infosphere_sources["right"],
-                language,
-            ),
-        },
-    )
-    graph.add_node(
-        "people_expert",
-        lambda state: {
-            **state,
-            "people_claims": build_claims(
-                state,
-                "people",
-                state["people_sources"],
-                infosphere_sources["people"],
-                language,
-            ),
-        },
+        "fact_checker",
+        _node("fact_checker", fact_node, afact_node),
     )
     graph.add_node(
-        "fact_checker",
-        lambda state: fact_checker(state, infosphere_sources["fact"], language),
+        "summarizer_judge",
+        _node(
+            "summarizer_judge",
+            lambda state: summarizer_judge(state, language),
+            asummarizer_node,
+        ),
     )
-    graph.add_node("summarizer_judge", lambda state: summarizer_judge(state, language))
     graph.add_node(
-        "supervisor", _make_supervisor_finalize(infosphere_sources, language)
+        "supervisor",
+        timed_stage("supervisor", _make_supervisor_finalize(infosphere)),
     )
 
-    graph.set_entry_point("left_searcher")
-    graph.add_edge("left_searcher", "left_expert")
-    graph.add_edge("left_expert", "centrist_searcher")
-    graph.add_edge("centrist_searcher", "centrist_expert")
-    graph.add_edge("centrist_expert", "right_searcher")
-    graph.add_edge("right_searcher", "right_expert")
-    graph.add_edge("right_expert", "people_searcher")
-    graph.add_edge("people_searcher", "people_expert")
-    graph.add_edge("people_expert", "fact_searcher")
-    graph.add_edge("fact_searcher", "fact_checker")
+    if parallel:
+        for agent_key in SEARCH_AGENTS:
+            graph.add_edge(START, f"{agent_key}_searcher")
+        for agent_key in EXPERT_LENSES:
+            graph.add_edge(f"{agent_key}_searcher", f"{agent_key}_expert")
+        graph.add_edge(
+            [f"{agent_key}_expert" for agent_key in EXPERT_LENSES] + ["fact_searcher"],
+            "fact_checker",
+        )
+    else:
+        graph.set_entry_point("left_searcher")
+        graph.add_edge("left_searcher", "left_expert")
+        graph.add_edge("left_expert", "centrist_searcher")
+        graph.add_edge("centrist_searcher", "centrist_expert")
+        graph.add_edge("centrist_expert", "right_searcher")
+        graph.add_edge("right_searcher", "right_expert")
+        graph.add_edge("right_expert", "people_searcher")
+        graph.add_edge("people_searcher", "people_expert")
+        graph.add_edge("people_expert", "fact_searcher")
+        graph.add_edge("fact_searcher", "fact_checker")
     graph.add_edge("fact_checker", "summarizer_judge")
     graph.add_edge("summarizer_judge", "supervisor")
     graph.add_edge("supervisor", END)
 
-    return graph.compile()
+    app = graph.compile()
+    if seed_sources is not None:
+        return app.with_config(configurable={"seed_sources": seed_sources})
+    return app
 
 
-def run_pipeline(
+_compiled_graphs: Dict[tuple[str, bool], Any] = {}
+_compiled_graphs_lock = threading.Lock()
+
+
+def get_compiled_graph(infosphere: str = "english", parallel: bool = True):
+    """Return the shared compiled graph for an infosphere, compiling it once."""
+    key = (infosphere, parallel)
+    app = _compiled_graphs.get(key)
+    if app is None:
+        with _compiled_graphs_lock:
+            app = _compiled_graphs.get(key)
+            if app is None:
+                app = _compiled_graphs[key] = build_graph(
+                    infosphere=infosphere, parallel=parallel
+                )
+    return app
+
+
+def compile_graphs(infospheres: Sequence[str] = INFOSPHERES) -> None:
+    """Populate the compiled-graph registry ahead of the first request."""
+    for infosphere in infospheres:
+        get_compiled_graph(infosphere)
+
+
+_pipeline_flight = SingleFlight()
+
+
+def _flight_key(
     query: str,
-    seed_sources: Optional[Union[List[Source], Dict[str, List[Source]]]] = None,
-    infosphere: str = "english",
-) -> str:
-    app = build_graph(seed_sources, infosphere)
-    initial_state: PipelineState = {
+    infosphere: str,
+    seed_sources: Optional[Union[List[Source], Dict[str, List[Source]]]],
+    incremental: bool,
+) -> Optional[str]:
+    """Key identical runs share, or ``None`` when the run must execute alone."""
+    # Seeded runs answer for their own seed, so only searched runs coalesce.
+    if seed_sources is not None or not env_flag("PIPELINE_COALESCING_ENABLED", True):
+        return None
+    normalized = re.sub(r"\s+", " ", query).strip().lower()
+    return make_cache_key(normalized, infosphere, get_model(), incremental)
+
+
+def _count_run(key: str, shared: bool, started: float) -> None:
+    if shared:
+        logger.info("Joined in-flight pipeline run: key=%s", key[:12])
+        record(Span("coalesced", "pipeline", seconds=time.perf_counter() - started))
+    PIPELINE_RUNS.inc(result="coalesced" if shared else "executed")
+
+
+def _run_config(
+    seed_sources: Optional[Union[List[Source], Dict[str, List[Source]]]],
+    snapshot: Optional[RunSnapshot] = None,
+) -> RunnableConfig:
+    return {
+        "configurable": {
+            "seed_sources": seed_sources,
+            "snapshot": snapshot,
+            "expert_batch": ExpertBatch(),
+        }
+    }
+
+
+def _load_snapshot(
+    query: str, infosphere: str, incremental: bool
+) -> Optional[RunSnapshot]:
+    if not incremental:
+        return None
+    snapshot = get_snapshot_store().get(query, infosphere)
+    logger.info("Incremental run: snapshot=%s", "found" if snapshot else "none")
+    return snapshot
+
+
+def _semantic_cache(
+    seed_sources: Optional[Union[List[Source], Dict[str, List[Source]]]],
+    incremental: bool,
+) -> Optional[SemanticCache]:
+    # Seeded runs answer for their seed, and incremental runs are explicit
+    # refreshes, so neither is served from or stored in the semantic cache.
+    if seed_sources is not None or incremental:
+        return None
+    return get_semantic_cache()
+
+
+def _cached_result(
+    cache: Optional[SemanticCache], query: str, infosphere: str
+) -> Optional[PipelineResult]:
+    if cache is None:
+        return None
+    cached = cache.lookup(query, infosphere)
+    if cached is None:
+        return None
+    try:
+        return loads(cached)
+    except ValueError as exc:
+        # Entries from an older result schema are treated as misses.
+        logger.info("Ignoring semantic cache entry: %s", exc)
+        return None
+
+
+def _cache_result(
+    cache: Optional[SemanticCache], query: str, infosphere: str, result: PipelineResult
+) -> None:
+    if cache is not None:
+        cache.store(query, infosphere, dumps(result).decode("utf-8"))
+
+
+def _save_snapshot(
+    query: str, infosphere: str, state: PipelineState, incremental: bool
+) -> None:
+    if incremental:
+        get_snapshot_store().put(RunSnapshot.from_state(query, infosphere, state))
+
+
+def _initial_state(query: str, infosphere: str) -> PipelineState:
+    return {
         "query": query,
         "language": "polish" if infosphere == "polish" else "english",
         "left_claims": [],
@@ -234,9 +416,123 @@ def run_pipeline(
         "right_sources": [],
         "people_sources": [],
         "fact_sources": [],
+        "source_registry": None,
         "fact_checks": [],
         "synthesis": "",
-        "final_output": "",
+        "result": None,
     }
-    result = app.invoke(initial_state)
-    return result["final_output"]
+
+
+def run_pipeline(
+    query: str,
+    seed_sources: Optional[Union[List[Source], Dict[str, List[Source]]]] = None,
+    infosphere: str = "english",
+    parallel: bool = True,
+    incremental: bool = False,
+    structured: bool = False,
+) -> Union[str, PipelineResult]:
+    """Run the pipeline synchronously.
+
+    Returns the text report, or with ``structured`` the
+    :class:`~geopoliticai.models.PipelineResult` it is rendered from.
+
+    With ``incremental`` the last snapshot for ``(query, infosphere)`` is
+    loaded: perspectives whose sources are unchanged reuse their claims and
+    only new claims are fact-checked. The finished run becomes the new
+    snapshot.
+
+    Unseeded, non-incremental runs go through the semantic cache when
+    SEMANTIC_CACHE_ENABLED is set: a rephrasing of a recent query returns
+    the stored result.
+
+    Unseeded calls for the same normalized query, infosphere, model and
+    ``incremental`` flag that overlap in time share one execution (disable
+    with PIPELINE_COALESCING_ENABLED=0); the result is shared read-only.
+    The execution's spans go to the trace of the caller that started it;
+    callers that joined record a single ``coalesced`` span for their wait,
+    so its cost is counted once. Its upstream calls run at the most urgent
+    rate-limit priority among the waiting callers.
+    """
+    app = get_compiled_graph(infosphere, parallel)
+
+    def execute() -> PipelineResult:
+        cache = _semantic_cache(seed_sources, incremental)
+        result = _cached_result(cache, query, infosphere)
+        if result is None:
+            snapshot = _load_snapshot(query, infosphere, incremental)
+            state = app.invoke(
+                _initial_state(query, infosphere), _run_config(seed_sources, snapshot)
+            )
+            _save_snapshot(query, infosphere, state, incremental)
+            result = state["result"]
+            _cache_result(cache, query, infosphere, result)
+        return result
+
+    key = _flight_key(query, infosphere, seed_sources, incremental)
+    if key is None:
+        result = execute()
+    else:
+        started = time.perf_counter()
+        result, shared = _pipeline_flight.do(key, execute)
+        _count_run(key, shared, started)
+    return result if structured else result.text
+
+
+async def arun_pipeline(
+    query: str,
+    seed_sources: Optional[Union[List[Source], Dict[str, List[Source]]]] = None,
+    infosphere: str = "english",
+    parallel: bool = True,
+    incremental: bool = False,
+    structured: bool = False,
+) -> Union[str, PipelineResult]:
+    """Run the pipeline on the event loop; every I/O-bound node is awaited.
+
+    Identical overlapping calls share one execution as in :func:`run_pipeline`.
+    Cancellation is reference counted: a cancelled caller detaches, and the
+    shared run is cancelled only once every caller waiting on it is.
+    """
+    app = get_compiled_graph(infosphere, parallel)
+
+    async def execute() -> PipelineResult:
+        cache = _semantic_cache(seed_sources, incremental)
+        # Lookups embed the query and hit SQLite; keep them off the event loop.
+        result = await asyncio.to_thread(_cached_result, cache, query, infosphere)
+        if result is None:
+            snapshot = _load_snapshot(query, infosphere, incremental)
+            state = await app.ainvoke(
+                _initial_state(query, infosphere), _run_config(seed_sources, snapshot)
+            )
+            _save_snapshot(query, infosphere, state, incremental)
+            result = state["result"]
+            await asyncio.to_thread(_cache_result, cache, query, infosphere, result)
+        return result
+
+    key = _flight_key(query, infosphere, seed_sources, incremental)
+    if key is None:
+        result = await execute()
+    else:
+        started = time.perf_counter()
+        result, shared = await _pipeline_flight.ado(key, execute)
+        _count_run(key, shared, started)
+    return result if structured else result.text
+
+
+async def astream_pipeline(
+    query: str,
+    seed_sources: Optional[Union[List[Source], Dict[str, List[Source]]]] = None,
+    infosphere: str = "english",
+    parallel: bool = True,
+    incremental: bool = False,
+) -> AsyncIterator[Tuple[str, dict]]:
+    """Yield ``(node_name, state_update)`` as each graph node finishes."""
+    app = get_compiled_graph(infosphere, parallel)
+    state = _initial_state(query, infosphere)
+    snapshot = _load_snapshot(query, infosphere, incremental)
+    async for chunk in app.astream(
+        state, _run_config(seed_sources, snapshot), stream_mode="updates"
+    ):
+        for node, update in chunk.items():
+            state.update(update or {})
+            yield node, update or {}
+    _save_snapshot(query, infosphere, state, incremental)
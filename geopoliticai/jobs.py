@@ -0,0 +1,322 @@
+"""Background job queue for long-running pipeline analyses."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from geopoliticai.cache import make_cache_key
+from geopoliticai.ratelimit import BATCH, rate_limit_scope
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when the bounded job queue cannot accept another job."""
+
+
+class IdempotencyKeyReused(RuntimeError):
+    """Raised when an idempotency key is reused for a different request."""
+
+
+@dataclass
+class Job:
+    id: str
+    query: str
+    infosphere: str
+    idempotency_key: str
+    incremental: bool = False
+    request_hash: str = ""
+    status: str = QUEUED
+    stages: List[str] = field(default_factory=list)
+    result: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    def as_dict(self) -> dict:
+        # The graph module is heavy; it is loaded by the first job, not by import.
+        from geopoliticai.graph import PIPELINE_STAGES
+
+        data = asdict(self)
+        data["progress"] = {
+            "completed": len(self.stages),
+            "total": len(PIPELINE_STAGES),
+        }
+        return data
+
+
+def idempotency_key_for(query: str, infosphere: str, incremental: bool = False) -> str:
+    """Key identifying the request itself; also the default idempotency key."""
+    normalized = re.sub(r"\s+", " ", query).strip().lower()
+    # Plain runs keep the key they had before incremental existed.
+    if incremental:
+        return make_cache_key(normalized, infosphere, incremental)
+    return make_cache_key(normalized, infosphere)
+
+
+class JobStore:
+    """SQLite-backed persistence for jobs and their results."""
+
+    _COLUMNS = (
+        "id",
+        "query",
+        "infosphere",
+        "idempotency_key",
+        "incremental",
+        "request_hash",
+        "status",
+        "stages",
+        "result",
+        "error",
+        "created_at",
+        "updated_at",
+    )
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, query TEXT NOT NULL, infosphere TEXT NOT NULL, "
+                "idempotency_key TEXT NOT NULL, "
+                "incremental INTEGER NOT NULL DEFAULT 0, "
+                "request_hash TEXT NOT NULL DEFAULT '', status TEXT NOT NULL, "
+                "stages TEXT NOT NULL, result TEXT, error TEXT, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_idempotency ON jobs "
+                "(idempotency_key, created_at)"
+            )
+            self._add_missing_columns()
+
+    def _add_missing_columns(self) -> None:
+        """Bring a store created by an older version up to the current columns."""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "incremental" not in columns:
+            self._conn.execute(
+                "ALTER TABLE jobs ADD COLUMN incremental INTEGER NOT NULL DEFAULT 0"
+            )
+        if "request_hash" not in columns:
+            # Older jobs have no hash; their keys are not checked against bodies.
+            self._conn.execute(
+                "ALTER TABLE jobs ADD COLUMN request_hash TEXT NOT NULL DEFAULT ''"
+            )
+
+    def _row_to_job(self, row: tuple) -> Job:
+        data = dict(zip(self._COLUMNS, row))
+        data["stages"] = json.loads(data["stages"])
+        data["incremental"] = bool(data["incremental"])
+        return Job(**data)
+
+    def add(self, job: Job) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO jobs ({', '.join(self._COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in self._COLUMNS)})",
+                (
+                    job.id,
+                    job.query,
+                    job.infosphere,
+                    job.idempotency_key,
+                    int(job.incremental),
+                    job.request_hash,
+                    job.status,
+                    json.dumps(job.stages),
+                    job.result,
+                    job.error,
+                    job.created_at,
+                    job.updated_at,
+                ),
+            )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return None if row is None else self._row_to_job(row)
+
+    def find_reusable(self, idempotency_key: str, max_age: float) -> Optional[Job]:
+        """Return the newest job for the key that is pending or recently succeeded."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM jobs "
+                "WHERE idempotency_key = ? AND (status IN (?, ?) "
+                "OR (status = ? AND updated_at >= ?)) "
+                "ORDER BY created_at DESC LIMIT 1",
+                (idempotency_key, QUEUED, RUNNING, SUCCEEDED, time.time() - max_age),
+            ).fetchone()
+        return None if row is None else self._row_to_job(row)
+
+    def update(self, job_id: str, **fields: object) -> None:
+        if "stages" in fields:
+            fields["stages"] = json.dumps(fields["stages"])
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ?",
+                (*fields.values(), job_id),
+            )
+
+    def fail_interrupted(self) -> int:
+        """Mark jobs left queued/running by a previous process as failed."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? "
+                "WHERE status IN (?, ?)",
+                (FAILED, "Interrupted by server restart.", time.time(), QUEUED, RUNNING),
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class JobManager:
+    """In-process worker pool draining a bounded queue of pipeline jobs."""
+
+    def __init__(
+        self,
+        store: JobStore,
+        workers: int = 4,
+        max_queue: int = 100,
+        idempotency_ttl: float = 3600.0,
+    ) -> None:
+        self.store = store
+        self.workers = workers
+        self.idempotency_ttl = idempotency_ttl
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=max_queue)
+        self._worker_tasks: List["asyncio.Task[None]"] = []
+        self._running: Dict[str, "asyncio.Task[None]"] = {}
+
+    async def start(self) -> None:
+        interrupted = self.store.fail_interrupted()
+        if interrupted:
+            logger.warning("Marked %d interrupted jobs as failed", interrupted)
+        self._worker_tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    def submit(
+        self,
+        query: str,
+        infosphere: str,
+        idempotency_key: Optional[str] = None,
+        incremental: bool = False,
+    ) -> Tuple[Job, bool]:
+        """Queue a job, or return the existing one for the same key.
+
+        Returns ``(job, created)``. A caller-supplied key is bound to its
+        request: reusing it for a different one raises
+        :class:`IdempotencyKeyReused`.
+        """
+        request_hash = idempotency_key_for(query, infosphere, incremental)
+        key = idempotency_key or request_hash
+        existing = self.store.find_reusable(key, self.idempotency_ttl)
+        if existing is not None:
+            if existing.request_hash and existing.request_hash != request_hash:
+                raise IdempotencyKeyReused(
+                    "Idempotency-Key was already used for a different request."
+                )
+            logger.info("Job %s reused for duplicate submission", existing.id)
+            return existing, False
+        if self._queue.full():
+            raise JobQueueFull("Job queue is full; retry later.")
+        job = Job(
+            id=uuid.uuid4().hex,
+            query=query,
+            infosphere=infosphere,
+            idempotency_key=key,
+            incremental=incremental,
+            request_hash=request_hash,
+        )
+        self.store.add(job)
+        self._queue.put_nowait(job.id)
+        logger.info("Job %s queued", job.id)
+        return job, True
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.store.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self.store.get(job_id)
+        if job is None or job.status in FINISHED_STATUSES:
+            return job
+        self.store.update(job_id, status=CANCELLED)
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        logger.info("Job %s cancelled", job_id)
+        return self.store.get(job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                job = self.store.get(job_id)
+                if job is None or job.status != QUEUED:
+                    continue
+                task = asyncio.create_task(self._run(job))
+                self._running[job_id] = task
+                try:
+                    # wait() does not propagate the job's own cancellation, so
+                    # only a cancelled worker (shutdown) leaves this loop.
+                    await asyncio.wait({task})
+                finally:
+                    self._running.pop(job_id, None)
+                    task.cancel()
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        from geopoliticai.graph import astream_pipeline
+
+        self.store.update(job.id, status=RUNNING)
+        stages: List[str] = []
+        try:
+            # Background jobs yield upstream quota to interactive requests.
+            with rate_limit_scope(BATCH, caller=job.id):
+                async for node, update in astream_pipeline(
+                    job.query, infosphere=job.infosphere, incremental=job.incremental
+                ):
+                    stages.append(node)
+                    self.store.update(job.id, stages=stages)
+                    if node == "supervisor":
+                        self.store.update(
+                            job.id,
+                            status=SUCCEEDED,
+                            result=update["result"].text,
+                        )
+        except asyncio.CancelledError:
+            logger.info("Job %s stopped after cancellation", job.id)
+            raise
+        except Exception as exc:
+            logger.exception("Job %s failed", job.id)
+            self.store.update(job.id, status=FAILED, error=f"{type(exc).__name__}: {exc}")
@@ -2,51 +2,423 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import os
+import threading
+import time
+from typing import Any, Optional
 
-from openai import OpenAI
+import openai
+from openai import AsyncOpenAI, OpenAI
 
-from geopoliticai.config import get_model
+from geopoliticai.cache import ResponseCache, SQLiteStore, TTLCache, make_cache_key
+from geopoliticai.clients import get_client_manager
+from geopoliticai.config import env_flag, env_float, env_int, get_model
+from geopoliticai.metrics import Span, record
+from geopoliticai.prompts import count_tokens
+from geopoliticai.ratelimit import RateLimiter, TokenBucket
+from geopoliticai.resilience import (
+    CircuitBreaker,
+    RetryBudget,
+    RetryPolicy,
+    UpstreamUnavailableError,
+    parse_retry_after,
+)
 
 logger = logging.getLogger(__name__)
-_openai_client: OpenAI | None = None
+
+RESPONSE_FORMAT = {"type": "json_object"}
+# USD per million (input, output) tokens; matched by longest model-name prefix.
+# LLM_PRICE_INPUT / LLM_PRICE_OUTPUT override the table.
+MODEL_PRICES: dict[str, tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+_llm_cache: ResponseCache | None = None
+_llm_cache_configured = False
+_llm_cache_lock = threading.Lock()
+
+# "responses" or "chat" once the first call has shown which API accepts
+# response_format; None until then.
+_api_mode: str | None = None
+_breaker: CircuitBreaker | None = None
+_limiter: RateLimiter | None = None
+
+
+class LLMUnavailableError(UpstreamUnavailableError):
+    """Raised when the LLM provider cannot answer within the retry budget."""
 
 
 def get_openai_client() -> OpenAI:
-    global _openai_client
-    if _openai_client is None:
-        _openai_client = OpenAI()
-    return _openai_client
+    """The shared, pooled OpenAI client (see :mod:`geopoliticai.clients`)."""
+    return get_client_manager().openai()
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    return get_client_manager().async_openai()
+
+
+def _build_llm_cache() -> ResponseCache | None:
+    if not env_flag("LLM_CACHE_ENABLED", True):
+        return None
+    ttl = env_float("LLM_CACHE_TTL", 3600.0)
+    memory = TTLCache(max_entries=env_int("LLM_CACHE_MAX_ENTRIES", 1024), default_ttl=ttl)
+    disk = None
+    path = os.getenv("LLM_CACHE_PATH")
+    if path:
+        disk = SQLiteStore(path, max_entries=env_int("LLM_CACHE_DISK_MAX_ENTRIES", 10000))
+    logger.info("LLM cache enabled: ttl=%.0fs disk=%s", ttl, path or "off")
+    return ResponseCache(memory, disk, ttl)
+
+
+def get_llm_cache() -> ResponseCache | None:
+    """Return the process-wide LLM response cache (configured from the environment)."""
+    global _llm_cache, _llm_cache_configured
+    if not _llm_cache_configured:
+        with _llm_cache_lock:
+            if not _llm_cache_configured:
+                _llm_cache = _build_llm_cache()
+                _llm_cache_configured = True
+    return _llm_cache
+
+
+def set_llm_cache(cache: ResponseCache | None) -> None:
+    """Install a custom cache (or ``None`` to disable caching)."""
+    global _llm_cache, _llm_cache_configured
+    with _llm_cache_lock:
+        _llm_cache = cache
+        _llm_cache_configured = True
+
+
+def llm_cache_key(model: str, system: str, user: str, temperature: float) -> str:
+    return make_cache_key(model, system, user, temperature, RESPONSE_FORMAT)
+
+
+def forget_llm_response(system: str, user: str, temperature: float = 0.2) -> None:
+    """Evict the cached answer to a request, e.g. one the caller found unusable.
+
+    Without this a retry of the same prompt would replay the cached answer.
+    """
+    cache = get_llm_cache()
+    if cache is not None:
+        cache.delete(llm_cache_key(get_model(), system, user, temperature))
+
+
+def _messages(system: str, user: str) -> list[dict[str, str]]:
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user},
+    ]
+
+
+def get_llm_breaker() -> CircuitBreaker:
+    global _breaker
+    if _breaker is None:
+        _breaker = CircuitBreaker(
+            "OpenAI",
+            failure_threshold=env_int("LLM_BREAKER_THRESHOLD", 5),
+            reset_timeout=env_float("LLM_BREAKER_RESET", 30.0),
+        )
+    return _breaker
+
+
+def get_llm_limiter() -> RateLimiter:
+    """Return the process-wide OpenAI limiter (LLM_RPM / LLM_TPM; 0 disables)."""
+    global _limiter
+    if _limiter is None:
+        buckets = {}
+        rpm = env_float("LLM_RPM", 500.0)
+        if rpm > 0:
+            buckets["requests"] = TokenBucket.per_minute(rpm)
+        tpm = env_float("LLM_TPM", 200000.0)
+        if tpm > 0:
+            buckets["tokens"] = TokenBucket.per_minute(tpm)
+        _limiter = RateLimiter(
+            "openai", buckets, max_in_flight=env_int("LLM_MAX_CONCURRENCY", 0)
+        )
+    return _limiter
+
+
+def _estimate_tokens(system: str, user: str) -> int:
+    # Prompt size plus the expected completion size.
+    return (
+        count_tokens(system)
+        + count_tokens(user)
+        + env_int("LLM_EXPECTED_OUTPUT_TOKENS", 800)
+    )
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prices = (0.0, 0.0)
+    for prefix in sorted(MODEL_PRICES, key=len, reverse=True):
+        if model.startswith(prefix):
+            prices = MODEL_PRICES[prefix]
+            break
+    input_price = env_float("LLM_PRICE_INPUT", prices[0])
+    output_price = env_float("LLM_PRICE_OUTPUT", prices[1])
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+def _record_usage(response: Any, span: Span) -> None:
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    # Responses API reports input/output tokens, chat completions prompt/completion.
+    span.prompt_tokens += (
+        getattr(usage, "input_tokens", None) or getattr(usage, "prompt_tokens", 0) or 0
+    )
+    span.completion_tokens += (
+        getattr(usage, "output_tokens", None)
+        or getattr(usage, "completion_tokens", 0)
+        or 0
+    )
+
+
+def _retry_policy() -> RetryPolicy:
+    return RetryPolicy(
+        max_retries=env_int("LLM_MAX_RETRIES", 3),
+        base_delay=env_float("LLM_RETRY_BASE_DELAY", 0.5),
+        max_delay=env_float("LLM_RETRY_MAX_DELAY", 20.0),
+        attempt_timeout=env_float("LLM_TIMEOUT", 60.0),
+        deadline=env_float("LLM_DEADLINE", 180.0),
+    )
+
+
+def _is_outage(exc: BaseException) -> bool:
+    if isinstance(exc, openai.APIConnectionError):
+        return True
+    return isinstance(exc, openai.APIStatusError) and exc.status_code >= 500
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (json.JSONDecodeError, openai.APIConnectionError)):
+        return True
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code in (408, 409, 429) or exc.status_code >= 500
+    return False
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    retry_after_ms = response.headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000.0
+        except ValueError:
+            pass
+    return parse_retry_after(response.headers.get("retry-after"))
+
+
+def _retry_budget() -> RetryBudget:
+    return RetryBudget(
+        "OpenAI",
+        _retry_policy(),
+        get_llm_breaker(),
+        _is_retryable,
+        _is_outage,
+        _retry_after,
+    )
+
+
+def _remember_api_mode(mode: str) -> None:
+    global _api_mode
+    if _api_mode != mode:
+        _api_mode = mode
+        logger.info("LLM transport: using %s API", mode)
+
+
+def _call_once(
+    client: OpenAI,
+    model: str,
+    system: str,
+    user: str,
+    temperature: float,
+    timeout: float,
+    span: Span,
+) -> dict:
+    if _api_mode != "chat":
+        try:
+            response = client.responses.create(
+                model=model,
+                input=_messages(system, user),
+                temperature=temperature,
+                response_format=RESPONSE_FORMAT,
+                timeout=timeout,
+            )
+        except TypeError:
+            _remember_api_mode("chat")
+        else:
+            _remember_api_mode("responses")
+            _record_usage(response, span)
+            return json.loads(response.output_text)
+    response = client.chat.completions.create(
+        model=model,
+        messages=_messages(system, user),
+        temperature=temperature,
+        response_format=RESPONSE_FORMAT,
+        timeout=timeout,
+    )
+    _record_usage(response, span)
+    return json.loads(response.choices[0].message.content)
+
+
+async def _acall_once(
+    client: AsyncOpenAI,
+    model: str,
+    system: str,
+    user: str,
+    temperature: float,
+    timeout: float,
+    span: Span,
+) -> dict:
+    if _api_mode != "chat":
+        try:
+            response = await client.responses.create(
+                model=model,
+                input=_messages(system, user),
+                temperature=temperature,
+                response_format=RESPONSE_FORMAT,
+                timeout=timeout,
+            )
+        except TypeError:
+            _remember_api_mode("chat")
+        else:
+            _remember_api_mode("responses")
+            _record_usage(response, span)
+            return json.loads(response.output_text)
+    response = await client.chat.completions.create(
+        model=model,
+        messages=_messages(system, user),
+        temperature=temperature,
+        response_format=RESPONSE_FORMAT,
+        timeout=timeout,
+    )
+    _record_usage(response, span)
+    return json.loads(response.choices[0].message.content)
+
+
+def _unavailable(exc: UpstreamUnavailableError) -> LLMUnavailableError:
+    return LLMUnavailableError(f"LLM provider unavailable: {exc}")
+
+
+def _request_json(
+    model: str, system: str, user: str, temperature: float, span: Span
+) -> dict:
+    client = get_openai_client()
+    limiter = get_llm_limiter()
+    tokens = _estimate_tokens(system, user)
+    budget = _retry_budget()
+    while True:
+        try:
+            timeout = budget.start_attempt()
+        except UpstreamUnavailableError as exc:
+            raise _unavailable(exc) from exc
+        try:
+            with limiter.slot(requests=1, tokens=tokens) as waited:
+                span.queue_wait += waited
+                payload: Any = _call_once(
+                    client, model, system, user, temperature, timeout, span
+                )
+        except Exception as exc:
+            time.sleep(budget.backoff(exc))
+            span.retries += 1
+            continue
+        except BaseException:
+            budget.abandon()
+            raise
+        budget.succeeded()
+        return payload
+
+
+async def _arequest_json(
+    model: str, system: str, user: str, temperature: float, span: Span
+) -> dict:
+    client = get_async_openai_client()
+    limiter = get_llm_limiter()
+    tokens = _estimate_tokens(system, user)
+    budget = _retry_budget()
+    while True:
+        try:
+            timeout = budget.start_attempt()
+        except UpstreamUnavailableError as exc:
+            raise _unavailable(exc) from exc
+        try:
+            async with limiter.aslot(requests=1, tokens=tokens) as waited:
+                span.queue_wait += waited
+                payload: Any = await _acall_once(
+                    client, model, system, user, temperature, timeout, span
+                )
+        except Exception as exc:
+            await asyncio.sleep(budget.backoff(exc))
+            span.retries += 1
+            continue
+        except BaseException:
+            budget.abandon()
+            raise
+        budget.succeeded()
+        return payload
+
+
+def _finish_span(span: Span, started: float) -> None:
+    span.seconds = time.perf_counter() - started
+    span.cost_usd = estimate_cost(span.name, span.prompt_tokens, span.completion_tokens)
+    record(span)
 
 
 def llm_json(system: str, user: str, temperature: float = 0.2) -> dict:
+    """Return the model's JSON answer; cached payloads are shared, treat as read-only."""
     model = get_model()
     logger.info("LLM request: model=%s temp=%.2f", model, temperature)
-    client = get_openai_client()
+    span = Span("llm", model)
+    started = time.perf_counter()
     try:
-        response = client.responses.create(
-            model=model,
-            input=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": user},
-            ],
-            temperature=temperature,
-            response_format={"type": "json_object"},
+        cache = get_llm_cache()
+        if cache is None:
+            return _request_json(model, system, user, temperature, span)
+        span.cache = "hit"
+
+        def compute() -> dict:
+            span.cache = "miss"
+            return _request_json(model, system, user, temperature, span)
+
+        return cache.get_or_compute(
+            llm_cache_key(model, system, user, temperature), compute
         )
-        payload = json.loads(response.output_text)
-        logger.info("LLM response received via responses API")
-        return payload
-    except TypeError:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": user},
-            ],
-            temperature=temperature,
-            response_format={"type": "json_object"},
+    except Exception as exc:
+        span.error = type(exc).__name__
+        raise
+    finally:
+        _finish_span(span, started)
+
+
+async def allm_json(system: str, user: str, temperature: float = 0.2) -> dict:
+    """Async counterpart of :func:`llm_json` built on ``AsyncOpenAI``."""
+    model = get_model()
+    logger.info("LLM request (async): model=%s temp=%.2f", model, temperature)
+    span = Span("llm", model)
+    started = time.perf_counter()
+    try:
+        cache = get_llm_cache()
+        if cache is None:
+            return await _arequest_json(model, system, user, temperature, span)
+        span.cache = "hit"
+
+        async def compute() -> dict:
+            span.cache = "miss"
+            return await _arequest_json(model, system, user, temperature, span)
+
+        return await cache.aget_or_compute(
+            llm_cache_key(model, system, user, temperature), compute
         )
-        payload = json.loads(response.choices[0].message.content)
-        logger.info("LLM response received via chat.completions API")
-        return payload
+    except Exception as exc:
+        span.error = type(exc).__name__
+        raise
+    finally:
+        _finish_span(span, started)
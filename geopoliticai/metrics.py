@@ -0,0 +1,373 @@
+"""Latency, token and cost instrumentation with Prometheus text exposition."""
+
+from __future__ import annotations
+
+import abc
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence
+
+from geopoliticai.ratelimit import rate_limit_metrics
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0
+)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(abc.ABC):
+    kind = ""
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[tuple, Any] = {}
+
+    def _key(self, labels: Mapping[str, object]) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    @abc.abstractmethod
+    def _samples(self) -> List[str]:
+        """Sample lines of every label set; called with ``_lock`` held."""
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: object) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][index] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def count(self, **labels: object) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return 0 if entry is None else entry[2]
+
+    def _samples(self) -> List[str]:
+        lines: List[str] = []
+        for key, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(
+                    self.labelnames, key, f'le="{_format_value(bound)}"'
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    """Ordered collection of metrics rendered in the Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> List[str]:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return lines
+
+    def clear(self) -> None:
+        for metric in self._metrics:
+            metric.clear()
+
+
+REGISTRY = Registry()
+STAGE_SECONDS = REGISTRY.histogram(
+    "geopoliticai_stage_seconds", "Wall time of each pipeline stage.", ("stage",)
+)
+STAGE_ERRORS = REGISTRY.counter(
+    "geopoliticai_stage_errors_total", "Pipeline stages that raised.", ("stage",)
+)
+LLM_SECONDS = REGISTRY.histogram(
+    "geopoliticai_llm_call_seconds",
+    "Wall time of llm_json calls, including cache lookups and retries.",
+    ("model", "cache"),
+)
+LLM_TOKENS = REGISTRY.histogram(
+    "geopoliticai_llm_tokens",
+    "Tokens reported by the provider per LLM call.",
+    ("model", "kind"),
+    TOKEN_BUCKETS,
+)
+LLM_COST = REGISTRY.counter(
+    "geopoliticai_llm_cost_usd_total", "Estimated LLM spend in US dollars.", ("model",)
+)
+SEARCH_SECONDS = REGISTRY.histogram(
+    "geopoliticai_search_seconds",
+    "Wall time of web searches per agent, including cache lookups.",
+    ("agent", "cache"),
+)
+QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "geopoliticai_upstream_queue_wait_seconds",
+    "Time spent waiting for the upstream rate limiter.",
+    ("provider",),
+)
+RETRIES = REGISTRY.counter(
+    "geopoliticai_upstream_retries_total", "Retried upstream attempts.", ("provider",)
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "geopoliticai_cache_requests_total",
+    "Cache lookups by layer and result.",
+    ("layer", "result"),
+)
+PIPELINE_RUNS = REGISTRY.counter(
+    "geopoliticai_pipeline_runs_total",
+    "Pipeline runs, split into executed and joined to an identical in-flight run.",
+    ("result",),
+)
+
+
+@dataclass
+class Span:
+    """One timed unit of work: a pipeline stage, an LLM call or a search."""
+
+    kind: str
+    name: str
+    seconds: float = 0.0
+    queue_wait: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+    cache: Optional[str] = None
+    retries: int = 0
+    error: Optional[str] = None
+
+
+class Trace:
+    """Spans collected for a single pipeline run."""
+
+    def __init__(self) -> None:
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self.spans: List[Span] = []
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(replace(span))
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            spans = list(self.spans)
+        calls = [span for span in spans if span.kind == "llm"]
+        return {
+            "total_seconds": round(time.perf_counter() - self._started, 4),
+            "totals": {
+                "llm_calls": len(calls),
+                "llm_cache_hits": sum(span.cache == "hit" for span in calls),
+                "searches": sum(span.kind == "search" for span in spans),
+                "prompt_tokens": sum(span.prompt_tokens for span in spans),
+                "completion_tokens": sum(span.completion_tokens for span in spans),
+                "cost_usd": round(sum(span.cost_usd for span in spans), 6),
+                "retries": sum(span.retries for span in spans),
+            },
+            "spans": [asdict(span) for span in spans],
+        }
+
+
+_trace: ContextVar[Optional[Trace]] = ContextVar("geopoliticai_trace", default=None)
+
+
+@contextmanager
+def trace_scope() -> Iterator[Trace]:
+    """Collect every span recorded inside the block into a fresh trace."""
+    trace = Trace()
+    token = _trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _trace.reset(token)
+
+
+def current_trace() -> Optional[Trace]:
+    return _trace.get()
+
+
+def record(span: Span) -> None:
+    """Export ``span`` to the process metrics and the active trace, if any."""
+    if span.kind == "stage":
+        STAGE_SECONDS.observe(span.seconds, stage=span.name)
+        if span.error:
+            STAGE_ERRORS.inc(stage=span.name)
+    elif span.kind == "llm":
+        LLM_SECONDS.observe(span.seconds, model=span.name, cache=span.cache or "off")
+        if span.prompt_tokens or span.completion_tokens:
+            LLM_TOKENS.observe(span.prompt_tokens, model=span.name, kind="prompt")
+            LLM_TOKENS.observe(span.completion_tokens, model=span.name, kind="completion")
+        if span.cost_usd:
+            LLM_COST.inc(span.cost_usd, model=span.name)
+        _record_upstream("openai", span)
+    elif span.kind == "search":
+        SEARCH_SECONDS.observe(span.seconds, agent=span.name, cache=span.cache or "off")
+        _record_upstream("tavily", span)
+    trace = _trace.get()
+    if trace is not None:
+        trace.add(span)
+
+
+def _record_upstream(provider: str, span: Span) -> None:
+    if span.cache in ("hit", "miss"):
+        CACHE_REQUESTS.inc(layer=provider, result=span.cache)
+    if span.cache != "hit":
+        QUEUE_WAIT_SECONDS.observe(span.queue_wait, provider=provider)
+    if span.retries:
+        RETRIES.inc(span.retries, provider=provider)
+
+
+def timed_stage(name: str, func: Callable) -> Callable:
+    """Wrap a sync or async graph node so each run is recorded as a stage span."""
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def awrapper(*args: Any, **kwargs: Any) -> Any:
+            span = Span("stage", name)
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except BaseException as exc:
+                span.error = type(exc).__name__
+                raise
+            finally:
+                span.seconds = time.perf_counter() - started
+                record(span)
+
+        return awrapper
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        span = Span("stage", name)
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except BaseException as exc:
+            span.error = type(exc).__name__
+            raise
+        finally:
+            span.seconds = time.perf_counter() - started
+            record(span)
+
+    return wrapper
+
+
+def _rate_limit_lines() -> List[str]:
+    depth = [
+        "# HELP geopoliticai_rate_limit_queue_depth Calls waiting for the rate limiter.",
+        "# TYPE geopoliticai_rate_limit_queue_depth gauge",
+    ]
+    in_flight = [
+        "# HELP geopoliticai_rate_limit_in_flight Calls holding a rate limiter slot.",
+        "# TYPE geopoliticai_rate_limit_in_flight gauge",
+    ]
+    for provider, snapshot in sorted(rate_limit_metrics().items()):
+        for priority, waiting in sorted(snapshot["queue_depth"].items()):
+            labels = _format_labels(("provider", "priority"), (provider, priority))
+            depth.append(f"geopoliticai_rate_limit_queue_depth{labels} {waiting}")
+        labels = _format_labels(("provider",), (provider,))
+        in_flight.append(
+            f"geopoliticai_rate_limit_in_flight{labels} {snapshot['in_flight']}"
+        )
+    return depth + in_flight
+
+
+def render_metrics() -> str:
+    """Return all process metrics in the Prometheus text exposition format."""
+    return "\n".join(REGISTRY.render() + _rate_limit_lines()) + "\n"
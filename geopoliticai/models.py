@@ -3,10 +3,18 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, TypedDict
+from functools import cached_property
+from typing import Any, Dict, List, Mapping, Optional, TypedDict
 
+from geopoliticai.sources import SourceRegistry
 
-@dataclass
+PERSPECTIVES = ("left", "centrist", "right", "people")
+# Bump when a field of PipelineResult.to_dict() is renamed, removed or
+# changes meaning; adding a field does not need a bump.
+SCHEMA_VERSION = 1
+
+
+@dataclass(frozen=True, slots=True)
 class Source:
     id: str
     title: str
@@ -14,20 +22,103 @@ class Source:
     notes: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Claim:
     text: str
     source_ids: List[str]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FactCheckResult:
     claim: Claim
     verdict: str
     rationale: str
 
 
+@dataclass(frozen=True)
+class PipelineResult:
+    """Structured output of a run; the text report is rendered on first access."""
+
+    query: str
+    infosphere: str
+    sources: List[Source]
+    claims: Mapping[str, List[Claim]]
+    fact_checks: List[FactCheckResult]
+    synthesis: str
+
+    @classmethod
+    def from_state(cls, state: PipelineState, infosphere: str) -> "PipelineResult":
+        return cls(
+            query=state["query"],
+            infosphere=infosphere,
+            sources=SourceRegistry.from_state(state).sources(),
+            claims={agent_key: state[f"{agent_key}_claims"] for agent_key in PERSPECTIVES},
+            fact_checks=state["fact_checks"],
+            synthesis=state["synthesis"],
+        )
+
+    @property
+    def language(self) -> str:
+        return "polish" if self.infosphere == "polish" else "english"
+
+    @cached_property
+    def text(self) -> str:
+        """The emoji-labelled report returned by ``run_pipeline``."""
+        from geopoliticai.render import render_report
+
+        return render_report(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Schema-versioned payload; dataclasses are left for the encoder."""
+        return {
+            "schema_version": SCHEMA_VERSION,
+            "query": self.query,
+            "infosphere": self.infosphere,
+            "sources": self.sources,
+            "claims": dict(self.claims),
+            "fact_checks": self.fact_checks,
+            "synthesis": self.synthesis,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "PipelineResult":
+        """Rebuild a result from a decoded :meth:`to_dict` payload."""
+        version = data.get("schema_version")
+        if version != SCHEMA_VERSION:
+            raise ValueError(f"Unsupported result schema version: {version!r}")
+
+        def claim(item: Mapping[str, Any]) -> Claim:
+            return Claim(text=item["text"], source_ids=list(item.get("source_ids", [])))
+
+        return cls(
+            query=data["query"],
+            infosphere=data["infosphere"],
+            sources=[Source(**item) for item in data["sources"]],
+            claims={
+                agent_key: [claim(item) for item in items]
+                for agent_key, items in data["claims"].items()
+            },
+            fact_checks=[
+                FactCheckResult(
+                    claim=claim(item["claim"]),
+                    verdict=item["verdict"],
+                    rationale=item["rationale"],
+                )
+                for item in data["fact_checks"]
+            ],
+            synthesis=data["synthesis"],
+        )
+
+
 class PipelineState(TypedDict):
+    """Graph state. Nodes return only the keys they change.
+
+    ``source_registry`` and ``all_claims`` are built once by the fact
+    checker at the join, so later stages neither re-index the sources nor
+    concatenate the claims again. ``result`` is
+    set by the supervisor.
+    """
+
     query: str
     language: str
     left_claims: List[Claim]
@@ -39,6 +130,21 @@ class PipelineState(TypedDict):
     right_sources: List[Source]
     people_sources: List[Source]
     fact_sources: List[Source]
+    source_registry: Optional[SourceRegistry]
+    all_claims: List[Claim]
     fact_checks: List[FactCheckResult]
     synthesis: str
-    final_output: str
+    result: Optional[PipelineResult]
+
+
+def all_claims(state: PipelineState) -> List[Claim]:
+    """Every perspective's claims in pipeline order (cached after fact checking)."""
+    cached = state.get("all_claims")
+    if cached is not None:
+        return cached
+    return (
+        state["left_claims"]
+        + state["centrist_claims"]
+        + state["right_claims"]
+        + state["people_claims"]
+    )
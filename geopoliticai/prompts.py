@@ -0,0 +1,172 @@
+"""Token-budgeted prompt assembly shared by the LLM stages."""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+from dataclasses import replace
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from geopoliticai.config import env_float, get_model
+from geopoliticai.models import Source
+from geopoliticai.sources import canonical_url
+
+logger = logging.getLogger(__name__)
+
+_encoding: Any = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_BOILERPLATE_RE = re.compile(
+    r"(?i)(?:subscribe (?:now|today|to our)[^.!?]*|sign up for [^.!?]*newsletter"
+    r"|zapisz się do newslettera[^.!?]*|all rights reserved|click here[^.!?]*"
+    r"|(?:accept|manage) (?:all )?cookies|cookie (?:policy|settings)"
+    r"|share (?:this|on) (?:article|story|facebook|twitter|x)[^.!?]*"
+    r"|skip to (?:main )?content|(?:read|czytaj) (?:more|więcej|też|także)\W*$)[.!?:]?"
+)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def _load_encoding() -> Any:
+    """Return a tiktoken encoding for the configured model, or ``None``."""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                try:
+                    import tiktoken
+
+                    try:
+                        _encoding = tiktoken.encoding_for_model(get_model())
+                    except KeyError:
+                        _encoding = tiktoken.get_encoding("o200k_base")
+                except Exception as exc:
+                    # tiktoken is optional and may be unable to fetch its tables.
+                    logger.info("tiktoken unavailable (%s); estimating tokens", exc)
+                    _encoding = None
+                _encoding_loaded = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken when available, else ~4 characters per token."""
+    encoding = _load_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def clean_notes(text: str) -> str:
+    """Drop newsletter/cookie/share boilerplate and collapse whitespace."""
+    return _SPACE_RE.sub(" ", _BOILERPLATE_RE.sub(" ", text)).strip()
+
+
+def _shingles(text: str, size: int = 3) -> frozenset:
+    words = [word.lower() for word in _WORD_RE.findall(text)]
+    if len(words) < size:
+        return frozenset([" ".join(words)]) if words else frozenset()
+    return frozenset(" ".join(words[i : i + size]) for i in range(len(words) - size + 1))
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def compact_sources(
+    sources: Sequence[Source], threshold: Optional[float] = None
+) -> List[Source]:
+    """Clean source notes and drop repeats of an earlier source.
+
+    A source is a repeat when it shares a URL with, or its notes are
+    near-identical (word-shingle Jaccard >= ``threshold``) to, a source
+    kept before it. Input order, i.e. search rank, is preserved.
+    """
+    if threshold is None:
+        threshold = env_float("PROMPT_DEDUPE_THRESHOLD", 0.8)
+    kept: List[Source] = []
+    seen_urls: set[str] = set()
+    seen_shingles: List[frozenset] = []
+    for source in sources:
+        notes = clean_notes(source.notes) or source.notes
+        url = canonical_url(source.url) if source.url.strip() else ""
+        shingles = _shingles(notes)
+        if url and url in seen_urls:
+            continue
+        if any(_jaccard(shingles, other) >= threshold for other in seen_shingles):
+            continue
+        if url:
+            seen_urls.add(url)
+        seen_shingles.append(shingles)
+        kept.append(source if notes == source.notes else replace(source, notes=notes))
+    return kept
+
+
+def source_lines(sources: Sequence[Source]) -> List[str]:
+    return [f"{s.id}: {s.title} - {s.notes} ({s.url})" for s in sources]
+
+
+def build_prompt(
+    stage: str,
+    render: Callable[[Dict[str, str]], str],
+    sections: Dict[str, List[str]],
+    drop_order: Sequence[Tuple[str, int]],
+    budget: int,
+    raw_sections: Optional[Dict[str, List[str]]] = None,
+) -> str:
+    """Render a prompt within ``budget`` tokens.
+
+    ``render`` receives each section joined by newlines. When the prompt is
+    over budget, trailing lines are dropped from the sections in
+    ``drop_order`` (``(name, lines_to_keep)`` pairs, lowest priority first).
+    Sections are cut strictly in that order: a section is only trimmed once
+    every earlier one is down to its ``lines_to_keep``, so e.g. all reference
+    lines go before the first source line. Each cut point is binary-searched,
+    which keeps truncation to O(log n) renders per section.
+    ``raw_sections``, the uncompacted input, is only rendered to log the
+    before/after token counts. A budget of 0 disables truncation.
+    """
+    kept = {name: list(lines) for name, lines in sections.items()}
+
+    def rendered() -> Tuple[str, int]:
+        text = render({name: "\n".join(lines) for name, lines in kept.items()})
+        return text, count_tokens(text)
+
+    prompt, tokens = rendered()
+    if budget > 0 and tokens > budget:
+        for name, keep in drop_order:
+            lines = kept[name]
+            if len(lines) <= keep:
+                continue
+            kept[name] = lines[:keep]
+            prompt, tokens = rendered()
+            if tokens > budget:
+                continue
+            # The longest prefix that fits; the whole section did not.
+            low, high = keep, len(lines) - 1
+            while low < high:
+                mid = (low + high + 1) // 2
+                kept[name] = lines[:mid]
+                text, count = rendered()
+                if count <= budget:
+                    low, prompt, tokens = mid, text, count
+                else:
+                    high = mid - 1
+            kept[name] = lines[:low]
+            break
+        if tokens > budget:
+            logger.warning(
+                "Prompt (%s) still %d tokens after truncation (budget %d)",
+                stage,
+                tokens,
+                budget,
+            )
+    if raw_sections is not None and logger.isEnabledFor(logging.INFO):
+        before = count_tokens(
+            render({name: "\n".join(lines) for name, lines in raw_sections.items()})
+        )
+        logger.info("Prompt (%s): %d -> %d tokens", stage, before, tokens)
+    return prompt
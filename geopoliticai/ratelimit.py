@@ -0,0 +1,369 @@
+"""Shared token-bucket rate limiting for upstream providers."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Callable, Deque, Dict, Iterator, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+_priority: ContextVar[int] = ContextVar("geopoliticai_priority", default=INTERACTIVE)
+_caller: ContextVar[str] = ContextVar("geopoliticai_caller", default="default")
+_boost: ContextVar[Optional["PriorityBoost"]] = ContextVar(
+    "geopoliticai_priority_boost", default=None
+)
+_limiters: Dict[str, "RateLimiter"] = {}
+_limiters_lock = threading.Lock()
+
+
+@contextmanager
+def rate_limit_scope(
+    priority: int = INTERACTIVE, caller: Optional[str] = None
+) -> Iterator[None]:
+    """Issue the enclosed upstream calls under a priority class and caller id.
+
+    Waiters of a higher class (lower number) always go first; within a class,
+    callers take turns so one large run cannot starve the others.
+    """
+    priority_token = _priority.set(priority)
+    caller_token = _caller.set(caller or uuid.uuid4().hex)
+    try:
+        yield
+    finally:
+        _caller.reset(caller_token)
+        _priority.reset(priority_token)
+
+
+class PriorityBoost:
+    """Priority of work shared by several callers, e.g. a coalesced run.
+
+    Starts at the creating caller's priority; each caller that joins can
+    only raise it. Upstream calls issued inside :func:`priority_boost`
+    queue at the most urgent priority of every caller so far.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._parent = _boost.get()
+        self._priority = current_priority()
+
+    @property
+    def priority(self) -> int:
+        if self._parent is None:
+            return self._priority
+        return min(self._priority, self._parent.priority)
+
+    def join(self) -> None:
+        """Raise the boost to the calling context's priority if more urgent."""
+        priority = current_priority()
+        with self._lock:
+            self._priority = min(self._priority, priority)
+
+
+def current_priority() -> int:
+    """Priority the calling context's upstream calls queue at."""
+    boost = _boost.get()
+    priority = _priority.get()
+    return priority if boost is None else min(priority, boost.priority)
+
+
+@contextmanager
+def priority_boost(boost: PriorityBoost) -> Iterator[None]:
+    """Issue the enclosed upstream calls at ``boost``'s priority or better."""
+    token = _boost.set(boost)
+    try:
+        yield
+    finally:
+        _boost.reset(token)
+
+
+class TokenBucket:
+    """Refilling token bucket; callers must hold the owning limiter's lock."""
+
+    def __init__(
+        self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("TokenBucket rate and capacity must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+
+    @classmethod
+    def per_minute(
+        cls,
+        limit: float,
+        burst_seconds: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> "TokenBucket":
+        rate = limit / 60.0
+        return cls(rate, max(1.0, rate * burst_seconds), clock)
+
+    @classmethod
+    def per_second(
+        cls,
+        limit: float,
+        burst_seconds: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> "TokenBucket":
+        return cls(limit, max(1.0, limit * burst_seconds), clock)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` tokens (capped at capacity) are available."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self._tokens >= amount:
+            return 0.0
+        return (amount - self._tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self._tokens -= min(amount, self.capacity)
+
+
+class _Waiter:
+    __slots__ = ("cost", "priority", "caller", "enqueued_at", "waited", "event", "loop")
+
+    def __init__(
+        self,
+        cost: Mapping[str, float],
+        priority: int,
+        caller: str,
+        enqueued_at: float,
+        loop: Optional[asyncio.AbstractEventLoop],
+    ) -> None:
+        self.cost = cost
+        self.priority = priority
+        self.caller = caller
+        self.enqueued_at = enqueued_at
+        self.waited = 0.0
+        self.loop = loop
+        self.event: "threading.Event | asyncio.Event" = (
+            threading.Event() if loop is None else asyncio.Event()
+        )
+
+    def wake(self) -> None:
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self.event.set)
+
+
+class RateLimiter:
+    """Priority-aware, fair limiter over named token buckets and a concurrency cap.
+
+    A call costs some amount from each bucket (e.g. ``requests=1, tokens=900``)
+    and optionally holds one of ``max_in_flight`` slots while it runs. Sync and
+    async callers share the same queue, so one limiter governs a whole process.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        buckets: Mapping[str, TokenBucket],
+        max_in_flight: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.buckets = dict(buckets)
+        self.max_in_flight = max_in_flight
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._queues: Dict[int, "OrderedDict[str, Deque[_Waiter]]"] = {}
+        self._in_flight = 0
+        self._granted: Dict[int, int] = {}
+        self._wait_seconds = 0.0
+        self._max_wait = 0.0
+        with _limiters_lock:
+            _limiters[name] = self
+
+    # Queue bookkeeping; all of these run under self._lock.
+
+    def _head(self) -> Optional[_Waiter]:
+        for priority in sorted(self._queues):
+            callers = self._queues[priority]
+            if callers:
+                return next(iter(callers.values()))[0]
+        return None
+
+    def _enqueue(
+        self, cost: Mapping[str, float], loop: Optional[asyncio.AbstractEventLoop]
+    ) -> _Waiter:
+        waiter = _Waiter(cost, current_priority(), _caller.get(), self._clock(), loop)
+        with self._lock:
+            callers = self._queues.setdefault(waiter.priority, OrderedDict())
+            callers.setdefault(waiter.caller, deque()).append(waiter)
+        return waiter
+
+    def _remove(self, waiter: _Waiter, rotate: bool) -> None:
+        callers = self._queues[waiter.priority]
+        waiters = callers[waiter.caller]
+        waiters.remove(waiter)
+        if not waiters:
+            del callers[waiter.caller]
+        elif rotate:
+            # Round-robin: the served caller goes to the back of its class.
+            callers.move_to_end(waiter.caller)
+
+    def _wake_head(self) -> None:
+        head = self._head()
+        if head is not None:
+            head.wake()
+
+    def _poll(self, waiter: _Waiter) -> Optional[float]:
+        """Grant ``waiter`` if it is next and capacity allows.
+
+        Returns 0 when granted, the seconds to wait for tokens when it is at
+        the head, or ``None`` when it must wait to be woken.
+        """
+        if self._head() is not waiter:
+            return None
+        if self.max_in_flight and self._in_flight >= self.max_in_flight:
+            return None
+        delay = max(
+            (
+                bucket.wait_time(waiter.cost[name])
+                for name, bucket in self.buckets.items()
+                if waiter.cost.get(name)
+            ),
+            default=0.0,
+        )
+        if delay > 0:
+            return delay
+        for name, bucket in self.buckets.items():
+            if waiter.cost.get(name):
+                bucket.consume(waiter.cost[name])
+        self._in_flight += 1
+        self._remove(waiter, rotate=True)
+        waited = waiter.waited = self._clock() - waiter.enqueued_at
+        self._granted[waiter.priority] = self._granted.get(waiter.priority, 0) + 1
+        self._wait_seconds += waited
+        self._max_wait = max(self._max_wait, waited)
+        if waited > 1.0:
+            logger.info(
+                "%s rate limit: %s call waited %.2fs",
+                self.name,
+                PRIORITY_NAMES.get(waiter.priority, waiter.priority),
+                waited,
+            )
+        self._wake_head()
+        return 0.0
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        with self._lock:
+            callers = self._queues.get(waiter.priority, {})
+            if waiter in callers.get(waiter.caller, ()):
+                self._remove(waiter, rotate=False)
+                self._wake_head()
+
+    def acquire(self, **cost: float) -> float:
+        """Block until the call may proceed; pair with :meth:`release`.
+
+        Returns the seconds spent queued.
+        """
+        waiter = self._enqueue(cost, None)
+        try:
+            while True:
+                waiter.event.clear()
+                with self._lock:
+                    delay = self._poll(waiter)
+                if delay == 0:
+                    return waiter.waited
+                waiter.event.wait(delay)
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    async def aacquire(self, **cost: float) -> float:
+        """Async counterpart of :meth:`acquire`."""
+        waiter = self._enqueue(cost, asyncio.get_running_loop())
+        try:
+            while True:
+                waiter.event.clear()
+                with self._lock:
+                    delay = self._poll(waiter)
+                if delay == 0:
+                    return waiter.waited
+                try:
+                    await asyncio.wait_for(waiter.event.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._wake_head()
+
+    @contextmanager
+    def slot(self, **cost: float) -> Iterator[float]:
+        """Hold a granted slot for the block; yields the seconds spent queued."""
+        waited = self.acquire(**cost)
+        try:
+            yield waited
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def aslot(self, **cost: float) -> AsyncIterator[float]:
+        waited = await self.aacquire(**cost)
+        try:
+            yield waited
+        finally:
+            self.release()
+
+    def snapshot(self) -> dict:
+        """Queue depth and throughput counters for monitoring."""
+        with self._lock:
+            depth = {
+                PRIORITY_NAMES.get(priority, str(priority)): sum(
+                    len(waiters) for waiters in callers.values()
+                )
+                for priority, callers in self._queues.items()
+            }
+            granted = {
+                PRIORITY_NAMES.get(priority, str(priority)): count
+                for priority, count in self._granted.items()
+            }
+            return {
+                "queue_depth": depth,
+                "in_flight": self._in_flight,
+                "granted": granted,
+                "wait_seconds_total": round(self._wait_seconds, 3),
+                "max_wait_seconds": round(self._max_wait, 3),
+                "available": {
+                    name: round(bucket.tokens, 1) for name, bucket in self.buckets.items()
+                },
+            }
+
+
+def rate_limit_metrics() -> Dict[str, dict]:
+    """Snapshots of every limiter created in this process, keyed by name."""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.snapshot() for limiter in limiters}
@@ -2,9 +2,40 @@
 
 from __future__ import annotations
 
-from typing import Dict, List
+from typing import List, Sequence
 
-from geopoliticai.models import Claim, FactCheckResult, PipelineState, Source
+from geopoliticai.config import get_infosphere_sources
+from geopoliticai.models import (
+    Claim,
+    FactCheckResult,
+    PipelineResult,
+    PipelineState,
+    Source,
+)
+from geopoliticai.sources import SourceRegistry
+
+_REPORT_LABELS = {
+    "polish": {
+        "factual": "1. 🔎 Tło faktograficzne (z wyszukiwania)",
+        "left": "2. 🔴 Perspektywa lewicowa",
+        "centrist": "3. 🟡 Perspektywa centrowa",
+        "right": "4. 🔵 Perspektywa prawicowa",
+        "people": "5. 🟢 Perspektywa społeczna",
+        "fact": "6. ✅ Wyniki weryfikacji faktów",
+        "synthesis": "7. ⚖️ Synteza i najlepiej potwierdzone wnioski",
+        "refs": "Preferowane źródła:",
+    },
+    "english": {
+        "factual": "1. 🔎 Factual Background (from Web Searcher)",
+        "left": "2. 🔴 Left Perspective",
+        "centrist": "3. 🟡 Centrist Perspective",
+        "right": "4. 🔵 Right Perspective",
+        "people": "5. 🟢 People's Perspective",
+        "fact": "6. ✅ Fact Check Results",
+        "synthesis": "7. ⚖️ Synthesis & Best-Supported Conclusion",
+        "refs": "Preferred references:",
+    },
+}
 
 
 def render_sources(sources: List[Source]) -> str:
@@ -22,7 +53,7 @@ def render_claims(claims: List[Claim]) -> str:
     return "\n".join(lines)
 
 
-def render_reference_list(references: List[tuple[str, str]]) -> str:
+def render_reference_list(references: Sequence[tuple[str, str]]) -> str:
     return "\n".join(f"- {name} ({url})" for name, url in references)
 
 
@@ -34,14 +65,26 @@ def render_fact_checks(results: List[FactCheckResult]) -> str:
 
 
 def merge_sources(state: PipelineState) -> List[Source]:
-    dedup: Dict[str, Source] = {}
-    for src in (
-        state["left_sources"]
-        + state["centrist_sources"]
-        + state["right_sources"]
-        + state["people_sources"]
-        + state["fact_sources"]
-    ):
-        if src.url not in dedup:
-            dedup[src.url] = src
-    return list(dedup.values())
+    """Unique sources of the run, in perspective order."""
+    return SourceRegistry.from_state(state).sources()
+
+
+def render_report(result: PipelineResult) -> str:
+    """The full text report for ``result`` in its infosphere's language."""
+    labels = _REPORT_LABELS[result.language]
+    infosphere_sources = get_infosphere_sources(result.infosphere)
+    output: List[str] = [labels["factual"], render_sources(result.sources), ""]
+    for agent_key, claims in result.claims.items():
+        output.append(labels[agent_key])
+        output.append(labels["refs"])
+        output.append(render_reference_list(infosphere_sources[agent_key]))
+        output.append(render_claims(claims))
+        output.append("")
+    output.append(labels["fact"])
+    output.append(labels["refs"])
+    output.append(render_reference_list(infosphere_sources["fact"]))
+    output.append(render_fact_checks(result.fact_checks))
+    output.append("")
+    output.append(labels["synthesis"])
+    output.append(result.synthesis)
+    return "\n".join(output)
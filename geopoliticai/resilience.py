@@ -0,0 +1,210 @@
+"""Retry, deadline and circuit-breaker helpers for upstream calls."""
+
+from __future__ import annotations
+
+import email.utils
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamUnavailableError(RuntimeError):
+    """Raised when an upstream provider is failing fast or out of time."""
+
+
+class CircuitOpenError(UpstreamUnavailableError):
+    """Raised while the circuit breaker is open."""
+
+
+class DeadlineExceededError(UpstreamUnavailableError):
+    """Raised when the overall call deadline leaves no time for another attempt."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a half-open probe."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._clock() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def before_call(self) -> bool:
+        """Raise while open; return True when this call is the half-open probe."""
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if self._clock() - self._opened_at < self.reset_timeout or self._probing:
+                raise CircuitOpenError(f"{self.name} circuit is open; failing fast.")
+            # Half-open: let exactly one probe through.
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._probing:
+                    logger.warning("%s circuit opened after %d failures", self.name, self._failures)
+                self._opened_at = self._clock()
+            self._probing = False
+
+    def release_probe(self) -> None:
+        """Forget an in-flight probe that ended without a verdict."""
+        with self._lock:
+            self._probing = False
+
+
+@dataclass
+class RetryPolicy:
+    max_retries: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 20.0
+    attempt_timeout: float = 60.0
+    deadline: float = 120.0
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, parsed.timestamp() - time.time())
+
+
+def backoff_delay(
+    attempt: int, policy: RetryPolicy, retry_after: Optional[float] = None
+) -> float:
+    """Full-jitter exponential backoff; a server's Retry-After wins when larger."""
+    ceiling = min(policy.max_delay, policy.base_delay * (2 ** (attempt - 1)))
+    delay = random.uniform(0, ceiling)
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, policy.max_delay))
+    return delay
+
+
+class RetryBudget:
+    """Track attempts, deadline and breaker state for one logical call.
+
+    Usage::
+
+        budget = RetryBudget(...)
+        while True:
+            timeout = budget.start_attempt()
+            try:
+                result = call(timeout)
+            except Exception as exc:
+                time.sleep(budget.backoff(exc))  # re-raises when out of retries
+                continue
+            except BaseException:
+                budget.abandon()  # cancelled: free a half-open probe
+                raise
+            budget.succeeded()
+            return result
+    """
+
+    def __init__(
+        self,
+        name: str,
+        policy: RetryPolicy,
+        breaker: Optional[CircuitBreaker],
+        is_retryable: Callable[[BaseException], bool],
+        is_outage: Callable[[BaseException], bool],
+        retry_after: Callable[[BaseException], Optional[float]],
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.policy = policy
+        self.breaker = breaker
+        self.attempts = 0
+        self._is_retryable = is_retryable
+        self._is_outage = is_outage
+        self._retry_after = retry_after
+        self._clock = clock
+        self._deadline = clock() + policy.deadline
+        self._probing = False
+
+    @property
+    def retries(self) -> int:
+        return max(0, self.attempts - 1)
+
+    def start_attempt(self) -> float:
+        """Check the breaker and deadline; return this attempt's timeout."""
+        remaining = self._deadline - self._clock()
+        if remaining <= 0:
+            raise DeadlineExceededError(f"{self.name} call exceeded its deadline.")
+        if self.breaker is not None:
+            self._probing = self.breaker.before_call()
+        self.attempts += 1
+        return min(self.policy.attempt_timeout, remaining)
+
+    def succeeded(self) -> None:
+        if self.breaker is not None:
+            self.breaker.record_success()
+
+    def abandon(self) -> None:
+        """Forget the current attempt, e.g. when it was cancelled mid-flight.
+
+        Without this a cancelled half-open probe would keep the breaker
+        failing fast for good.
+        """
+        if self.breaker is not None and self._probing:
+            self.breaker.release_probe()
+
+    def backoff(self, exc: BaseException) -> float:
+        """Return the delay before retrying ``exc``; re-raise it when giving up."""
+        if self.breaker is not None:
+            if self._is_outage(exc):
+                self.breaker.record_failure()
+            else:
+                self.breaker.release_probe()
+        if not self._is_retryable(exc) or self.attempts > self.policy.max_retries:
+            raise exc
+        delay = backoff_delay(self.attempts, self.policy, self._retry_after(exc))
+        if self._clock() + delay >= self._deadline:
+            raise exc
+        logger.warning(
+            "%s attempt %d failed (%s); retrying in %.2fs",
+            self.name,
+            self.attempts,
+            type(exc).__name__,
+            delay,
+        )
+        return delay
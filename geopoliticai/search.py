@@ -2,16 +2,245 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextvars
 import logging
 import os
-from typing import Dict, List, Optional, Union
-
-from tavily import TavilyClient
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Union,
+)
 
+from geopoliticai.cache import CacheStats, SingleFlight, TTLCache, make_cache_key
+from geopoliticai.clients import (
+    AsyncTavilySearchClient,
+    TavilySearchClient,
+    get_client_manager,
+)
+from geopoliticai.config import (
+    env_flag,
+    env_float,
+    env_int,
+    get_infosphere_sources,
+)
+from geopoliticai.metrics import Span, record
 from geopoliticai.models import PipelineState, Source
+from geopoliticai.ratelimit import BATCH, RateLimiter, TokenBucket, rate_limit_scope
+from geopoliticai.sources import SourceRegistry, source_id
 
 logger = logging.getLogger(__name__)
 
+SEARCH_MAX_RESULTS = 6
+SEARCH_DEPTH = "advanced"
+SEARCH_AGENTS = ("left", "centrist", "right", "people", "fact")
+DEFAULT_AGENT_TTLS: Dict[str, float] = {"fact": 900.0}
+
+_search_limiter: RateLimiter | None = None
+_search_cache: "SearchCache | None" = None
+_search_cache_configured = False
+_search_cache_lock = threading.Lock()
+_refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="search-refresh")
+# Per-site searches run here so a search that overruns the agent budget can
+# be abandoned without blocking the branch (it still fills the cache).
+_site_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="search-site")
+# The async twin: site searches are never cancelled, as other requests may be
+# waiting on the same cache load; this holds them until they finish.
+_site_tasks: Set["asyncio.Task[List[Source]]"] = set()
+
+
+class SearchCache:
+    """Search-result cache with per-agent freshness and stale-while-revalidate.
+
+    Entries younger than the agent's TTL are fresh. For a further
+    ``stale_ttl`` seconds they are still served, but the first reader
+    schedules a background refresh.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        default_ttl: float = 3600.0,
+        agent_ttls: Optional[Dict[str, float]] = None,
+        stale_ttl: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.default_ttl = default_ttl
+        self.agent_ttls = dict(agent_ttls or {})
+        self.stale_ttl = stale_ttl
+        self.memory = TTLCache(max_entries, default_ttl + stale_ttl, clock)
+        self.refreshes = 0
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self._refreshing: Set[str] = set()
+        self._background: Set["asyncio.Task[None]"] = set()
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.memory.stats
+
+    def ttl_for(self, agent_key: str) -> float:
+        return self.agent_ttls.get(agent_key, self.default_ttl)
+
+    def _lookup(self, key: str, agent_key: str) -> tuple[Optional[List[Source]], bool]:
+        entry = self.memory.get_entry(key)
+        if entry is None:
+            return None, False
+        sources, age = entry
+        return list(sources), age > self.ttl_for(agent_key)
+
+    def _store(self, key: str, agent_key: str, sources: List[Source]) -> List[Source]:
+        self.memory.set(key, list(sources), self.ttl_for(agent_key) + self.stale_ttl)
+        return sources
+
+    def _claim_refresh(self, key: str) -> bool:
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self.refreshes += 1
+            return True
+
+    def _release_refresh(self, key: str) -> None:
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def fetch(
+        self, key: str, agent_key: str, loader: Callable[[], List[Source]]
+    ) -> List[Source]:
+        cached, stale = self._lookup(key, agent_key)
+        if cached is not None:
+            if stale and self._claim_refresh(key):
+                _refresh_executor.submit(self._refresh, key, agent_key, loader)
+            return cached
+        sources, shared = self._flight.do(
+            key, lambda: self._store(key, agent_key, loader())
+        )
+        if shared:
+            self.stats.coalesced += 1
+        return list(sources)
+
+    async def afetch(
+        self,
+        key: str,
+        agent_key: str,
+        loader: Callable[[], Awaitable[List[Source]]],
+    ) -> List[Source]:
+        cached, stale = self._lookup(key, agent_key)
+        if cached is not None:
+            if stale and self._claim_refresh(key):
+                task = asyncio.ensure_future(self._arefresh(key, agent_key, loader))
+                self._background.add(task)
+                task.add_done_callback(self._background.discard)
+            return cached
+
+        async def load() -> List[Source]:
+            return self._store(key, agent_key, await loader())
+
+        sources, shared = await self._flight.ado(key, load)
+        if shared:
+            self.stats.coalesced += 1
+        return list(sources)
+
+    def _refresh(
+        self, key: str, agent_key: str, loader: Callable[[], List[Source]]
+    ) -> None:
+        try:
+            self._store(key, agent_key, loader())
+            logger.info("Search cache (%s): refreshed stale entry", agent_key)
+        except Exception:
+            logger.warning("Search cache (%s): refresh failed", agent_key, exc_info=True)
+        finally:
+            self._release_refresh(key)
+
+    async def _arefresh(
+        self,
+        key: str,
+        agent_key: str,
+        loader: Callable[[], Awaitable[List[Source]]],
+    ) -> None:
+        try:
+            self._store(key, agent_key, await loader())
+            logger.info("Search cache (%s): refreshed stale entry", agent_key)
+        except Exception:
+            logger.warning("Search cache (%s): refresh failed", agent_key, exc_info=True)
+        finally:
+            self._release_refresh(key)
+
+    def clear(self) -> None:
+        self.memory.clear()
+
+
+def _build_search_cache() -> SearchCache | None:
+    if not env_flag("SEARCH_CACHE_ENABLED", True):
+        return None
+    default_ttl = env_float("SEARCH_CACHE_TTL", 3600.0)
+    agent_ttls = {
+        agent_key: env_float(
+            f"SEARCH_CACHE_TTL_{agent_key.upper()}",
+            DEFAULT_AGENT_TTLS.get(agent_key, default_ttl),
+        )
+        for agent_key in SEARCH_AGENTS
+    }
+    return SearchCache(
+        max_entries=env_int("SEARCH_CACHE_MAX_ENTRIES", 2048),
+        default_ttl=default_ttl,
+        agent_ttls=agent_ttls,
+        stale_ttl=env_float("SEARCH_CACHE_STALE_TTL", 3600.0),
+    )
+
+
+def get_search_cache() -> SearchCache | None:
+    """Return the process-wide search cache (configured from the environment)."""
+    global _search_cache, _search_cache_configured
+    if not _search_cache_configured:
+        with _search_cache_lock:
+            if not _search_cache_configured:
+                _search_cache = _build_search_cache()
+                _search_cache_configured = True
+    return _search_cache
+
+
+def set_search_cache(cache: SearchCache | None) -> None:
+    """Install a custom search cache (or ``None`` to disable caching)."""
+    global _search_cache, _search_cache_configured
+    with _search_cache_lock:
+        _search_cache = cache
+        _search_cache_configured = True
+
+
+def get_search_limiter() -> RateLimiter:
+    """Return the process-wide Tavily limiter (SEARCH_RPS; 0 disables)."""
+    global _search_limiter
+    if _search_limiter is None:
+        buckets = {}
+        rps = env_float("SEARCH_RPS", 5.0)
+        if rps > 0:
+            buckets["requests"] = TokenBucket.per_second(rps)
+        _search_limiter = RateLimiter(
+            "tavily", buckets, max_in_flight=env_int("SEARCH_MAX_CONCURRENCY", 0)
+        )
+    return _search_limiter
+
+
+def get_tavily_client(api_key: str) -> TavilySearchClient:
+    """A Tavily client on the shared connection pool."""
+    return get_client_manager().tavily(api_key)
+
+
+def get_async_tavily_client(api_key: str) -> AsyncTavilySearchClient:
+    return get_client_manager().async_tavily(api_key)
+
 
 def _seed_for_agent(
     seed_sources: Optional[Union[List[Source], Dict[str, List[Source]]]], agent_key: str
@@ -23,38 +252,63 @@ def _seed_for_agent(
     return None
 
 
-def _build_biased_query(query: str, references: List[tuple[str, str]]) -> str:
-    sites = [url.replace("https://", "").replace("http://", "") for _, url in references]
-    site_filter = " OR ".join(f"site:{site}" for site in sites)
+def _sites(references: Sequence[tuple[str, str]]) -> List[str]:
+    return [url.replace("https://", "").replace("http://", "") for _, url in references]
+
+
+def _build_biased_query(query: str, references: Sequence[tuple[str, str]]) -> str:
+    site_filter = " OR ".join(f"site:{site}" for site in _sites(references))
     return f"{query} ({site_filter})"
 
 
-def web_searcher(
-    state: PipelineState,
-    agent_key: str,
-    references: List[tuple[str, str]],
-    seed_sources: Optional[Union[List[Source], Dict[str, List[Source]]]] = None,
-) -> List[Source]:
-    seeded = _seed_for_agent(seed_sources, agent_key)
-    if seeded:
-        logger.info("Web searcher (%s): using seed_sources (%d)", agent_key, len(seeded))
-        return seeded
+def _site_query(query: str, site: str) -> str:
+    return f"{query} site:{site}"
+
+
+def merge_site_results(results: Sequence[Sequence[Source]]) -> List[Source]:
+    """Interleave per-site results by rank and drop repeated canonical URLs.
+
+    Every site's best result comes before any site's second, so one domain
+    cannot crowd out the others.
+    """
+    registry = SourceRegistry()
+    depth = max((len(site_results) for site_results in results), default=0)
+    for rank in range(depth):
+        for site_results in results:
+            if rank < len(site_results):
+                registry.add(site_results[rank])
+    return registry.sources()
+
+
+def _normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip().lower()
 
+
+def search_cache_key(
+    biased_query: str,
+    max_results: int = SEARCH_MAX_RESULTS,
+    depth: str = SEARCH_DEPTH,
+) -> str:
+    return make_cache_key(_normalize_query(biased_query), max_results, depth)
+
+
+def _require_tavily_key() -> str:
     tavily_key = os.getenv("TAVILY_KEY")
     if not tavily_key:
         raise ValueError("Missing TAVILY_KEY for live search.")
+    return tavily_key
+
 
-    logger.info("Web searcher (%s): querying Tavily", agent_key)
-    client = TavilyClient(api_key=tavily_key)
-    biased_query = _build_biased_query(state["query"], references)
-    response = client.search(biased_query, max_results=6, search_depth="advanced")
+def _parse_results(agent_key: str, response: dict) -> List[Source]:
     sources: List[Source] = []
-    for idx, item in enumerate(response.get("results", []), start=1):
+    for item in response.get("results", []):
         notes = (item.get("content") or "").strip().replace("\n", " ")
+        title = (item.get("title") or "Untitled").strip()
+        url = (item.get("url") or "").strip()
         source = Source(
-            id=f"S{idx}",
-            title=(item.get("title") or "Untitled").strip(),
-            url=(item.get("url") or "").strip(),
+            id=source_id(url, title),
+            title=title,
+            url=url,
             notes=notes[:240] if notes else "No summary provided.",
         )
         sources.append(source)
@@ -64,3 +318,264 @@ def web_searcher(
 
     logger.info("Web searcher (%s): received %d sources", agent_key, len(sources))
     return sources
+
+
+def _per_site() -> bool:
+    strategy = os.getenv("SEARCH_STRATEGY", "combined").strip().lower()
+    if strategy not in ("combined", "per_site"):
+        raise ValueError(f"Unknown SEARCH_STRATEGY: {strategy}")
+    return strategy == "per_site"
+
+
+def _search(
+    tavily_key: str,
+    agent_key: str,
+    query: str,
+    max_results: int,
+    span: Span,
+    cache: SearchCache | None,
+) -> List[Source]:
+    def load() -> List[Source]:
+        logger.info("Web searcher (%s): querying Tavily", agent_key)
+        if span.cache is not None:
+            span.cache = "miss"
+        with get_search_limiter().slot(requests=1) as waited:
+            span.queue_wait += waited
+            response = get_tavily_client(tavily_key).search(
+                query, max_results=max_results, search_depth=SEARCH_DEPTH
+            )
+        return _parse_results(agent_key, response)
+
+    if cache is None:
+        return load()
+    return cache.fetch(search_cache_key(query, max_results), agent_key, load)
+
+
+async def _asearch(
+    tavily_key: str,
+    agent_key: str,
+    query: str,
+    max_results: int,
+    span: Span,
+    cache: SearchCache | None,
+) -> List[Source]:
+    async def load() -> List[Source]:
+        logger.info("Web searcher (%s): querying Tavily (async)", agent_key)
+        if span.cache is not None:
+            span.cache = "miss"
+        client = get_async_tavily_client(tavily_key)
+        async with get_search_limiter().aslot(requests=1) as waited:
+            span.queue_wait += waited
+            response = await client.search(
+                query, max_results=max_results, search_depth=SEARCH_DEPTH
+            )
+        return _parse_results(agent_key, response)
+
+    if cache is None:
+        return await load()
+    return await cache.afetch(search_cache_key(query, max_results), agent_key, load)
+
+
+def _merge_outcomes(
+    agent_key: str,
+    sites: Sequence[str],
+    outcomes: Sequence[List[Source] | BaseException | None],
+) -> List[Source]:
+    """Merge per-site outcomes; ``None`` marks a site that overran the budget."""
+    kept: List[List[Source]] = []
+    errors: List[BaseException] = []
+    for site, outcome in zip(sites, outcomes):
+        if outcome is None:
+            logger.warning("Web searcher (%s): %s over budget, dropped", agent_key, site)
+        elif isinstance(outcome, BaseException):
+            logger.warning("Web searcher (%s): %s failed: %s", agent_key, site, outcome)
+            errors.append(outcome)
+        else:
+            kept.append(outcome)
+    if not kept and errors:
+        raise errors[0]
+    sources = merge_site_results(kept)
+    logger.info(
+        "Web searcher (%s): %d sources from %d/%d sites",
+        agent_key,
+        len(sources),
+        len(kept),
+        len(sites),
+    )
+    return sources
+
+
+def _budget() -> Optional[float]:
+    budget = env_float("SEARCH_AGENT_BUDGET", 8.0)
+    return budget if budget > 0 else None
+
+
+def _search_per_site(
+    tavily_key: str,
+    agent_key: str,
+    query: str,
+    references: Sequence[tuple[str, str]],
+    span: Span,
+    cache: SearchCache | None,
+) -> List[Source]:
+    sites = _sites(references)
+    quota = env_int("SEARCH_PER_SITE_RESULTS", 2)
+    futures: List[Future] = [
+        _site_executor.submit(
+            contextvars.copy_context().run,
+            _search,
+            tavily_key,
+            agent_key,
+            _site_query(query, site),
+            quota,
+            span,
+            cache,
+        )
+        for site in sites
+    ]
+    done, _ = wait(futures, timeout=_budget())
+    outcomes: List[List[Source] | BaseException | None] = []
+    for future in futures:
+        if future not in done:
+            outcomes.append(None)
+        else:
+            outcomes.append(future.exception() or future.result())
+    return _merge_outcomes(agent_key, sites, outcomes)
+
+
+def _site_task_done(task: "asyncio.Task[List[Source]]") -> None:
+    _site_tasks.discard(task)
+    # Retrieve the outcome so an abandoned search's failure is not reported
+    # as never retrieved; _merge_outcomes logs the ones still waited for.
+    if not task.cancelled():
+        task.exception()
+
+
+async def _asearch_per_site(
+    tavily_key: str,
+    agent_key: str,
+    query: str,
+    references: Sequence[tuple[str, str]],
+    span: Span,
+    cache: SearchCache | None,
+) -> List[Source]:
+    sites = _sites(references)
+    quota = env_int("SEARCH_PER_SITE_RESULTS", 2)
+    tasks = [
+        asyncio.ensure_future(
+            _asearch(tavily_key, agent_key, _site_query(query, site), quota, span, cache)
+        )
+        for site in sites
+    ]
+    for task in tasks:
+        _site_tasks.add(task)
+        task.add_done_callback(_site_task_done)
+    done, _ = await asyncio.wait(tasks, timeout=_budget())
+    outcomes: List[List[Source] | BaseException | None] = []
+    for task in tasks:
+        if task not in done:
+            outcomes.append(None)
+        else:
+            outcomes.append(task.exception() or task.result())
+    return _merge_outcomes(agent_key, sites, outcomes)
+
+
+def web_searcher(
+    state: PipelineState,
+    agent_key: str,
+    references: Sequence[tuple[str, str]],
+    seed_sources: Optional[Union[List[Source], Dict[str, List[Source]]]] = None,
+) -> List[Source]:
+    """Search the web for ``agent_key``, biased towards its reference sites.
+
+    With ``SEARCH_STRATEGY=per_site`` each reference site is queried on its
+    own (``SEARCH_PER_SITE_RESULTS`` each) and the results are merged; sites
+    that miss the ``SEARCH_AGENT_BUDGET`` are dropped. Otherwise one query
+    ORs the sites together.
+    """
+    seeded = _seed_for_agent(seed_sources, agent_key)
+    if seeded:
+        logger.info("Web searcher (%s): using seed_sources (%d)", agent_key, len(seeded))
+        return seeded
+
+    tavily_key = _require_tavily_key()
+    span = Span("search", agent_key)
+    started = time.perf_counter()
+    try:
+        cache = get_search_cache()
+        if cache is not None:
+            span.cache = "hit"
+        if _per_site() and len(references) > 1:
+            return _search_per_site(
+                tavily_key, agent_key, state["query"], references, span, cache
+            )
+        biased_query = _build_biased_query(state["query"], references)
+        return _search(tavily_key, agent_key, biased_query, SEARCH_MAX_RESULTS, span, cache)
+    except Exception as exc:
+        span.error = type(exc).__name__
+        raise
+    finally:
+        span.seconds = time.perf_counter() - started
+        record(span)
+
+
+async def aweb_searcher(
+    state: PipelineState,
+    agent_key: str,
+    references: Sequence[tuple[str, str]],
+    seed_sources: Optional[Union[List[Source], Dict[str, List[Source]]]] = None,
+) -> List[Source]:
+    """Async counterpart of :func:`web_searcher` on the pooled async client."""
+    seeded = _seed_for_agent(seed_sources, agent_key)
+    if seeded:
+        logger.info("Web searcher (%s): using seed_sources (%d)", agent_key, len(seeded))
+        return seeded
+
+    tavily_key = _require_tavily_key()
+    span = Span("search", agent_key)
+    started = time.perf_counter()
+    try:
+        cache = get_search_cache()
+        if cache is not None:
+            span.cache = "hit"
+        if _per_site() and len(references) > 1:
+            return await _asearch_per_site(
+                tavily_key, agent_key, state["query"], references, span, cache
+            )
+        biased_query = _build_biased_query(state["query"], references)
+        return await _asearch(
+            tavily_key, agent_key, biased_query, SEARCH_MAX_RESULTS, span, cache
+        )
+    except Exception as exc:
+        span.error = type(exc).__name__
+        raise
+    finally:
+        span.seconds = time.perf_counter() - started
+        record(span)
+
+
+def warm_search_cache(
+    queries: Iterable[str],
+    infosphere: str = "english",
+    max_workers: int = 4,
+) -> int:
+    """Pre-populate the search cache for trending queries; returns searches warmed."""
+    infosphere_sources = get_infosphere_sources(infosphere)
+    jobs = [(query, agent_key) for query in queries for agent_key in SEARCH_AGENTS]
+
+    def warm(job: tuple[str, str]) -> bool:
+        query, agent_key = job
+        try:
+            with rate_limit_scope(BATCH, caller="search-warm-up"):
+                web_searcher({"query": query}, agent_key, infosphere_sources[agent_key])
+        except Exception:
+            logger.warning(
+                "Search warm-up failed: agent=%s query=%s", agent_key, query, exc_info=True
+            )
+            return False
+        return True
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        warmed = sum(executor.map(warm, jobs))
+    logger.info("Search warm-up: %d/%d searches cached", warmed, len(jobs))
+    return warmed
@@ -0,0 +1,347 @@
+"""Semantic cache of pipeline outputs keyed by query embeddings."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Protocol, Sequence
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from geopoliticai.cache import CacheStats
+from geopoliticai.config import env_flag, env_float, env_int
+from geopoliticai.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_NEGATIONS = frozenset("not no never nor without nie bez nigdy ani".split())
+_STOPWORDS = frozenset(
+    "a an and are as at be by did do does for from has have how in is it of on or "
+    "the to was were what when where which who why will with "
+    "a i w we z ze na do o od po za że się jak jaki jakie co czy to jest są".split()
+)
+
+_semantic_cache: "SemanticCache | None" = None
+_semantic_cache_configured = False
+_semantic_cache_lock = threading.Lock()
+
+
+class Embedder(Protocol):
+    name: str
+    dim: int
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Return one L2-normalised float32 row per text."""
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
+
+
+class HashingEmbedder:
+    """Signed feature hashing of content words, their trigrams and word pairs.
+
+    Stop words are ignored. Trigrams absorb inflection ("election"/
+    "elections", "wybory"/"wyborów"); numbers are kept whole so "2023" and
+    "2027" stay distinct. Pairs of neighbouring content words, wrapping
+    from the last word to the first, keep "Russia attack Ukraine" apart
+    from "Ukraine attack Russia" while "EU steel tariffs" still matches
+    "tariffs on EU steel". Negations weigh double so "not" flips a match.
+    """
+
+    def __init__(self, dim: int = 512) -> None:
+        self.dim = dim
+        # Versioned so a persisted index built with other features is rebuilt.
+        self.name = f"hashing-v2-{dim}"
+
+    def _bucket(self, feature: str) -> tuple[int, float]:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        return value % self.dim, 1.0 if value >> 63 else -1.0
+
+    def _features(self, text: str) -> Dict[str, float]:
+        features: Dict[str, float] = {}
+        words = [
+            word
+            for word in _WORD_RE.findall(text.lower().replace("n't", " not"))
+            if word not in _STOPWORDS
+        ]
+        if len(words) > 1:
+            for first, second in zip(words, words[1:] + words[:1]):
+                pair = f"p:{first} {second}"
+                features[pair] = features.get(pair, 0.0) + 1.0
+        for word in words:
+            weight = 2.0 if word in _NEGATIONS else 1.0
+            features[f"w:{word}"] = features.get(f"w:{word}", 0.0) + weight
+            if word.isdigit() or len(word) < 3 or word in _NEGATIONS:
+                continue
+            padded = f"<{word}>"
+            grams = [padded[i : i + 3] for i in range(len(padded) - 2)]
+            for gram in grams:
+                features[f"c:{gram}"] = features.get(f"c:{gram}", 0.0) + 1.0 / len(grams)
+        return features
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text).items():
+                column, sign = self._bucket(feature)
+                matrix[row, column] += sign * weight
+        return _normalize_rows(matrix)
+
+
+class SentenceTransformerEmbedder:
+    """Local CPU embedding model (requires the optional sentence-transformers)."""
+
+    def __init__(self, model_name: str) -> None:
+        from sentence_transformers import SentenceTransformer
+
+        self._model = SentenceTransformer(model_name, device="cpu")
+        self.dim = int(self._model.get_sentence_embedding_dimension())
+        self.name = f"st:{model_name}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self._model.encode(list(texts), convert_to_numpy=True)
+        return _normalize_rows(np.asarray(vectors, dtype=np.float32))
+
+
+class SemanticCache:
+    """Pipeline outputs served for queries similar to an earlier one.
+
+    Vectors live in a fixed ``(max_entries, dim)`` float32 matrix, memory
+    mapped from ``<path>.npy`` when ``path`` is set so a restart maps the
+    index instead of re-embedding. Row metadata and outputs live in
+    ``<path>.sqlite3``. A lookup is a hit when the best cosine similarity
+    among live rows of the same infosphere reaches ``threshold``; rows
+    older than ``ttl`` are ignored and reused first, then the least
+    recently used row is evicted.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        max_entries: int = 4096,
+        threshold: float = 0.9,
+        ttl: float = 3600.0,
+        path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.embedder = embedder
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._occupied = np.zeros(max_entries, dtype=bool)
+        self._groups = np.full(max_entries, -1, dtype=np.int32)
+        self._created = np.zeros(max_entries, dtype=np.float64)
+        self._used = np.zeros(max_entries, dtype=np.float64)
+        self._group_codes: Dict[str, int] = {}
+        shape = (max_entries, embedder.dim)
+        self._conn = sqlite3.connect(
+            f"{path}.sqlite3" if path else ":memory:", check_same_thread=False
+        )
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries (row INTEGER PRIMARY KEY, "
+                "query TEXT NOT NULL, infosphere TEXT NOT NULL, output TEXT NOT NULL, "
+                "created_at REAL NOT NULL, used_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+        layout = f"{embedder.name}:{max_entries}"
+        if path is None:
+            self._vectors = np.zeros(shape, dtype=np.float32)
+            return
+        vectors_path = f"{path}.npy"
+        stored = self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'layout'"
+        ).fetchone()
+        if os.path.exists(vectors_path) and stored and stored[0] == layout:
+            self._vectors = open_memmap(vectors_path, mode="r+")
+            self._load_rows()
+            return
+        self._vectors = open_memmap(vectors_path, mode="w+", dtype=np.float32, shape=shape)
+        with self._conn:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('layout', ?)", (layout,)
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._occupied.sum())
+
+    def _group(self, infosphere: str) -> int:
+        code = self._group_codes.get(infosphere)
+        if code is None:
+            code = self._group_codes[infosphere] = len(self._group_codes)
+        return code
+
+    def _load_rows(self) -> None:
+        rows = self._conn.execute(
+            "SELECT row, infosphere, created_at, used_at FROM entries"
+        ).fetchall()
+        for row, infosphere, created_at, used_at in rows:
+            if 0 <= row < self.max_entries:
+                self._occupied[row] = True
+                self._groups[row] = self._group(infosphere)
+                self._created[row] = created_at
+                self._used[row] = used_at
+        logger.info("Semantic cache loaded: entries=%d", len(rows))
+
+    def _live(self, group: int, now: float) -> np.ndarray:
+        return self._occupied & (self._groups == group) & (self._created > now - self.ttl)
+
+    def _best(self, vectors: np.ndarray, live: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Best live row and its cosine similarity for each query vector."""
+        rows = np.flatnonzero(live)
+        if rows.size == 0:
+            empty = np.full(len(vectors), -1, dtype=np.int64)
+            return empty, np.zeros(len(vectors), dtype=np.float32)
+        scores = vectors @ self._vectors[rows].T
+        best = scores.argmax(axis=1)
+        return rows[best], scores[np.arange(len(vectors)), best]
+
+    def lookup_many(self, queries: Sequence[str], infosphere: str) -> List[Optional[str]]:
+        """Cached output for each query, or ``None``; one matrix product for all."""
+        if not queries:
+            return []
+        vectors = self.embedder.embed(queries)
+        with self._lock:
+            now = self._clock()
+            rows, scores = self._best(vectors, self._live(self._group(infosphere), now))
+            hit_rows = [
+                int(row) if score >= self.threshold else None
+                for row, score in zip(rows, scores)
+            ]
+            outputs: Dict[int, str] = {}
+            for row in {row for row in hit_rows if row is not None}:
+                self._used[row] = now
+                found = self._conn.execute(
+                    "SELECT output FROM entries WHERE row = ?", (row,)
+                ).fetchone()
+                if found is not None:
+                    outputs[row] = found[0]
+            with self._conn:
+                self._conn.executemany(
+                    "UPDATE entries SET used_at = ? WHERE row = ?",
+                    [(now, row) for row in outputs],
+                )
+            results = [outputs.get(row) if row is not None else None for row in hit_rows]
+            for result, score in zip(results, scores):
+                if result is None:
+                    self.stats.misses += 1
+                else:
+                    self.stats.hits += 1
+                    logger.info("Semantic cache hit: similarity=%.3f", score)
+                CACHE_REQUESTS.inc(layer="semantic", result="miss" if result is None else "hit")
+        return results
+
+    def lookup(self, query: str, infosphere: str) -> Optional[str]:
+        return self.lookup_many([query], infosphere)[0]
+
+    def _free_row(self, now: float) -> int:
+        free = ~self._occupied | (self._created <= now - self.ttl)
+        if free.any():
+            return int(np.argmax(free))
+        self.stats.evictions += 1
+        return int(np.argmin(self._used))
+
+    def store(self, query: str, infosphere: str, output: str) -> None:
+        """Cache ``output``, replacing a near-duplicate entry if there is one."""
+        vector = self.embedder.embed([query])
+        with self._lock:
+            now = self._clock()
+            group = self._group(infosphere)
+            rows, scores = self._best(vector, self._live(group, now))
+            row = int(rows[0]) if scores[0] >= self.threshold else self._free_row(now)
+            self._vectors[row] = vector[0]
+            if isinstance(self._vectors, np.memmap):
+                self._vectors.flush()
+            self._occupied[row] = True
+            self._groups[row] = group
+            self._created[row] = now
+            self._used[row] = now
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries "
+                    "(row, query, infosphere, output, created_at, used_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (row, query, infosphere, output, now, now),
+                )
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._occupied[:] = False
+            self._conn.execute("DELETE FROM entries")
+
+    def close(self) -> None:
+        with self._lock:
+            if isinstance(self._vectors, np.memmap):
+                self._vectors.flush()
+            self._conn.close()
+
+
+def _build_embedder() -> Embedder:
+    model = os.getenv("SEMANTIC_CACHE_MODEL")
+    if model:
+        try:
+            return SentenceTransformerEmbedder(model)
+        except Exception as exc:
+            # The model is optional; fall back rather than disable the cache.
+            logger.warning(
+                "Embedding model %s unavailable (%s); using hashing embedder", model, exc
+            )
+    return HashingEmbedder(env_int("SEMANTIC_CACHE_DIM", 512))
+
+
+def _build_semantic_cache() -> SemanticCache | None:
+    if not env_flag("SEMANTIC_CACHE_ENABLED", False):
+        return None
+    embedder = _build_embedder()
+    path = os.getenv("SEMANTIC_CACHE_PATH", "geopoliticai_semantic_cache") or None
+    cache = SemanticCache(
+        embedder,
+        max_entries=env_int("SEMANTIC_CACHE_MAX_ENTRIES", 4096),
+        threshold=env_float("SEMANTIC_CACHE_THRESHOLD", 0.9),
+        ttl=env_float("SEMANTIC_CACHE_TTL", 3600.0),
+        path=path,
+    )
+    logger.info(
+        "Semantic cache enabled: embedder=%s threshold=%.2f path=%s",
+        embedder.name,
+        cache.threshold,
+        path or "memory",
+    )
+    return cache
+
+
+def get_semantic_cache() -> SemanticCache | None:
+    """Return the process-wide semantic cache (opt-in via SEMANTIC_CACHE_ENABLED)."""
+    global _semantic_cache, _semantic_cache_configured
+    if not _semantic_cache_configured:
+        with _semantic_cache_lock:
+            if not _semantic_cache_configured:
+                _semantic_cache = _build_semantic_cache()
+                _semantic_cache_configured = True
+    return _semantic_cache
+
+
+def set_semantic_cache(cache: SemanticCache | None) -> None:
+    """Install a custom semantic cache (or ``None`` to disable it)."""
+    global _semantic_cache, _semantic_cache_configured
+    with _semantic_cache_lock:
+        _semantic_cache = cache
+        _semantic_cache_configured = True
@@ -0,0 +1,153 @@
+"""Wire formats for :class:`~geopoliticai.models.PipelineResult`.
+
+JSON uses ``orjson`` when it is installed and the standard library
+otherwise; MessagePack needs ``ormsgpack`` or ``msgpack``. Both fast
+encoders serialise the slotted dataclasses natively, so a result is
+encoded without first being copied into nested dicts.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, is_dataclass
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from geopoliticai.models import PipelineResult
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+try:
+    import ormsgpack
+except ImportError:  # pragma: no cover - depends on the environment
+    ormsgpack = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depends on the environment
+    msgpack = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+TEXT = "text/plain"
+_ALIASES = {"application/x-msgpack": MSGPACK, "application/vnd.msgpack": MSGPACK}
+
+
+def _default(value: Any) -> Any:
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _payload(result: PipelineResult, extra: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    payload = result.to_dict()
+    if extra:
+        payload.update(extra)
+    return payload
+
+
+def msgpack_available() -> bool:
+    return ormsgpack is not None or msgpack is not None
+
+
+def media_types() -> Tuple[str, ...]:
+    """Media types :func:`dumps` can produce here, JSON first."""
+    return (JSON, MSGPACK) if msgpack_available() else (JSON,)
+
+
+def dumps(
+    result: PipelineResult,
+    media_type: str = JSON,
+    extra: Optional[Mapping[str, Any]] = None,
+) -> bytes:
+    """Encode ``result`` (plus any ``extra`` top-level keys) as ``media_type``."""
+    payload = _payload(result, extra)
+    media_type = _ALIASES.get(media_type, media_type)
+    if media_type == JSON:
+        if orjson is not None:
+            try:
+                return orjson.dumps(payload)
+            except TypeError:
+                # orjson rejects lone surrogates; fall through and replace them.
+                pass
+        text = json.dumps(payload, ensure_ascii=False, default=_default)
+        return text.encode("utf-8", errors="replace")
+    if media_type == MSGPACK:
+        if ormsgpack is not None:
+            try:
+                return ormsgpack.packb(payload)
+            except TypeError:
+                pass
+        if msgpack is not None:
+            return msgpack.packb(
+                json.loads(json.dumps(payload, default=_default)), use_bin_type=True
+            )
+        raise ValueError("MessagePack output needs ormsgpack or msgpack installed.")
+    raise ValueError(f"Unsupported media type: {media_type}")
+
+
+def loads(data: bytes | str, media_type: str = JSON) -> PipelineResult:
+    """Decode a payload written by :func:`dumps`; raises ``ValueError`` if invalid."""
+    media_type = _ALIASES.get(media_type, media_type)
+    if media_type == JSON:
+        decoded = orjson.loads(data) if orjson is not None else json.loads(data)
+    elif media_type == MSGPACK:
+        if ormsgpack is not None:
+            decoded = ormsgpack.unpackb(data)
+        elif msgpack is not None:
+            decoded = msgpack.unpackb(data, raw=False)
+        else:
+            raise ValueError("MessagePack input needs ormsgpack or msgpack installed.")
+    else:
+        raise ValueError(f"Unsupported media type: {media_type}")
+    if not isinstance(decoded, dict):
+        raise ValueError("Result payload is not an object.")
+    try:
+        return PipelineResult.from_dict(decoded)
+    except (KeyError, TypeError) as exc:
+        raise ValueError(f"Malformed result payload: {exc}") from exc
+
+
+def _accepted(accept: str) -> List[Tuple[str, float]]:
+    ranges = []
+    for item in accept.split(","):
+        media_range, *params = [part.strip() for part in item.split(";")]
+        if not media_range:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        ranges.append((_ALIASES.get(media_range.lower(), media_range.lower()), quality))
+    return ranges
+
+
+def negotiate(accept: Optional[str], offered: Tuple[str, ...]) -> Optional[str]:
+    """Pick the best of ``offered`` for an ``Accept`` header.
+
+    Highest quality wins; ties go to the order of ``offered``. A missing
+    header accepts the first offer; ``None`` means nothing is acceptable.
+    """
+    if not accept or not accept.strip():
+        return offered[0] if offered else None
+    ranges = _accepted(accept)
+    best: Optional[str] = None
+    best_quality = 0.0
+    for candidate in offered:
+        patterns = (candidate, candidate.split("/", 1)[0] + "/*", "*/*")
+        # The most specific matching range decides ("text/plain;q=0, */*").
+        matches = [
+            (patterns.index(media_range), q)
+            for media_range, q in ranges
+            if media_range in patterns
+        ]
+        quality = min(matches)[1] if matches else 0.0
+        if quality > best_quality:
+            best, best_quality = candidate, quality
+    return best
@@ -0,0 +1,196 @@
+"""Persisted per-query run snapshots for incremental re-analysis."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from geopoliticai.cache import make_cache_key
+from geopoliticai.models import (
+    PERSPECTIVES,
+    Claim,
+    FactCheckResult,
+    PipelineState,
+    Source,
+)
+from geopoliticai.sources import canonical_url
+
+logger = logging.getLogger(__name__)
+
+_snapshot_store: "SnapshotStore | None" = None
+_snapshot_store_lock = threading.Lock()
+
+
+def snapshot_key(query: str, infosphere: str) -> str:
+    return make_cache_key(re.sub(r"\s+", " ", query).strip().lower(), infosphere)
+
+
+def _content_hash(source: Source) -> str:
+    return make_cache_key(
+        [re.sub(r"\s+", " ", text).strip().lower() for text in (source.title, source.notes)]
+    )
+
+
+def sources_fingerprint(sources: Sequence[Source]) -> str:
+    """Hash of the source set, keyed by canonical URL plus a content hash.
+
+    Order-independent: a search that only returned the same pages in a
+    different order (or with trivially different whitespace) keeps the
+    fingerprint, so the perspective's claims are reused. The id is part of
+    the key because reused claims cite sources by id.
+    """
+    return make_cache_key(
+        sorted((canonical_url(s.url), s.id, _content_hash(s)) for s in sources)
+    )
+
+
+def _claim_text(claim: Claim) -> str:
+    return claim.text.strip().lower()
+
+
+def _claim_from_dict(data: dict) -> Claim:
+    return Claim(text=data["text"], source_ids=list(data.get("source_ids", [])))
+
+
+@dataclass
+class RunSnapshot:
+    query: str
+    infosphere: str
+    fingerprints: Dict[str, str]
+    claims: Dict[str, List[Claim]]
+    fact_checks: List[FactCheckResult]
+    created_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_state(cls, query: str, infosphere: str, state: PipelineState) -> "RunSnapshot":
+        fingerprints = {
+            agent_key: sources_fingerprint(state[f"{agent_key}_sources"])
+            for agent_key in PERSPECTIVES + ("fact",)
+        }
+        return cls(
+            query=query,
+            infosphere=infosphere,
+            fingerprints=fingerprints,
+            claims={
+                agent_key: list(state[f"{agent_key}_claims"]) for agent_key in PERSPECTIVES
+            },
+            fact_checks=list(state["fact_checks"]),
+        )
+
+    def reusable_claims(
+        self, agent_key: str, sources: Sequence[Source]
+    ) -> Optional[List[Claim]]:
+        """Return the previous claims when the perspective's sources are unchanged."""
+        if self.fingerprints.get(agent_key) != sources_fingerprint(sources):
+            return None
+        return list(self.claims.get(agent_key, []))
+
+    def reusable_fact_checks(self, state: PipelineState) -> List[FactCheckResult]:
+        """Previous verdicts still valid for ``state``.
+
+        A verdict carries over when the fact-check sources are unchanged and
+        its claim came from a perspective whose sources are unchanged, i.e.
+        the claim was reused verbatim. Everything else is re-checked.
+        """
+        if self.fingerprints.get("fact") != sources_fingerprint(state["fact_sources"]):
+            return []
+        unchanged = {
+            _claim_text(claim)
+            for agent_key in PERSPECTIVES
+            if self.reusable_claims(agent_key, state[f"{agent_key}_sources"]) is not None
+            for claim in self.claims.get(agent_key, [])
+        }
+        return [r for r in self.fact_checks if _claim_text(r.claim) in unchanged]
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text: str) -> "RunSnapshot":
+        data = json.loads(text)
+        return cls(
+            query=data["query"],
+            infosphere=data["infosphere"],
+            fingerprints=dict(data["fingerprints"]),
+            claims={
+                agent_key: [_claim_from_dict(item) for item in items]
+                for agent_key, items in data["claims"].items()
+            },
+            fact_checks=[
+                FactCheckResult(
+                    claim=_claim_from_dict(item["claim"]),
+                    verdict=item["verdict"],
+                    rationale=item["rationale"],
+                )
+                for item in data["fact_checks"]
+            ],
+            created_at=data["created_at"],
+        )
+
+
+class SnapshotStore:
+    """SQLite-backed latest snapshot per (query, infosphere)."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                "key TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def get(self, query: str, infosphere: str) -> Optional[RunSnapshot]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM snapshots WHERE key = ?",
+                (snapshot_key(query, infosphere),),
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return RunSnapshot.from_json(row[0])
+        except (KeyError, TypeError, ValueError):
+            logger.warning("Ignoring unreadable snapshot for query=%s", query)
+            return None
+
+    def put(self, snapshot: RunSnapshot) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO snapshots (key, data, updated_at) VALUES (?, ?, ?)",
+                (
+                    snapshot_key(snapshot.query, snapshot.infosphere),
+                    snapshot.to_json(),
+                    snapshot.created_at,
+                ),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def get_snapshot_store() -> SnapshotStore:
+    """Return the process-wide snapshot store (SNAPSHOT_STORE_PATH)."""
+    global _snapshot_store
+    if _snapshot_store is None:
+        with _snapshot_store_lock:
+            if _snapshot_store is None:
+                _snapshot_store = SnapshotStore(
+                    os.getenv("SNAPSHOT_STORE_PATH", "geopoliticai_snapshots.sqlite3")
+                )
+    return _snapshot_store
+
+
+def set_snapshot_store(store: Optional[SnapshotStore]) -> None:
+    global _snapshot_store
+    with _snapshot_store_lock:
+        _snapshot_store = store
@@ -0,0 +1,135 @@
+"""Stable source ids and the per-run source registry."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+if TYPE_CHECKING:
+    from geopoliticai.models import PipelineState, Source
+
+logger = logging.getLogger(__name__)
+
+SOURCE_KEYS = (
+    "left_sources",
+    "centrist_sources",
+    "right_sources",
+    "people_sources",
+    "fact_sources",
+)
+
+_ID_HEX_DIGITS = 10
+_TRACKING_PREFIXES = ("utm_",)
+_TRACKING_PARAMS = frozenset({"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src"})
+
+
+def canonical_url(url: str) -> str:
+    """Normalise ``url`` so trivially different links to one page compare equal.
+
+    Drops the scheme distinction, ``www.``, fragments, tracking parameters
+    and trailing slashes; remaining query parameters are sorted.
+    """
+    parts = urlsplit(url.strip())
+    if not parts.netloc:
+        return url.strip().lower()
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    params = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith(_TRACKING_PREFIXES)
+        and name.lower() not in _TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/")
+    return urlunsplit(("https", host, path, urlencode(params), ""))
+
+
+def source_id(url: str, title: str = "") -> str:
+    """Stable id for a source: a short hash of its canonical URL.
+
+    Every search for the same page yields the same id, whichever perspective
+    found it. Sources without a URL are keyed by title. Ids are 40 bits:
+    short enough for prompts, and a clash among a run's few hundred
+    sources (which would point citations at the wrong page) is about a
+    one-in-a-million event.
+    """
+    key = canonical_url(url) if url.strip() else f"title:{title.strip().lower()}"
+    return "S" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:_ID_HEX_DIGITS]
+
+
+class SourceRegistry:
+    """Every source of a run, indexed by id and by canonical URL.
+
+    Insertion order is kept, so a registry built from the perspectives in
+    pipeline order lists sources in the order they were first found.
+    """
+
+    __slots__ = ("_by_id", "_by_url", "_ordered")
+
+    def __init__(self, sources: Iterable[Source] = ()) -> None:
+        self._by_id: Dict[str, Source] = {}
+        self._by_url: Dict[str, Source] = {}
+        self._ordered: List[Source] = []
+        for source in sources:
+            self.add(source)
+
+    @classmethod
+    def from_state(cls, state: PipelineState) -> "SourceRegistry":
+        """Return the run's registry, building it if the state has none yet."""
+        registry = state.get("source_registry")
+        if registry is not None:
+            return registry
+        return cls(source for key in SOURCE_KEYS for source in state.get(key, []))
+
+    def add(self, source: Source) -> Source:
+        """Register ``source`` and return the entry held for it.
+
+        A source whose canonical URL (or, without a URL, whose id) is
+        already known resolves to the first one registered.
+        """
+        url = canonical_url(source.url) if source.url.strip() else None
+        if url is not None and url in self._by_url:
+            return self._by_url[url]
+        if url is None and source.id in self._by_id:
+            return self._by_id[source.id]
+        if source.id in self._by_id:
+            # Caller-supplied ids (e.g. seed sources) may repeat across lists;
+            # the id keeps pointing at the first source.
+            logger.debug("Source id %s reused for %s", source.id, source.url)
+        else:
+            self._by_id[source.id] = source
+        if url is not None:
+            self._by_url[url] = source
+        self._ordered.append(source)
+        return source
+
+    def get(self, source_id: str) -> Optional[Source]:
+        return self._by_id.get(source_id)
+
+    def find(self, url: str) -> Optional[Source]:
+        return self._by_url.get(canonical_url(url))
+
+    def resolve(self, source_ids: Iterable[str]) -> List[Source]:
+        """Sources for ``source_ids``, skipping unknown ids and repeats."""
+        resolved: Dict[str, Source] = {}
+        for sid in source_ids:
+            source = self._by_id.get(sid)
+            if source is not None:
+                resolved.setdefault(sid, source)
+        return list(resolved.values())
+
+    def sources(self) -> List[Source]:
+        """Unique sources in first-seen order."""
+        return list(self._ordered)
+
+    def __contains__(self, source_id: object) -> bool:
+        return source_id in self._by_id
+
+    def __iter__(self) -> Iterator[Source]:
+        return iter(self._ordered)
+
+    def __len__(self) -> int:
+        return len(self._ordered)
@@ -3,29 +3,29 @@
 from __future__ import annotations
 
 import logging
+from typing import Tuple
 
-from geopoliticai.llm import llm_json
-from geopoliticai.models import PipelineState
+from geopoliticai.llm import allm_json, llm_json
+from geopoliticai.models import PipelineState, all_claims
 
 logger = logging.getLogger(__name__)
 
 
-def summarizer_judge(state: PipelineState, language: str | None = None) -> PipelineState:
-    logger.info("Summarizing: fact_checks=%d", len(state["fact_checks"]))
+_SUMMARIZER_SYSTEM = (
+    "You are a neutral methodological judge who prioritizes evidence quality."
+)
+
+
+def _summary_prompt(state: PipelineState, language: str | None = None) -> str:
     claims_block = "\n".join(
         f"- {c.text} (Sources: {', '.join(c.source_ids) if c.source_ids else 'none'})"
-        for c in (
-            state["left_claims"]
-            + state["centrist_claims"]
-            + state["right_claims"]
-            + state["people_claims"]
-        )
+        for c in all_claims(state)
     )
     fact_block = "\n".join(
         f"- {r.verdict}: {r.claim.text} — {r.rationale}" for r in state["fact_checks"]
     )
     response_language = "Polish" if language == "polish" else "English"
-    user = f"""
+    return f"""
 Claims:
 {claims_block}
 
@@ -37,9 +37,24 @@ Write the synthesis in {response_language}.
 Return JSON: {{"synthesis": "..."}}.
 """.strip()
 
-    data = llm_json(
-        system="You are a neutral methodological judge who prioritizes evidence quality.",
-        user=user,
-    )
-    synthesis = (data.get("synthesis") or "").strip()
-    return {**state, "synthesis": synthesis}
+
+def summary_request(state: PipelineState, language: str | None = None) -> Tuple[str, str]:
+    """``(system, user)`` messages asking for the synthesis of ``state``."""
+    return _SUMMARIZER_SYSTEM, _summary_prompt(state, language)
+
+
+def parse_summary(data: dict) -> dict:
+    """State update from the summarizer's JSON answer."""
+    return {"synthesis": (data.get("synthesis") or "").strip()}
+
+
+def summarizer_judge(state: PipelineState, language: str | None = None) -> dict:
+    logger.info("Summarizing: fact_checks=%d", len(state["fact_checks"]))
+    system, user = summary_request(state, language)
+    return parse_summary(llm_json(system=system, user=user))
+
+
+async def asummarizer_judge(state: PipelineState, language: str | None = None) -> dict:
+    logger.info("Summarizing (async): fact_checks=%d", len(state["fact_checks"]))
+    system, user = summary_request(state, language)
+    return parse_summary(await allm_json(system=system, user=user))
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from geopoliticai.api import app
+from geopoliticai.graph import run_pipeline
+from geopoliticai.jobs import JobStore
+from geopoliticai.serialization import loads
+from tests.test_graph import (
+    _all_seed_sources,
+    _make_fake_allm_json,
+    _make_fake_llm_json,
+    _patched_allm,
+    _patched_llm,
+)
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("TAVILY_KEY", "test-key")
+    monkeypatch.setenv("JOB_STORE_PATH", str(tmp_path / "jobs.sqlite3"))
+    seeds = _all_seed_sources()
+
+    async def fake_aweb_searcher(state, agent_key, references, seed_sources=None):
+        if state["query"] == "slow query":
+            await asyncio.sleep(5)
+        return seeds[agent_key]
+
+    with patch("geopoliticai.graph.aweb_searcher", fake_aweb_searcher), _patched_allm(
+        _make_fake_allm_json("english")
+    ):
+        with TestClient(app) as test_client:
+            yield test_client
+
+
+def test_stream_emits_stages_and_final_output(client):
+    # prepare
+    with _patched_llm(_make_fake_llm_json("english")):
+        expected = run_pipeline("Test query", seed_sources=_all_seed_sources())
+
+    # execute
+    with client.stream(
+        "POST", "/run_pipeline/stream", json={"query": "Test query"}
+    ) as response:
+        events = [json.loads(line) for line in response.iter_lines() if line]
+
+    # assert
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert events[0]["event"] == "sources"
+    assert {e["perspective"] for e in events if e["event"] == "claims"} == {
+        "left",
+        "centrist",
+        "right",
+        "people",
+    }
+    assert [e["event"] for e in events[-3:]] == ["fact_checks", "synthesis", "final"]
+    assert events[-1]["output"] == expected
+
+
+def test_stream_rejects_unknown_infosphere(client):
+    # execute
+    response = client.post(
+        "/run_pipeline/stream", json={"query": "Test query", "infosphere": "klingon"}
+    )
+
+    # assert
+    assert response.status_code == 400
+
+
+def test_run_pipeline_negotiates_response_format(client):
+    # prepare
+    with _patched_llm(_make_fake_llm_json("english")):
+        expected = run_pipeline(
+            "Test query", seed_sources=_all_seed_sources(), structured=True
+        )
+
+    # execute
+    default = client.post("/run_pipeline", json={"query": "Test query"})
+    structured = client.post(
+        "/run_pipeline", json={"query": "Test query", "structured": True, "trace": True}
+    )
+    packed = client.post(
+        "/run_pipeline",
+        json={"query": "Test query"},
+        headers={"Accept": "application/msgpack"},
+    )
+    text = client.post(
+        "/run_pipeline", json={"query": "Test query"}, headers={"Accept": "text/plain"}
+    )
+    refused = client.post(
+        "/run_pipeline", json={"query": "Test query"}, headers={"Accept": "image/png"}
+    )
+
+    # assert
+    assert default.json()["output"] == expected.text
+    assert structured.json()["schema_version"] == 1
+    assert "trace" in structured.json()
+    assert loads(structured.content) == expected
+    assert packed.headers["content-type"] == "application/msgpack"
+    assert loads(packed.content, "application/msgpack") == expected
+    assert text.headers["content-type"].startswith("text/plain")
+    assert text.text == expected.text
+    assert refused.status_code == 406
+
+
+def _wait_for_job(client, job_id: str, timeout: float = 5.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] not in ("queued", "running") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.02)
+
+
+def test_job_runs_to_completion_and_deduplicates(client):
+    # prepare
+    with _patched_llm(_make_fake_llm_json("english")):
+        expected = run_pipeline("Test query", seed_sources=_all_seed_sources())
+
+    # execute
+    submitted = client.post("/jobs", json={"query": "Test query"})
+    duplicate = client.post("/jobs", json={"query": "  test   QUERY "})
+    job = _wait_for_job(client, submitted.json()["id"])
+    retried = client.post("/jobs", json={"query": "Test query"})
+
+    # assert
+    assert submitted.status_code == 202
+    assert duplicate.json()["id"] == submitted.json()["id"]
+    assert job["status"] == "succeeded"
+    assert job["result"] == expected
+    assert job["progress"] == {"completed": 12, "total": 12}
+    assert retried.json()["id"] == job["id"]
+
+
+def test_idempotency_key_header_overrides_query_key(client):
+    # execute
+    first = client.post(
+        "/jobs", json={"query": "First"}, headers={"Idempotency-Key": "abc"}
+    )
+    repeat = client.post(
+        "/jobs", json={"query": "first "}, headers={"Idempotency-Key": "abc"}
+    )
+    other = client.post(
+        "/jobs", json={"query": "Second"}, headers={"Idempotency-Key": "abc"}
+    )
+
+    # assert
+    assert first.json()["id"] == repeat.json()["id"]
+    assert other.status_code == 409
+
+
+def test_jobs_pass_incremental_and_reject_other_options(client):
+    # execute
+    plain = client.post("/jobs", json={"query": "Options"})
+    incremental = client.post("/jobs", json={"query": "Options", "incremental": True})
+    structured = client.post("/jobs", json={"query": "Options", "structured": True})
+    traced = client.post("/jobs", json={"query": "Options", "trace": True})
+
+    # assert
+    assert incremental.json()["incremental"] is True
+    assert incremental.json()["id"] != plain.json()["id"]
+    assert structured.status_code == 400
+    assert traced.status_code == 400
+
+
+def test_cancel_running_job(client):
+    # prepare
+    job_id = client.post("/jobs", json={"query": "slow query"}).json()["id"]
+    deadline = time.monotonic() + 2.0
+    while client.get(f"/jobs/{job_id}").json()["status"] != "running":
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+
+    # execute
+    cancelled = client.delete(f"/jobs/{job_id}")
+    job = _wait_for_job(client, job_id)
+
+    # assert
+    assert cancelled.status_code == 200
+    assert job["status"] == "cancelled"
+    assert job["result"] is None
+
+
+def test_unknown_job_returns_404(client):
+    assert client.get("/jobs/missing").status_code == 404
+
+
+def test_health_reports_ready_once_prewarmed(client):
+    # execute
+    deadline = time.monotonic() + 10
+    response = client.get("/health")
+    while response.status_code == 503 and time.monotonic() < deadline:
+        assert response.json() == {"status": "starting"}
+        time.sleep(0.05)
+        response = client.get("/health")
+
+    # assert
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+
+def test_health_is_degraded_while_a_failed_prewarm_retries(monkeypatch, tmp_path):
+    # prepare
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("TAVILY_KEY", "test-key")
+    monkeypatch.setenv("JOB_STORE_PATH", str(tmp_path / "jobs.sqlite3"))
+    monkeypatch.setenv("API_PREWARM_RETRY_DELAY", "0.01")
+    attempts: list = []
+    release = threading.Event()
+
+    def flaky_compile_graphs() -> None:
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise RuntimeError("transient failure")
+        release.wait(5)
+
+    def poll(test_client: TestClient, status: str) -> dict:
+        deadline = time.monotonic() + 5
+        body = test_client.get("/health").json()
+        while body["status"] != status and time.monotonic() < deadline:
+            time.sleep(0.01)
+            body = test_client.get("/health").json()
+        return body
+
+    # execute / assert
+    try:
+        with patch("geopoliticai.graph.compile_graphs", flaky_compile_graphs):
+            with TestClient(app) as test_client:
+                assert poll(test_client, "degraded") == {"status": "degraded"}
+                assert test_client.get("/health").status_code == 200
+                release.set()
+                assert poll(test_client, "ok") == {"status": "ok"}
+    finally:
+        release.set()
+    assert len(attempts) == 2
+
+
+def test_job_store_adds_columns_to_an_older_database(tmp_path):
+    # prepare
+    path = str(tmp_path / "old.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE jobs (id TEXT PRIMARY KEY, query TEXT NOT NULL, "
+        "infosphere TEXT NOT NULL, idempotency_key TEXT NOT NULL, "
+        "status TEXT NOT NULL, stages TEXT NOT NULL, result TEXT, error TEXT, "
+        "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+    )
+    conn.execute(
+        "INSERT INTO jobs VALUES ('j1', 'Old', 'english', 'k', 'succeeded', '[]', "
+        "'report', NULL, 1.0, 1.0)"
+    )
+    conn.commit()
+    conn.close()
+
+    # execute
+    store = JobStore(path)
+    job = store.get("j1")
+    store.close()
+
+    # assert
+    assert job.incremental is False
+    assert job.request_hash == ""
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from geopoliticai.batch import (
+    BatchItem,
+    load_checkpoint,
+    read_batch_items,
+    run_pipeline_batch,
+)
+from tests.test_graph import _all_seed_sources, _make_fake_allm_json, _patched_allm
+
+
+def _collect(items, **kwargs) -> list:
+    async def run() -> list:
+        return [record async for record in run_pipeline_batch(items, **kwargs)]
+
+    return asyncio.run(run())
+
+
+def test_read_batch_items_accepts_strings_and_objects():
+    # prepare
+    lines = [
+        '"plain query"\n',
+        "\n",
+        '{"id": "x1", "query": "object query", "infosphere": "polish"}\n',
+    ]
+
+    # execute
+    items = list(read_batch_items(lines))
+
+    # assert
+    assert items == [
+        BatchItem(id="1", query="plain query", infosphere="english"),
+        BatchItem(id="x1", query="object query", infosphere="polish"),
+    ]
+
+
+def test_read_batch_items_rejects_missing_query():
+    with pytest.raises(ValueError):
+        list(read_batch_items(['{"id": "1"}']))
+
+
+def test_run_pipeline_batch_streams_in_completion_order():
+    # prepare
+    fake = _make_fake_allm_json("english")
+
+    async def slow_first(system: str, user: str, temperature: float = 0.2) -> dict:
+        if "Query: slow" in user:
+            await asyncio.sleep(0.2)
+        return await fake(system, user, temperature)
+
+    items = [BatchItem(id="a", query="slow"), BatchItem(id="b", query="fast")]
+
+    # execute
+    with _patched_allm(slow_first):
+        records = _collect(items, concurrency=2, seed_sources=_all_seed_sources())
+
+    # assert
+    assert [record["id"] for record in records] == ["b", "a"]
+    assert all(record["status"] == "ok" for record in records)
+    assert "Left claim about policy impacts." in records[0]["output"]
+
+
+def test_run_pipeline_batch_skips_checkpointed_items(tmp_path):
+    # prepare
+    checkpoint = tmp_path / "checkpoint.jsonl"
+    checkpoint.write_text(
+        json.dumps({"id": "a", "status": "ok"})
+        + "\n"
+        + json.dumps({"id": "b", "status": "error"})
+        + '\n{"id": "c", "sta',
+        encoding="utf-8",
+    )
+    items = [BatchItem(id=item_id, query=item_id) for item_id in ("a", "b", "c")]
+
+    # execute
+    completed = load_checkpoint(str(checkpoint))
+    with _patched_allm(_make_fake_allm_json("english")):
+        records = _collect(
+            items, completed=completed, seed_sources=_all_seed_sources()
+        )
+
+    # assert
+    assert completed == {"a"}
+    assert sorted(record["id"] for record in records) == ["b", "c"]
+
+
+def test_run_pipeline_batch_closes_when_consumer_stops_early():
+    # prepare
+    items = [BatchItem(id=str(n), query=f"Query {n}") for n in range(20)]
+
+    async def first_only() -> dict:
+        stream = run_pipeline_batch(items, concurrency=1, seed_sources=_all_seed_sources())
+        record = await stream.__anext__()
+        await asyncio.wait_for(stream.aclose(), timeout=5)
+        return record
+
+    # execute
+    with _patched_allm(_make_fake_allm_json("english")):
+        record = asyncio.run(first_only())
+
+    # assert
+    assert record["status"] == "ok"
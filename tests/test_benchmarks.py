@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import os
+import random
+
+from benchmarks import startup, state_allocations
+from benchmarks.fakes import LatencyModel
+from benchmarks.pipeline import compare_expert_modes, percentile, run_scenario
+from geopoliticai.models import all_claims
+
+
+def _backends() -> dict:
+    fixed = {"distribution": "fixed", "median": 0.001, "spread": 0.0, "per_token": 0.0}
+    return {
+        "llm": {"latency": fixed, "error_rate": 0.0, "completion_tokens": 50},
+        "search": {"latency": fixed, "error_rate": 0.0, "completion_tokens": 0},
+        "seed": 7,
+    }
+
+
+def test_percentile_interpolates():
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+    assert percentile([5.0], 99) == 5.0
+    assert percentile([], 50) == 0.0
+
+
+def test_latency_model_is_reproducible():
+    model = LatencyModel("lognormal", 0.2, 0.5)
+
+    assert model.sample(random.Random(1)) == model.sample(random.Random(1))
+
+
+def test_batch_scenario_runs_against_fake_backends(monkeypatch):
+    # prepare
+    env = {"OPENAI_API_KEY": "test-key", "TAVILY_KEY": "test-key", "LLM_RPM": "0"}
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+
+    # execute
+    result = run_scenario("batch", {"requests": 3, "concurrency": 2}, _backends(), {})
+
+    # assert
+    assert result["errors"] == 0
+    assert result["requests"] == 3
+    assert result["search_calls"] == 15
+    assert result["latency_seconds"]["p99"] >= result["latency_seconds"]["p50"] > 0
+
+
+def test_expert_mode_comparison_reports_reductions():
+    # prepare
+    def result(mode: str, calls: int, tokens: int) -> dict:
+        return {
+            "scenario": "batch",
+            "expert_mode": mode,
+            "requests": 2,
+            "llm_calls": calls,
+            "llm_prompt_tokens": tokens,
+            "llm_completion_tokens": 100,
+            "latency_seconds": {"p50": 1.0},
+        }
+
+    # execute
+    (comparison,) = compare_expert_modes(
+        [result("per_lens", 16, 8000), result("multi_lens", 10, 6000)]
+    )
+
+    # assert
+    assert comparison["llm_calls_per_request"] == [8.0, 5.0]
+    assert comparison["round_trip_reduction"] == 0.375
+    assert comparison["prompt_token_reduction"] == 0.25
+    assert comparison["completion_token_reduction"] == 0.0
+
+
+def test_state_allocation_graphs_agree():
+    # execute
+    legacy = state_allocations.run_once(
+        state_allocations.legacy_graph(), 8, 10, legacy=True
+    )
+    partial = state_allocations.run_once(state_allocations.build_graph(), 8, 10)
+
+    # assert
+    assert len(partial["result"].fact_checks) == 8
+    assert legacy["result"].text == partial["result"].text
+    assert "all_claims" not in legacy
+    assert partial["all_claims"] is all_claims(partial)
+
+
+def test_parse_importtime_keeps_nesting():
+    # prepare
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   _io\n"
+        "import time:       300 |        900 | geopoliticai\n"
+        "import time:       600 |        600 |   geopoliticai.config\n"
+    )
+
+    # execute
+    rows = startup.parse_importtime(stderr)
+
+    # assert
+    assert rows == [
+        ("_io", 1, 120),
+        ("geopoliticai", 0, 900),
+        ("geopoliticai.config", 1, 600),
+    ]
+
+
+def test_cli_cold_start_stays_light():
+    # prepare
+    budget_ms = float(os.getenv("STARTUP_BUDGET_MS", "1000"))
+
+    # execute
+    result = startup.measure(startup.TARGETS["cli_help"])
+
+    # assert
+    assert result["returncode"] == 0
+    assert result["heavy"] == []
+    assert result["total_ms"] < budget_ms
+
+
+def test_api_import_defers_pipeline_sdks():
+    # execute
+    result = startup.measure(startup.TARGETS["api_import"])
+
+    # assert
+    assert result["returncode"] == 0
+    assert not {"langgraph", "langchain_core", "openai", "tavily"} & set(result["heavy"])
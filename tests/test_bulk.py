@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from geopoliticai.batch import BatchItem
+from geopoliticai.batch_api import LocalBatchBackend, simulated_answer
+from geopoliticai.bulk import DONE, BulkRun
+from geopoliticai.graph import run_pipeline
+from geopoliticai.search import web_searcher
+from tests.test_graph import _all_seed_sources, _make_fake_llm_json, _patched_llm
+
+
+class _Interrupted(Exception):
+    pass
+
+
+def _interrupt(seconds: float) -> None:
+    raise _Interrupted
+
+
+class _Crash(BaseException):
+    """Escapes the per-item error handling, like a killed process."""
+
+
+@pytest.mark.parametrize("infosphere", ["english", "polish"])
+def test_bulk_run_matches_run_pipeline(tmp_path, infosphere):
+    # prepare
+    fake = _make_fake_llm_json(infosphere)
+    backend = LocalBatchBackend(str(tmp_path / "batches"), responder=fake)
+    items = [BatchItem(id="a", query="Test query", infosphere=infosphere)]
+
+    # execute
+    run = BulkRun(str(tmp_path / "run"), backend, seed_sources=_all_seed_sources())
+    records = list(run.run(items))
+    with _patched_llm(fake):
+        expected = run_pipeline(
+            "Test query", seed_sources=_all_seed_sources(), infosphere=infosphere
+        )
+
+    # assert
+    assert run.phase == DONE
+    assert [record["status"] for record in records] == ["ok"]
+    assert records[0]["output"] == expected
+
+
+def test_bulk_run_resumes_submitted_batch(tmp_path):
+    # prepare
+    batches = str(tmp_path / "batches")
+    items = [BatchItem(id=str(n), query=f"Query {n}") for n in range(3)]
+    interrupted = BulkRun(
+        str(tmp_path / "run"),
+        LocalBatchBackend(batches, polls=1),
+        seed_sources=_all_seed_sources(),
+        sleep=_interrupt,
+    )
+
+    # execute
+    with pytest.raises(_Interrupted):
+        list(interrupted.run(items))
+    resumed = BulkRun(
+        str(tmp_path / "run"), LocalBatchBackend(batches), seed_sources=_all_seed_sources()
+    )
+    records = list(resumed.run())
+
+    # assert
+    assert [record["id"] for record in records] == ["0", "1", "2"]
+    assert all(record["status"] == "ok" for record in records)
+    assert "Simulated leftist claim 1." in records[0]["output"]
+    # One batch per LLM phase: the claims batch was polled again, not resubmitted.
+    assert len(list((tmp_path / "batches").glob("*.input.jsonl"))) == 3
+    searched = (tmp_path / "run" / "searched.jsonl").read_text(encoding="utf-8")
+    assert len(searched.splitlines()) == 3
+
+
+def test_bulk_run_reports_failed_items(tmp_path):
+    # prepare
+    def responder(system: str, user: str, temperature: float = 0.2) -> dict:
+        if "Query: broken" in user and "perspective: centrist" in user:
+            raise ValueError("model refused")
+        return simulated_answer(system, user, temperature)
+
+    backend = LocalBatchBackend(str(tmp_path / "batches"), responder=responder)
+    items = [BatchItem(id="ok", query="fine"), BatchItem(id="bad", query="broken")]
+
+    # execute
+    records = list(
+        BulkRun(str(tmp_path / "run"), backend, seed_sources=_all_seed_sources()).run(
+            items
+        )
+    )
+
+    # assert
+    assert [record["status"] for record in records] == ["ok", "error"]
+    assert records[1]["error"].startswith("claims: ValueError: centrist: ")
+    assert "model refused" in records[1]["error"]
+    requests = (tmp_path / "run" / "summary.requests.jsonl").read_text(encoding="utf-8")
+    assert [json.loads(line)["custom_id"] for line in requests.splitlines()] == [
+        "0:synthesis"
+    ]
+
+
+def test_bulk_run_resumes_search_without_input(tmp_path):
+    # prepare
+    backend = LocalBatchBackend(str(tmp_path / "batches"))
+    items = [BatchItem(id=str(n), query=f"Query {n}") for n in range(3)]
+
+    def crash_on_second(state, *args, **kwargs):
+        if state["query"] == "Query 1":
+            raise _Crash
+        return web_searcher(state, *args, **kwargs)
+
+    # execute
+    with patch("geopoliticai.bulk.web_searcher", crash_on_second):
+        with pytest.raises(_Crash):
+            list(
+                BulkRun(
+                    str(tmp_path / "run"),
+                    backend,
+                    search_concurrency=1,
+                    seed_sources=_all_seed_sources(),
+                ).run(items)
+            )
+    records = list(
+        BulkRun(str(tmp_path / "run"), backend, seed_sources=_all_seed_sources()).run()
+    )
+
+    # assert
+    assert [record["id"] for record in records] == ["0", "1", "2"]
+    assert all(record["status"] == "ok" for record in records)
+
+
+def test_new_bulk_run_requires_items(tmp_path):
+    # prepare
+    run = BulkRun(str(tmp_path / "run"), LocalBatchBackend(str(tmp_path / "batches")))
+
+    # execute / assert
+    with pytest.raises(ValueError, match="no items"):
+        list(run.run())
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from geopoliticai import llm
+from geopoliticai.cache import (
+    ResponseCache,
+    SingleFlight,
+    SQLiteStore,
+    TTLCache,
+    make_cache_key,
+)
+from geopoliticai.ratelimit import BATCH, INTERACTIVE, current_priority, rate_limit_scope
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def llm_cache(monkeypatch):
+    cache = ResponseCache(TTLCache(max_entries=16, default_ttl=60.0))
+    monkeypatch.setattr(llm, "_llm_cache", cache)
+    monkeypatch.setattr(llm, "_llm_cache_configured", True)
+    return cache
+
+
+def test_ttl_cache_expires_entries():
+    # prepare
+    clock = _Clock()
+    cache = TTLCache(max_entries=4, default_ttl=10.0, clock=clock)
+    cache.set("a", {"value": 1})
+
+    # execute
+    fresh = cache.get("a")
+    clock.now = 11.0
+    expired = cache.get("a")
+
+    # assert
+    assert fresh == {"value": 1}
+    assert expired is None
+    assert cache.stats.hits == 1
+    assert cache.stats.expirations == 1
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    # prepare
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+
+    # execute
+    cache.set("c", 3)
+
+    # assert
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats.evictions == 1
+
+
+def test_disk_tier_survives_new_memory_tier(tmp_path):
+    # prepare
+    path = str(tmp_path / "llm.sqlite")
+    first = ResponseCache(TTLCache(), SQLiteStore(path))
+    first.set("key", {"claims": []})
+
+    # execute
+    second = ResponseCache(TTLCache(), SQLiteStore(path))
+    value = second.get("key")
+
+    # assert
+    assert value == {"claims": []}
+    assert second.stats.disk_hits == 1
+
+
+def test_get_or_compute_single_flight_across_threads():
+    # prepare
+    cache = ResponseCache(TTLCache())
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def compute() -> dict:
+        calls.append(1)
+        time.sleep(0.1)
+        return {"ok": True}
+
+    def worker(results: list) -> None:
+        barrier.wait()
+        results.append(cache.get_or_compute("same", compute))
+
+    results: list = []
+    threads = [threading.Thread(target=worker, args=(results,)) for _ in range(8)]
+
+    # execute
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # assert
+    assert len(calls) == 1
+    assert results == [{"ok": True}] * 8
+
+
+def test_shared_flight_runs_at_most_urgent_waiters_priority():
+    # prepare
+    flight = SingleFlight()
+    joined = asyncio.Event()
+    seen = []
+
+    async def work() -> str:
+        seen.append(current_priority())
+        await joined.wait()
+        seen.append(current_priority())
+        return "done"
+
+    async def call(priority: int) -> tuple:
+        with rate_limit_scope(priority):
+            return await flight.ado("key", work)
+
+    async def run() -> list:
+        leader = asyncio.create_task(call(BATCH))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(call(INTERACTIVE))
+        await asyncio.sleep(0.01)
+        joined.set()
+        return await asyncio.gather(leader, follower)
+
+    # execute
+    results = asyncio.run(run())
+
+    # assert
+    assert results == [("done", False), ("done", True)]
+    assert seen == [BATCH, INTERACTIVE]
+
+
+def test_llm_json_reuses_cached_response(llm_cache):
+    # prepare
+    calls = []
+
+    def fake_request(model, system, user, temperature, span):
+        calls.append(user)
+        return {"synthesis": "cached"}
+
+    # execute
+    with patch("geopoliticai.llm._request_json", fake_request):
+        first = llm.llm_json("system", "user")
+        second = llm.llm_json("system", "user")
+        other = llm.llm_json("system", "user", temperature=0.7)
+
+    # assert
+    assert first == second == other == {"synthesis": "cached"}
+    assert len(calls) == 2
+    assert llm_cache.stats.hits == 1
+
+
+def test_allm_json_coalesces_identical_prompts(llm_cache):
+    # prepare
+    calls = []
+
+    async def fake_arequest(model, system, user, temperature, span):
+        calls.append(user)
+        await asyncio.sleep(0.05)
+        return {"claims": []}
+
+    async def run() -> list:
+        return await asyncio.gather(*(llm.allm_json("system", "user") for _ in range(5)))
+
+    # execute
+    with patch("geopoliticai.llm._arequest_json", fake_arequest):
+        results = asyncio.run(run())
+
+    # assert
+    assert results == [{"claims": []}] * 5
+    assert len(calls) == 1
+    assert llm_cache.stats.coalesced == 4
+
+
+def test_cache_key_depends_on_every_part():
+    assert make_cache_key("m", "s", "u", 0.2) != make_cache_key("m", "s", "u", 0.3)
+    assert make_cache_key("m", "s", "u", 0.2) == make_cache_key("m", "s", "u", 0.2)
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from geopoliticai.clients import (
+    TAVILY_API_URL,
+    AsyncTavilySearchClient,
+    ClientManager,
+    PoolSettings,
+    TavilySearchClient,
+)
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    manager = ClientManager(PoolSettings(max_connections=8, http2=False))
+    yield manager
+    manager.close()
+
+
+def test_pool_settings_from_env(monkeypatch):
+    # prepare
+    monkeypatch.setenv("HTTP_MAX_CONNECTIONS", "12")
+    monkeypatch.setenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "3")
+    monkeypatch.setenv("HTTP2_ENABLED", "0")
+
+    # execute
+    settings = PoolSettings.from_env()
+
+    # assert
+    assert settings.limits.max_connections == 12
+    assert settings.limits.max_keepalive_connections == 3
+    assert settings.client_options()["http2"] is False
+
+
+def test_http2_is_on_by_default():
+    # prepare
+    pytest.importorskip("h2")
+
+    # execute
+    options = PoolSettings().client_options()
+
+    # assert
+    assert options["http2"] is True
+
+
+def test_clients_share_one_pool_until_closed(manager):
+    # execute
+    first_openai = manager.openai()
+    first_tavily = manager.tavily("key-a")
+    second_tavily = manager.tavily("key-b")
+    manager.close()
+    reopened = manager.tavily("key-a")
+
+    # assert
+    assert manager.openai() is not first_openai
+    assert second_tavily._http is first_tavily._http
+    assert second_tavily.api_key == "key-b"
+    assert first_tavily._http.is_closed
+    assert reopened._http is not first_tavily._http
+
+
+def test_async_pools_follow_the_event_loop(manager):
+    # prepare
+    async def open_and_close() -> tuple:
+        first = manager.async_tavily("key")._http
+        again = manager.async_tavily("key")._http
+        await manager.aclose()
+        return first, again
+
+    # execute
+    first, again = asyncio.run(open_and_close())
+    other_loop, _ = asyncio.run(open_and_close())
+
+    # assert
+    assert again is first
+    assert first.is_closed
+    assert other_loop is not first
+
+
+def test_aclose_closes_pools_of_other_open_loops(manager):
+    # prepare
+    async def open_pool() -> object:
+        return manager.async_tavily("key")._http
+
+    first_loop = asyncio.new_event_loop()
+    try:
+        first = first_loop.run_until_complete(open_pool())
+
+        async def open_second_and_close() -> object:
+            second = await open_pool()
+            await manager.aclose()
+            return second
+
+        # execute
+        second = asyncio.run(open_second_and_close())
+        first_loop.run_until_complete(asyncio.sleep(0.01))
+    finally:
+        first_loop.close()
+
+    # assert
+    assert second is not first
+    assert second.is_closed
+    assert first.is_closed
+
+
+def test_tavily_search_posts_to_search_endpoint():
+    # prepare
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json={"results": [{"title": "t", "url": "u"}]})
+
+    http = httpx.Client(base_url=TAVILY_API_URL, transport=httpx.MockTransport(handler))
+
+    # execute
+    response = TavilySearchClient("secret", http).search(
+        "energy", max_results=3, search_depth="advanced"
+    )
+
+    # assert
+    assert response == {"results": [{"title": "t", "url": "u"}]}
+    assert str(seen[0].url) == f"{TAVILY_API_URL}/search"
+    assert seen[0].headers["Authorization"] == "Bearer secret"
+    assert json.loads(seen[0].content) == {
+        "query": "energy",
+        "max_results": 3,
+        "search_depth": "advanced",
+    }
+
+
+def test_async_tavily_search_matches_the_sync_contract():
+    # prepare
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json={"results": []})
+
+    async def search() -> dict:
+        async with httpx.AsyncClient(
+            base_url=TAVILY_API_URL, transport=httpx.MockTransport(handler)
+        ) as http:
+            return await AsyncTavilySearchClient("secret", http).search(
+                "energy site:example.com", max_results=5, search_depth="advanced"
+            )
+
+    # execute
+    response = asyncio.run(search())
+
+    # assert
+    assert response == {"results": []}
+    assert seen[0].method == "POST"
+    assert str(seen[0].url) == "https://api.tavily.com/search"
+    assert seen[0].headers["Authorization"] == "Bearer secret"
+    assert seen[0].headers["Content-Type"] == "application/json"
+    assert json.loads(seen[0].content) == {
+        "query": "energy site:example.com",
+        "max_results": 5,
+        "search_depth": "advanced",
+    }
+
+
+def test_tavily_search_raises_on_error_status():
+    # prepare
+    http = httpx.Client(
+        base_url=TAVILY_API_URL,
+        transport=httpx.MockTransport(lambda request: httpx.Response(401)),
+    )
+
+    # execute / assert
+    with pytest.raises(httpx.HTTPStatusError):
+        TavilySearchClient("bad", http).search("energy")
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from geopoliticai import llm
+from geopoliticai.cache import ResponseCache, TTLCache
+from geopoliticai.fact_check import _relevant_sources, afact_checker, fact_checker
+from geopoliticai.models import Claim, Source
+from tests.test_graph import _make_fake_llm_json
+
+
+def _state(claim_count: int) -> dict:
+    claims = [Claim(text=f"Claim number {i}.", source_ids=["S1"]) for i in range(claim_count)]
+    return {
+        "query": "Test query",
+        "left_claims": claims[: claim_count // 2],
+        "centrist_claims": claims[claim_count // 2 :],
+        "right_claims": [],
+        "people_claims": [],
+        "fact_sources": [
+            Source(id="S1", title="Fact", url="https://example.com/f", notes="n")
+        ],
+    }
+
+
+@pytest.fixture
+def sharded(monkeypatch):
+    monkeypatch.setenv("FACT_CHECK_SHARD_SIZE", "2")
+    monkeypatch.setenv("FACT_CHECK_SHARD_RETRIES", "1")
+
+
+def test_sharded_results_follow_claim_order(sharded):
+    # prepare
+    fake = _make_fake_llm_json("english")
+
+    def slow_first_shard(system: str, user: str, temperature: float = 0.2) -> dict:
+        if "Claim number 0." in user:
+            time.sleep(0.1)
+        return fake(system, user, temperature)
+
+    # execute
+    with patch("geopoliticai.fact_check.llm_json", slow_first_shard):
+        result = fact_checker(_state(6))
+
+    # assert
+    assert [r.claim.text for r in result["fact_checks"]] == [
+        f"Claim number {i}." for i in range(6)
+    ]
+
+
+def test_failed_shard_is_retried_alone(sharded):
+    # prepare
+    fake = _make_fake_llm_json("english")
+    calls: list = []
+    lock = threading.Lock()
+
+    def flaky(system: str, user: str, temperature: float = 0.2) -> dict:
+        with lock:
+            calls.append(user)
+            first_try = sum("Claim number 2." in c for c in calls) == 1
+        if "Claim number 2." in user and first_try:
+            return {"oops": "truncated"}
+        return fake(system, user, temperature)
+
+    # execute
+    with patch("geopoliticai.fact_check.llm_json", flaky):
+        result = fact_checker(_state(6))
+
+    # assert
+    assert len(calls) == 4
+    assert len(result["fact_checks"]) == 6
+
+
+def test_permanently_failed_shard_only_drops_its_claims(sharded):
+    # prepare
+    fake = _make_fake_llm_json("english")
+
+    async def broken_middle(system: str, user: str, temperature: float = 0.2) -> dict:
+        if "Claim number 2." in user:
+            raise ValueError("bad JSON")
+        return fake(system, user, temperature)
+
+    # execute
+    with patch("geopoliticai.fact_check.allm_json", broken_middle):
+        result = asyncio.run(afact_checker(_state(6)))
+
+    # assert
+    assert [r.claim.text for r in result["fact_checks"]] == [
+        "Claim number 0.",
+        "Claim number 1.",
+        "Claim number 4.",
+        "Claim number 5.",
+    ]
+
+
+def test_upstream_errors_are_not_retried_per_shard(sharded):
+    # prepare
+    calls: list = []
+
+    def unavailable(system: str, user: str, temperature: float = 0.2) -> dict:
+        calls.append(user)
+        raise llm.LLMUnavailableError("LLM provider unavailable: circuit is open")
+
+    # execute / assert
+    with patch("geopoliticai.fact_check.llm_json", unavailable):
+        with pytest.raises(llm.LLMUnavailableError):
+            fact_checker(_state(4))
+    assert len(calls) == 2
+
+
+def test_retry_does_not_replay_cached_malformed_answer(sharded, monkeypatch):
+    # prepare
+    cache = ResponseCache(TTLCache(max_entries=16, default_ttl=60.0))
+    monkeypatch.setattr(llm, "_llm_cache", cache)
+    monkeypatch.setattr(llm, "_llm_cache_configured", True)
+    fake = _make_fake_llm_json("english")
+    calls: list = []
+
+    def fake_request(model, system, user, temperature, span):
+        calls.append(user)
+        if len(calls) == 1:
+            return {"oops": "truncated"}
+        return fake(system, user, temperature)
+
+    # execute
+    with patch("geopoliticai.llm._request_json", fake_request):
+        result = fact_checker(_state(2))
+
+    # assert
+    assert len(calls) == 2
+    assert len(result["fact_checks"]) == 2
+
+
+def test_unusable_answers_leave_fact_checks_empty(sharded):
+    # prepare
+    def truncated(system: str, user: str, temperature: float = 0.2) -> dict:
+        return {"oops": "truncated"}
+
+    # execute
+    with patch("geopoliticai.fact_check.llm_json", truncated):
+        result = fact_checker(_state(4))
+
+    # assert
+    assert result["fact_checks"] == []
+
+
+def test_relevant_sources_prefers_overlapping_vocabulary():
+    # prepare
+    sources = [
+        Source(id="S1", title="Weather", url="u1", notes="Rain forecast."),
+        Source(id="S2", title="Tariffs", url="u2", notes="Steel tariffs raised."),
+        Source(id="S3", title="Sports", url="u3", notes="Football results."),
+    ]
+    claims = [Claim(text="Steel tariffs hurt exporters.", source_ids=[])]
+
+    # execute
+    selected = _relevant_sources(claims, sources, limit=1)
+
+    # assert
+    assert [s.id for s in selected] == ["S2"]
@@ -1,11 +1,23 @@
 from __future__ import annotations
 
+import asyncio
+import re
+import time
+from contextlib import contextmanager
 from typing import List
 from unittest.mock import patch
 
 import pytest
 
-from geopoliticai.graph import run_pipeline
+from geopoliticai import graph as graph_module
+from geopoliticai.config import get_infosphere_sources
+from geopoliticai.graph import (
+    arun_pipeline,
+    build_graph,
+    get_compiled_graph,
+    run_pipeline,
+)
+from geopoliticai.metrics import trace_scope
 from geopoliticai.models import Source
 
 
@@ -30,6 +42,18 @@ def _make_fake_llm_json(infosphere: str):
     is_polish = infosphere == "polish"
 
     def _fake_llm_json(system: str, user: str, temperature: float = 0.2) -> dict:
+        if "Task: For each lens above" in user:
+            return {
+                "claims_by_lens": {
+                    lens: _fake_llm_json(
+                        system,
+                        "Task: Provide 3-5 analytically cautious claims from the "
+                        f"perspective: {lens}.",
+                        temperature,
+                    )["claims"]
+                    for lens in re.findall(r"^Lens: (\S+)$", user, flags=re.MULTILINE)
+                }
+            }
         if "Task: Provide 3-5 analytically cautious claims" in user:
             if "perspective: leftist" in user:
                 return {
@@ -172,3 +196,307 @@ def test_run_pipeline(infosphere, expected_left_claim, expected_reference):
         assert "Evidence supports parts but not all details." in output
         assert "Overall evidence suggests mixed outcomes with partial support." in output
     assert "PARTIALLY TRUE" in output
+
+
+def _all_seed_sources() -> dict:
+    return {
+        key: _seed_sources(key) for key in ("left", "centrist", "right", "people", "fact")
+    }
+
+
+@contextmanager
+def _patched_llm(fake_llm_json):
+    with patch("geopoliticai.claims.llm_json", fake_llm_json), patch(
+        "geopoliticai.fact_check.llm_json", fake_llm_json
+    ), patch("geopoliticai.summarizer.llm_json", fake_llm_json):
+        yield
+
+
+@pytest.mark.parametrize("infosphere", ["english", "polish"])
+def test_parallel_matches_sequential(infosphere):
+    # prepare
+    seed_sources = _all_seed_sources()
+
+    # execute
+    with _patched_llm(_make_fake_llm_json(infosphere)):
+        sequential = run_pipeline(
+            "Test query", seed_sources=seed_sources, infosphere=infosphere, parallel=False
+        )
+        parallel = run_pipeline(
+            "Test query", seed_sources=seed_sources, infosphere=infosphere, parallel=True
+        )
+
+    # assert
+    assert parallel == sequential
+
+
+def test_parallel_branches_overlap():
+    # prepare
+    delay = 0.2
+    fake_llm_json = _make_fake_llm_json("english")
+
+    def slow_llm_json(system: str, user: str, temperature: float = 0.2) -> dict:
+        if "Task: Provide 3-5 analytically cautious claims" in user:
+            time.sleep(delay)
+        return fake_llm_json(system, user, temperature)
+
+    # execute
+    with _patched_llm(slow_llm_json):
+        started = time.perf_counter()
+        run_pipeline("Test query", seed_sources=_all_seed_sources())
+        elapsed = time.perf_counter() - started
+
+    # assert
+    assert elapsed < 4 * delay
+
+
+def _make_fake_allm_json(infosphere: str):
+    fake_llm_json = _make_fake_llm_json(infosphere)
+
+    async def _fake_allm_json(system: str, user: str, temperature: float = 0.2) -> dict:
+        await asyncio.sleep(0)
+        return fake_llm_json(system, user, temperature)
+
+    return _fake_allm_json
+
+
+@contextmanager
+def _patched_allm(fake_allm_json):
+    with patch("geopoliticai.claims.allm_json", fake_allm_json), patch(
+        "geopoliticai.fact_check.allm_json", fake_allm_json
+    ), patch("geopoliticai.summarizer.allm_json", fake_allm_json):
+        yield
+
+
+@pytest.mark.parametrize("infosphere", ["english", "polish"])
+def test_arun_pipeline_matches_run_pipeline(infosphere):
+    # prepare
+    seed_sources = _all_seed_sources()
+
+    # execute
+    with _patched_llm(_make_fake_llm_json(infosphere)):
+        expected = run_pipeline(
+            "Test query", seed_sources=seed_sources, infosphere=infosphere
+        )
+    with _patched_allm(_make_fake_allm_json(infosphere)):
+        output = asyncio.run(
+            arun_pipeline("Test query", seed_sources=seed_sources, infosphere=infosphere)
+        )
+
+    # assert
+    assert output == expected
+
+
+def test_compiled_graph_is_shared_across_runs():
+    # prepare
+    fake_llm_json = _make_fake_llm_json("english")
+
+    # execute
+    with patch("geopoliticai.graph.build_graph", wraps=build_graph) as spy:
+        graph_module._compiled_graphs.clear()
+        with _patched_llm(fake_llm_json):
+            first = run_pipeline("First query", seed_sources=_all_seed_sources())
+            second = run_pipeline("Second query", seed_sources=_all_seed_sources())
+
+    # assert
+    assert spy.call_count == 1
+    assert first == second
+    assert get_compiled_graph("english") is get_compiled_graph("english")
+
+
+def test_infosphere_tables_are_precomputed_and_frozen():
+    # execute
+    polish = get_infosphere_sources("polish")
+
+    # assert
+    assert polish is get_infosphere_sources("polish")
+    assert [url for _, url in polish["people"]].count("https://www.reddit.com") == 1
+    with pytest.raises(TypeError):
+        polish["left"] = ()
+    with pytest.raises(ValueError):
+        get_infosphere_sources("klingon")
+
+
+@contextmanager
+def _counting_searcher(release: "asyncio.Event | None" = None):
+    seeds = _all_seed_sources()
+    calls: List[str] = []
+
+    async def fake_aweb_searcher(state, agent_key, references, seed_sources=None):
+        calls.append(agent_key)
+        if release is not None:
+            await release.wait()
+        await asyncio.sleep(0.01)
+        return seeds[agent_key]
+
+    with patch("geopoliticai.graph.aweb_searcher", fake_aweb_searcher):
+        yield calls
+
+
+def test_identical_concurrent_runs_share_one_execution():
+    # prepare
+    queries = ["Test query", "  test   QUERY ", "Test query", "TEST QUERY"]
+
+    async def run() -> list:
+        return await asyncio.gather(*(arun_pipeline(query) for query in queries))
+
+    # execute
+    with _counting_searcher() as calls, _patched_allm(_make_fake_allm_json("english")):
+        outputs = asyncio.run(run())
+        other = asyncio.run(arun_pipeline("Other query"))
+
+    # assert
+    assert len(set(outputs)) == 1
+    assert "Left claim about policy impacts." in outputs[0]
+    assert len(calls) == 10  # five searchers for the shared run, five for "Other"
+    assert other
+
+
+def test_shared_run_survives_until_last_caller_cancels():
+    # prepare
+    async def run() -> tuple:
+        release = asyncio.Event()
+        with _counting_searcher(release) as calls:
+            first = asyncio.create_task(arun_pipeline("Test query"))
+            second = asyncio.create_task(arun_pipeline("Test query"))
+            await asyncio.sleep(0.05)
+            first.cancel()
+            await asyncio.sleep(0.01)
+            release.set()
+            output = await second
+            abandoned = asyncio.create_task(arun_pipeline("Slow query"))
+            release.clear()
+            await asyncio.sleep(0.05)
+            (flight,) = graph_module._pipeline_flight._tasks.values()
+            abandoned.cancel()
+            await asyncio.sleep(0.05)
+            in_flight = dict(graph_module._pipeline_flight._tasks)
+        return first, output, calls, flight.task, in_flight
+
+    # execute
+    with _patched_allm(_make_fake_allm_json("english")):
+        first, output, calls, abandoned_run, in_flight = asyncio.run(run())
+
+    # assert
+    assert first.cancelled()
+    assert "Left claim about policy impacts." in output
+    assert calls.count("left") == 2  # one shared run, one abandoned run
+    assert abandoned_run.cancelled()
+    assert in_flight == {}
+
+
+def test_joined_callers_trace_their_wait_only():
+    # prepare
+    async def traced() -> dict:
+        with trace_scope() as trace:
+            await arun_pipeline("Test query")
+        return trace.as_dict()
+
+    async def run() -> list:
+        return await asyncio.gather(traced(), traced())
+
+    # execute
+    with _counting_searcher(), _patched_allm(_make_fake_allm_json("english")):
+        leader, follower = asyncio.run(run())
+
+    # assert
+    assert {span["kind"] for span in leader["spans"]} == {"stage"}
+    assert [span["kind"] for span in follower["spans"]] == ["coalesced"]
+
+
+def test_coalescing_can_be_disabled(monkeypatch):
+    # prepare
+    monkeypatch.setenv("PIPELINE_COALESCING_ENABLED", "0")
+
+    async def run() -> list:
+        return await asyncio.gather(*(arun_pipeline("Test query") for _ in range(2)))
+
+    # execute
+    with _counting_searcher() as calls, _patched_allm(_make_fake_allm_json("english")):
+        asyncio.run(run())
+
+    # assert
+    assert len(calls) == 10
+
+
+def _claims_requests(fake_llm_json, requests: List[str]):
+    def recording(system: str, user: str, temperature: float = 0.2) -> dict:
+        if "analytically cautious claims" in user:
+            requests.append(user)
+        return fake_llm_json(system, user, temperature)
+
+    return recording
+
+
+def test_multi_lens_mode_matches_per_lens_with_one_request(monkeypatch):
+    # prepare
+    fake = _make_fake_llm_json("english")
+    with _patched_llm(fake):
+        expected = run_pipeline("Test query", seed_sources=_all_seed_sources())
+    monkeypatch.setenv("EXPERT_MODE", "multi_lens")
+    requests: List[str] = []
+    arequests: List[str] = []
+    recording = _claims_requests(fake, requests)
+
+    async def arecording(system: str, user: str, temperature: float = 0.2) -> dict:
+        return _claims_requests(fake, arequests)(system, user, temperature)
+
+    # execute
+    with _patched_llm(recording):
+        output = run_pipeline("Test query", seed_sources=_all_seed_sources())
+    with _patched_allm(arecording):
+        aoutput = asyncio.run(arun_pipeline("Test query", seed_sources=_all_seed_sources()))
+
+    # assert
+    assert output == aoutput == expected
+    assert len(requests) == len(arequests) == 1
+    assert "Lens: people" in requests[0]
+
+
+def test_multi_lens_falls_back_only_for_invalid_lenses(monkeypatch):
+    # prepare
+    monkeypatch.setenv("EXPERT_MODE", "multi_lens")
+    fake = _make_fake_llm_json("english")
+    requests: List[str] = []
+
+    def invalid_right(system: str, user: str, temperature: float = 0.2) -> dict:
+        data = _claims_requests(fake, requests)(system, user, temperature)
+        if "claims_by_lens" in data:
+            data["claims_by_lens"]["right-wing"] = [
+                {"text": "Uncited claim.", "source_ids": ["S-unknown"]}
+            ]
+            del data["claims_by_lens"]["centrist"]
+        return data
+
+    # execute
+    with _patched_llm(invalid_right):
+        output = run_pipeline("Test query", seed_sources=_all_seed_sources())
+
+    # assert
+    assert len(requests) == 3
+    assert "perspective: right-wing" in requests[1] + requests[2]
+    assert "perspective: centrist" in requests[1] + requests[2]
+    assert "Uncited claim." not in output
+    assert "Right claim focused on market incentives." in output
+
+
+def test_sequential_graph_keeps_per_lens_requests(monkeypatch):
+    # prepare
+    monkeypatch.setenv("EXPERT_MODE", "multi_lens")
+    requests: List[str] = []
+
+    # execute
+    with _patched_llm(_claims_requests(_make_fake_llm_json("english"), requests)):
+        run_pipeline("Test query", seed_sources=_all_seed_sources(), parallel=False)
+
+    # assert
+    assert len(requests) == 4
+
+
+def test_unknown_expert_mode_is_rejected(monkeypatch):
+    # prepare
+    monkeypatch.setenv("EXPERT_MODE", "three_lens")
+
+    # execute / assert
+    with _patched_llm(_make_fake_llm_json("english")), pytest.raises(ValueError):
+        run_pipeline("Test query", seed_sources=_all_seed_sources())
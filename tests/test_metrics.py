@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import json
+
+from geopoliticai import llm
+from geopoliticai.metrics import (
+    Registry,
+    Span,
+    record,
+    render_metrics,
+    timed_stage,
+    trace_scope,
+)
+from tests.test_api import client  # noqa: F401
+from tests.test_resilience import _FakeOpenAI, _rate_limited, transport  # noqa: F401
+
+
+def test_histogram_renders_cumulative_buckets():
+    # prepare
+    registry = Registry()
+    histogram = registry.histogram("demo_seconds", "Demo.", ("stage",), buckets=(0.1, 1.0))
+
+    # execute
+    histogram.observe(0.05, stage="a")
+    histogram.observe(0.5, stage="a")
+    histogram.observe(5.0, stage="a")
+    lines = registry.render()
+
+    # assert
+    assert 'demo_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{stage="a",le="1"} 2' in lines
+    assert 'demo_seconds_bucket{stage="a",le="+Inf"} 3' in lines
+    assert 'demo_seconds_count{stage="a"} 3' in lines
+
+
+def test_trace_collects_stage_spans():
+    # prepare
+    stage = timed_stage("demo_stage", lambda state: state)
+
+    # execute
+    with trace_scope() as trace:
+        stage({})
+        record(Span("llm", "gpt-4o-mini", prompt_tokens=10, completion_tokens=5))
+    data = trace.as_dict()
+
+    # assert
+    assert [span["name"] for span in data["spans"]] == ["demo_stage", "gpt-4o-mini"]
+    assert data["totals"]["prompt_tokens"] == 10
+    assert data["totals"]["llm_calls"] == 1
+
+
+def test_llm_span_records_tokens_cost_and_retries(transport):  # noqa: F811
+    # prepare
+    transport(_FakeOpenAI([_rate_limited(), json.dumps({"ok": True})]))
+
+    # execute
+    with trace_scope() as trace:
+        llm.llm_json("system", "user")
+    span = trace.as_dict()["spans"][0]
+
+    # assert
+    assert span["kind"] == "llm"
+    assert span["prompt_tokens"] == 1000
+    assert span["completion_tokens"] == 200
+    assert span["retries"] == 1
+    assert span["cost_usd"] == llm.estimate_cost(span["name"], 1000, 200)
+    assert "geopoliticai_upstream_retries_total" in render_metrics()
+
+
+def test_run_pipeline_returns_trace_and_exports_metrics(client):  # noqa: F811
+    # execute
+    response = client.post("/run_pipeline", json={"query": "Test query", "trace": True})
+    metrics = client.get("/metrics")
+
+    # assert
+    assert response.status_code == 200
+    stages = {span["name"] for span in response.json()["trace"]["spans"]}
+    assert {"fact_checker", "summarizer_judge", "supervisor"} <= stages
+    assert metrics.status_code == 200
+    assert 'geopoliticai_stage_seconds_count{stage="fact_checker"}' in metrics.text
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import logging
+
+from geopoliticai.claims import _claims_prompt
+from geopoliticai.fact_check import _fact_check_prompt
+from geopoliticai.models import Claim, Source
+from geopoliticai.prompts import build_prompt, clean_notes, compact_sources, count_tokens
+
+
+def _source(index: int, notes: str, url: str | None = None) -> Source:
+    return Source(
+        id=f"S{index}",
+        title=f"Title {index}",
+        url=url or f"https://example.com/{index}",
+        notes=notes,
+    )
+
+
+def test_clean_notes_strips_boilerplate():
+    notes = "Leaders met in Brussels. Subscribe now for alerts. Click here to share. Read more"
+
+    assert clean_notes(notes) == "Leaders met in Brussels."
+
+
+def test_compact_sources_drops_near_duplicates_and_repeated_urls():
+    # prepare
+    sources = [
+        _source(1, "The parliament passed the budget bill after a long night debate."),
+        _source(2, "The parliament passed the budget bill after a long night debate!"),
+        _source(3, "Unrelated coverage of the farm protests.", url="https://example.com/1/"),
+        _source(4, "Opposition leaders promised to challenge the law in court."),
+    ]
+
+    # execute
+    compacted = compact_sources(sources)
+
+    # assert
+    assert [source.id for source in compacted] == ["S1", "S4"]
+
+
+def test_claims_prompt_truncates_references_before_sources(monkeypatch, caplog):
+    # prepare
+    monkeypatch.setenv("PROMPT_BUDGET_CLAIMS", "220")
+    sources = [_source(i, f"Distinct report {i} " + "detail " * 30) for i in range(1, 6)]
+    references = [(f"Reference outlet {i}", f"https://ref{i}.example") for i in range(20)]
+
+    # execute
+    with caplog.at_level(logging.INFO, logger="geopoliticai.prompts"):
+        prompt = _claims_prompt({"query": "Budget"}, "centrist", sources, references)
+
+    # assert
+    assert "Reference outlet" not in prompt
+    assert "S1: Title 1" in prompt
+    assert "S5: Title 5" not in prompt
+    assert count_tokens(prompt) <= 220
+    assert any("Prompt (claims:centrist)" in message for message in caplog.messages)
+
+
+def test_fact_check_prompt_keeps_every_claim(monkeypatch):
+    # prepare
+    monkeypatch.setenv("PROMPT_BUDGET_FACT_CHECK", "50")
+    claims = [Claim(text=f"Claim number {i}.", source_ids=["S1"]) for i in range(10)]
+    sources = [_source(i, f"Evidence {i} " + "context " * 20) for i in range(1, 4)]
+
+    # execute
+    prompt = _fact_check_prompt(claims, sources)
+
+    # assert
+    assert all(f"- Claim number {i}." in prompt for i in range(10))
+    assert "S1: Title 1" in prompt
+    assert "S2: Title 2" not in prompt
+
+
+def test_build_prompt_finds_the_cut_without_rerendering_per_line():
+    # prepare
+    renders = []
+
+    def render(sections: dict) -> str:
+        renders.append(sections)
+        return sections["references"] + "\n" + sections["sources"]
+
+    lines = [f"S{i}: source line number {i}" for i in range(2000)]
+    budget = count_tokens("\n" + "\n".join(lines[:700]))
+
+    # execute
+    prompt = build_prompt(
+        "test",
+        render,
+        {"sources": lines, "references": ["ref one", "ref two"]},
+        drop_order=(("references", 0), ("sources", 1)),
+        budget=budget,
+    )
+
+    # assert
+    assert prompt == "\n" + "\n".join(lines[:700])
+    assert len(renders) < 20
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+from geopoliticai.ratelimit import (
+    BATCH,
+    INTERACTIVE,
+    RateLimiter,
+    TokenBucket,
+    rate_limit_metrics,
+    rate_limit_scope,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def _until_queued(limiter: RateLimiter, count: int) -> None:
+    while sum(limiter.snapshot()["queue_depth"].values()) < count:
+        await asyncio.sleep(0.001)
+
+
+def test_token_bucket_refills_at_rate():
+    # prepare
+    clock = _Clock()
+    bucket = TokenBucket.per_minute(60, burst_seconds=2, clock=clock)
+
+    # execute
+    bucket.consume(2)
+    waiting = bucket.wait_time(1)
+    clock.now = 1.0
+    refilled = bucket.wait_time(1)
+
+    # assert
+    assert bucket.capacity == 2
+    assert waiting == 1.0
+    assert refilled == 0.0
+
+
+def test_interactive_calls_jump_ahead_of_batch():
+    # prepare
+    limiter = RateLimiter("test-priority", {}, max_in_flight=1)
+    order: list[str] = []
+
+    async def call(label: str, priority: int) -> None:
+        with rate_limit_scope(priority, caller=label):
+            async with limiter.aslot(requests=1):
+                order.append(label)
+
+    async def scenario() -> None:
+        await limiter.aacquire(requests=1)
+        batch = asyncio.create_task(call("batch", BATCH))
+        await _until_queued(limiter, 1)
+        interactive = asyncio.create_task(call("interactive", INTERACTIVE))
+        await _until_queued(limiter, 2)
+        limiter.release()
+        await asyncio.gather(batch, interactive)
+
+    # execute
+    asyncio.run(scenario())
+
+    # assert
+    assert order == ["interactive", "batch"]
+    assert limiter.snapshot()["granted"] == {"interactive": 2, "batch": 1}
+
+
+def test_callers_take_turns_within_a_class():
+    # prepare
+    limiter = RateLimiter("test-fairness", {}, max_in_flight=1)
+    order: list[str] = []
+
+    async def call(caller: str, index: int) -> None:
+        with rate_limit_scope(BATCH, caller=caller):
+            async with limiter.aslot(requests=1):
+                order.append(f"{caller}{index}")
+
+    async def scenario() -> None:
+        await limiter.aacquire(requests=1)
+        tasks = [asyncio.create_task(call("a", i)) for i in range(3)]
+        await _until_queued(limiter, 3)
+        tasks.append(asyncio.create_task(call("b", 0)))
+        await _until_queued(limiter, 4)
+        limiter.release()
+        await asyncio.gather(*tasks)
+
+    # execute
+    asyncio.run(scenario())
+
+    # assert
+    assert order == ["a0", "b0", "a1", "a2"]
+
+
+def test_sync_and_async_callers_share_the_rate():
+    # prepare
+    limiter = RateLimiter("test-shared", {"requests": TokenBucket.per_second(20, 0.05)})
+    started = time.monotonic()
+
+    def sync_calls() -> None:
+        for _ in range(3):
+            with limiter.slot(requests=1):
+                pass
+
+    async def async_calls() -> None:
+        for _ in range(3):
+            async with limiter.aslot(requests=1):
+                pass
+
+    # execute
+    thread = threading.Thread(target=sync_calls)
+    thread.start()
+    asyncio.run(async_calls())
+    thread.join()
+    elapsed = time.monotonic() - started
+
+    # assert
+    assert elapsed >= 0.2
+    snapshot = rate_limit_metrics()["test-shared"]
+    assert snapshot["in_flight"] == 0
+    assert snapshot["granted"] == {"interactive": 6}
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    # prepare
+    limiter = RateLimiter("test-cancel", {}, max_in_flight=1)
+
+    async def scenario() -> None:
+        await limiter.aacquire(requests=1)
+        waiter = asyncio.create_task(limiter.aacquire(requests=1))
+        await _until_queued(limiter, 1)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        limiter.release()
+        await asyncio.wait_for(limiter.aacquire(requests=1), 1)
+        limiter.release()
+
+    # execute
+    asyncio.run(scenario())
+
+    # assert
+    assert limiter.snapshot()["queue_depth"] == {"interactive": 0}
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from geopoliticai import llm
+from geopoliticai.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    backoff_delay,
+    parse_retry_after,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _FakeOpenAI:
+    """Chat-completions client that replays scripted outcomes."""
+
+    def __init__(self, outcomes: list, responses_supported: bool = False) -> None:
+        self.outcomes = list(outcomes)
+        self.responses_calls = 0
+        self.chat_calls = 0
+        self.responses = SimpleNamespace(create=self._responses_create)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat_create))
+        self.responses_supported = responses_supported
+
+    def _responses_create(self, **kwargs):
+        self.responses_calls += 1
+        raise TypeError("unexpected keyword argument 'response_format'")
+
+    def _chat_create(self, **kwargs):
+        self.chat_calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        message = SimpleNamespace(content=outcome)
+        usage = SimpleNamespace(prompt_tokens=1000, completion_tokens=200)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+def _rate_limited(retry_after: str = "0") -> openai.RateLimitError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, headers={"retry-after": retry_after}, request=request)
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+def _server_error() -> openai.InternalServerError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(500, request=request)
+    return openai.InternalServerError("boom", response=response, body=None)
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    monkeypatch.setenv("LLM_RETRY_BASE_DELAY", "0")
+    monkeypatch.setenv("LLM_BREAKER_THRESHOLD", "2")
+    monkeypatch.setattr(llm, "_api_mode", None)
+    monkeypatch.setattr(llm, "_breaker", None)
+    monkeypatch.setattr(llm, "_llm_cache", None)
+    monkeypatch.setattr(llm, "_llm_cache_configured", True)
+
+    def install(client: _FakeOpenAI) -> _FakeOpenAI:
+        monkeypatch.setattr(llm, "get_openai_client", lambda: client)
+        return client
+
+    return install
+
+
+def test_retries_rate_limits_and_invalid_json(transport):
+    # prepare
+    client = transport(
+        _FakeOpenAI([_rate_limited(), "{not json", json.dumps({"synthesis": "ok"})])
+    )
+
+    # execute
+    payload = llm.llm_json("system", "user")
+
+    # assert
+    assert payload == {"synthesis": "ok"}
+    assert client.chat_calls == 3
+
+
+def test_api_mode_is_detected_once(transport):
+    # prepare
+    client = transport(_FakeOpenAI([json.dumps({"a": 1}), json.dumps({"b": 2})]))
+
+    # execute
+    llm.llm_json("system", "first")
+    llm.llm_json("system", "second")
+
+    # assert
+    assert client.responses_calls == 1
+    assert client.chat_calls == 2
+
+
+def test_non_retryable_errors_are_raised_immediately(transport):
+    # prepare
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    bad_request = openai.BadRequestError(
+        "bad", response=httpx.Response(400, request=request), body=None
+    )
+    client = transport(_FakeOpenAI([bad_request]))
+
+    # execute / assert
+    with pytest.raises(openai.BadRequestError):
+        llm.llm_json("system", "user")
+    assert client.chat_calls == 1
+
+
+def test_breaker_fails_fast_after_repeated_outages(transport, monkeypatch):
+    # prepare
+    monkeypatch.setenv("LLM_MAX_RETRIES", "1")
+    client = transport(_FakeOpenAI([_server_error(), _server_error(), _server_error()]))
+
+    # execute
+    with pytest.raises(openai.InternalServerError):
+        llm.llm_json("system", "user")
+    with pytest.raises(llm.LLMUnavailableError):
+        llm.llm_json("system", "other")
+
+    # assert
+    assert client.chat_calls == 2
+
+
+def test_circuit_breaker_half_open_probe():
+    # prepare
+    clock = _Clock()
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=10.0, clock=clock)
+    breaker.record_failure()
+
+    # execute / assert
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    clock.now = 11.0
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_cancelled_probe_releases_the_breaker(transport, monkeypatch):
+    # prepare
+    clock = _Clock()
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=10.0, clock=clock)
+    breaker.record_failure()
+    clock.now = 11.0
+    monkeypatch.setattr(llm, "_breaker", breaker)
+    monkeypatch.setattr(llm, "_api_mode", "chat")
+
+    async def hang(**kwargs):
+        await asyncio.Event().wait()
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=hang)))
+    monkeypatch.setattr(llm, "get_async_openai_client", lambda: client)
+
+    async def cancel_probe() -> None:
+        probe = asyncio.create_task(llm.allm_json("system", "user"))
+        await asyncio.sleep(0.01)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+    # execute
+    asyncio.run(cancel_probe())
+
+    # assert
+    assert breaker.state == "half_open"
+    assert breaker.before_call() is True
+
+
+def test_backoff_honours_retry_after():
+    # prepare
+    policy = RetryPolicy(base_delay=0.1, max_delay=30.0)
+
+    # execute
+    delay = backoff_delay(1, policy, retry_after=parse_retry_after("7"))
+
+    # assert
+    assert delay == 7.0
+    assert 0 <= backoff_delay(3, policy) <= 0.4
+
+
+@pytest.mark.parametrize("value", ["soon", "Mon, 99 Foo 2024", ""])
+def test_parse_retry_after_ignores_unparseable_values(value):
+    assert parse_retry_after(value) is None
@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import List
+
+import pytest
+
+from geopoliticai import search
+from geopoliticai.models import Source
+from geopoliticai.ratelimit import RateLimiter
+from geopoliticai.sources import source_id
+from geopoliticai.search import (
+    SearchCache,
+    search_cache_key,
+    warm_search_cache,
+    web_searcher,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _FakeTavily:
+    def __init__(self) -> None:
+        self.queries: List[str] = []
+        self.lock = threading.Lock()
+
+    def search(self, query: str, max_results: int, search_depth: str) -> dict:
+        with self.lock:
+            self.queries.append(query)
+            count = len(self.queries)
+        return {
+            "results": [
+                {
+                    "title": f"Result {count}",
+                    "url": f"https://example.com/{count}",
+                    "content": "Some content.",
+                }
+            ]
+        }
+
+
+@pytest.fixture
+def fake_tavily(monkeypatch):
+    fake = _FakeTavily()
+    monkeypatch.setenv("TAVILY_KEY", "test-key")
+    monkeypatch.setattr(search, "get_tavily_client", lambda api_key: fake)
+    return fake
+
+
+@pytest.fixture
+def search_cache(monkeypatch):
+    cache = SearchCache(default_ttl=60.0, agent_ttls={"fact": 10.0})
+    monkeypatch.setattr(search, "_search_cache", cache)
+    monkeypatch.setattr(search, "_search_cache_configured", True)
+    return cache
+
+
+REFERENCES = [("Jacobin", "https://jacobin.com")]
+
+
+def test_web_searcher_serves_repeated_query_from_cache(fake_tavily, search_cache):
+    # execute
+    first = web_searcher({"query": "Energy  Policy"}, "left", REFERENCES)
+    second = web_searcher({"query": "energy policy"}, "left", REFERENCES)
+
+    # assert
+    assert len(fake_tavily.queries) == 1
+    assert first == second
+    assert search_cache.stats.hits == 1
+
+
+def test_cache_key_normalizes_query():
+    assert search_cache_key("  Energy\tPolicy ") == search_cache_key("energy policy")
+    assert search_cache_key("energy policy", 6) != search_cache_key("energy policy", 3)
+
+
+def test_stale_entry_is_served_while_refreshing():
+    # prepare
+    clock = _Clock()
+    cache = SearchCache(default_ttl=10.0, stale_ttl=100.0, clock=clock)
+    refreshed = threading.Event()
+    old = [Source(id="S1", title="Old", url="https://example.com/old", notes="n")]
+    new = [Source(id="S1", title="New", url="https://example.com/new", notes="n")]
+    cache.fetch("key", "left", lambda: old)
+    clock.now = 20.0
+
+    def reload() -> List[Source]:
+        refreshed.set()
+        return new
+
+    # execute
+    served = cache.fetch("key", "left", reload)
+    assert refreshed.wait(timeout=2.0)
+    deadline = time.monotonic() + 2.0
+    while cache.fetch("key", "left", lambda: old) != new and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    # assert
+    assert served == old
+    assert cache.fetch("key", "left", lambda: old) == new
+    assert cache.refreshes == 1
+
+
+def test_entry_past_stale_window_is_reloaded():
+    # prepare
+    clock = _Clock()
+    cache = SearchCache(default_ttl=10.0, stale_ttl=100.0, clock=clock)
+    old = [Source(id="S1", title="Old", url="https://example.com/old", notes="n")]
+    new = [Source(id="S1", title="New", url="https://example.com/new", notes="n")]
+    cache.fetch("key", "left", lambda: old)
+    clock.now = 111.0
+
+    # execute
+    served = cache.fetch("key", "left", lambda: new)
+
+    # assert
+    assert served == new
+    assert cache.refreshes == 0
+    assert cache.stats.expirations == 1
+
+
+def test_fact_entries_expire_sooner(search_cache):
+    # assert
+    assert search_cache.ttl_for("fact") < search_cache.ttl_for("left")
+
+
+def test_warm_search_cache_populates_every_agent(fake_tavily, search_cache):
+    # execute
+    warmed = warm_search_cache(["energy policy", "housing"])
+    web_searcher({"query": "housing"}, "fact", search.get_infosphere_sources("english")["fact"])
+
+    # assert
+    assert warmed == 10
+    assert len(fake_tavily.queries) == 10
+
+
+class _SiteTavily:
+    """Returns two results per ``site:`` query; ``slow`` sites sleep first."""
+
+    def __init__(self, slow: tuple[str, ...] = (), delay: float = 0.0) -> None:
+        self.slow = slow
+        self.delay = delay
+        self.queries: List[str] = []
+        self.lock = threading.Lock()
+
+    def _results(self, query: str, max_results: int) -> dict:
+        site = query.rsplit("site:", 1)[1]
+        with self.lock:
+            self.queries.append(query)
+        return {
+            "results": [
+                {
+                    "title": f"{site} {rank}",
+                    "url": f"https://www.{site}/story-{rank}?utm_source=feed",
+                    "content": f"{site} story {rank}.",
+                }
+                for rank in range(1, max_results + 1)
+            ]
+            + [{"title": "Wire copy", "url": "https://wire.example/story/", "content": "x"}]
+        }
+
+    def search(self, query: str, max_results: int, search_depth: str) -> dict:
+        if any(site in query for site in self.slow):
+            time.sleep(self.delay)
+        return self._results(query, max_results)
+
+
+PER_SITE_REFERENCES = [
+    ("A", "https://a.example"),
+    ("B", "https://b.example"),
+    ("C", "https://c.example"),
+]
+
+
+@pytest.fixture
+def per_site(monkeypatch):
+    monkeypatch.setenv("TAVILY_KEY", "test-key")
+    monkeypatch.setenv("SEARCH_STRATEGY", "per_site")
+    monkeypatch.setenv("SEARCH_PER_SITE_RESULTS", "2")
+    monkeypatch.setattr(search, "_search_cache", None)
+    monkeypatch.setattr(search, "_search_cache_configured", True)
+    monkeypatch.setattr(search, "_search_limiter", RateLimiter("tavily-test", {}))
+
+
+def test_per_site_search_interleaves_and_dedupes(per_site, monkeypatch):
+    # prepare
+    fake = _SiteTavily()
+    monkeypatch.setattr(search, "get_tavily_client", lambda api_key: fake)
+
+    # execute
+    sources = web_searcher({"query": "energy"}, "left", PER_SITE_REFERENCES)
+
+    # assert
+    assert sorted(fake.queries) == [
+        "energy site:a.example",
+        "energy site:b.example",
+        "energy site:c.example",
+    ]
+    assert [s.title for s in sources] == [
+        "a.example 1",
+        "b.example 1",
+        "c.example 1",
+        "a.example 2",
+        "b.example 2",
+        "c.example 2",
+        "Wire copy",
+    ]
+    assert [s.id for s in sources] == [source_id(s.url) for s in sources]
+
+
+def test_per_site_search_drops_site_over_budget(per_site, monkeypatch):
+    # prepare
+    monkeypatch.setenv("SEARCH_AGENT_BUDGET", "0.2")
+    fake = _SiteTavily(slow=("b.example",), delay=1.0)
+    monkeypatch.setattr(search, "get_tavily_client", lambda api_key: fake)
+
+    # execute
+    started = time.perf_counter()
+    sources = web_searcher({"query": "energy"}, "left", PER_SITE_REFERENCES)
+    elapsed = time.perf_counter() - started
+
+    # assert
+    assert elapsed < 0.8
+    assert {s.title.split()[0] for s in sources} == {"a.example", "c.example", "Wire"}
+
+
+def test_async_per_site_search_drops_site_over_budget(per_site, monkeypatch):
+    # prepare
+    monkeypatch.setenv("SEARCH_AGENT_BUDGET", "0.2")
+    fake = _SiteTavily()
+
+    class _AsyncSiteTavily:
+        async def search(self, query: str, max_results: int, search_depth: str) -> dict:
+            if "b.example" in query:
+                await asyncio.sleep(1.0)
+            return fake._results(query, max_results)
+
+    monkeypatch.setattr(
+        search, "get_async_tavily_client", lambda api_key: _AsyncSiteTavily()
+    )
+
+    # execute
+    started = time.perf_counter()
+    sources = asyncio.run(
+        search.aweb_searcher({"query": "energy"}, "left", PER_SITE_REFERENCES)
+    )
+    elapsed = time.perf_counter() - started
+
+    # assert
+    assert elapsed < 0.8
+    assert [s.title for s in sources][:2] == ["a.example 1", "c.example 1"]
+
+
+def test_async_site_search_over_budget_still_fills_the_cache(per_site, monkeypatch):
+    # prepare
+    monkeypatch.setenv("SEARCH_AGENT_BUDGET", "0.1")
+    cache = SearchCache(default_ttl=60.0)
+    monkeypatch.setattr(search, "_search_cache", cache)
+    fake = _SiteTavily()
+
+    class _AsyncSiteTavily:
+        async def search(self, query: str, max_results: int, search_depth: str) -> dict:
+            if "b.example" in query:
+                await asyncio.sleep(0.3)
+            return fake._results(query, max_results)
+
+    monkeypatch.setattr(
+        search, "get_async_tavily_client", lambda api_key: _AsyncSiteTavily()
+    )
+
+    async def search_then_wait() -> List[Source]:
+        sources = await search.aweb_searcher(
+            {"query": "energy"}, "left", PER_SITE_REFERENCES
+        )
+        await asyncio.sleep(0.4)
+        return sources
+
+    # execute
+    sources = asyncio.run(search_then_wait())
+
+    # assert
+    assert "b.example 1" not in [s.title for s in sources]
+    key = search_cache_key("energy site:b.example", 2)
+    assert cache.memory.get(key) is not None
+    assert not search._site_tasks
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from typing import List
+from unittest.mock import patch
+
+import pytest
+
+from geopoliticai.graph import run_pipeline
+from geopoliticai.models import Claim, PipelineResult
+from geopoliticai.semantic_cache import (
+    HashingEmbedder,
+    SemanticCache,
+    set_semantic_cache,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _cache(**kwargs) -> SemanticCache:
+    return SemanticCache(HashingEmbedder(256), threshold=0.9, **kwargs)
+
+
+def test_rephrased_query_hits_same_infosphere_only():
+    # prepare
+    cache = _cache()
+    cache.store("Polish election results 2027", "english", "report")
+
+    # execute
+    rephrased = cache.lookup("results of the 2027 Polish election", "english")
+    other_year = cache.lookup("Polish election results 2023", "english")
+    other_infosphere = cache.lookup("results of the 2027 Polish election", "polish")
+
+    # assert
+    assert rephrased == "report"
+    assert other_year is None
+    assert other_infosphere is None
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 2
+
+
+def test_swapped_or_negated_query_misses():
+    # prepare
+    cache = _cache()
+    cache.store("Did Russia attack Ukraine?", "english", "report")
+
+    # execute
+    swapped = cache.lookup("Did Ukraine attack Russia?", "english")
+    negated = cache.lookup("Did Russia not attack Ukraine?", "english")
+    reordered = cache.lookup("Ukraine: did Russia attack?", "english")
+
+    # assert
+    assert swapped is None
+    assert negated is None
+    assert reordered == "report"
+
+
+def test_entries_expire_after_ttl():
+    # prepare
+    clock = _Clock()
+    cache = _cache(ttl=60.0, clock=clock)
+    cache.store("Tariffs on EU steel", "english", "report")
+
+    # execute
+    fresh = cache.lookup("EU steel tariffs", "english")
+    clock.now += 61.0
+    expired = cache.lookup("EU steel tariffs", "english")
+
+    # assert
+    assert fresh == "report"
+    assert expired is None
+
+
+def test_full_cache_evicts_least_recently_used():
+    # prepare
+    clock = _Clock()
+    cache = _cache(max_entries=2, clock=clock)
+    cache.store("Tariffs on EU steel", "english", "steel")
+    clock.now += 1
+    cache.store("NATO summit outcomes", "english", "nato")
+    clock.now += 1
+    cache.lookup("EU steel tariffs", "english")
+    clock.now += 1
+
+    # execute
+    cache.store("Arctic shipping routes", "english", "arctic")
+
+    # assert
+    assert len(cache) == 2
+    assert cache.stats.evictions == 1
+    assert cache.lookup("NATO summit outcomes", "english") is None
+    assert cache.lookup("Tariffs on EU steel", "english") == "steel"
+    assert cache.lookup("Arctic shipping routes", "english") == "arctic"
+
+
+def test_lookup_many_answers_each_query():
+    # prepare
+    cache = _cache()
+    cache.store("Tariffs on EU steel", "english", "steel")
+    cache.store("NATO summit outcomes", "english", "nato")
+
+    # execute
+    results = cache.lookup_many(
+        ["outcomes of the NATO summit", "Arctic shipping routes", "EU steel tariffs"],
+        "english",
+    )
+
+    # assert
+    assert results == ["nato", None, "steel"]
+
+
+def test_index_persists_and_reloads_memory_mapped(tmp_path):
+    # prepare
+    path = str(tmp_path / "semantic")
+    cache = _cache(path=path)
+    cache.store("Polish election results 2027", "english", "report")
+    cache.close()
+
+    # execute
+    reloaded = _cache(path=path)
+    result = reloaded.lookup("results of the 2027 Polish election", "english")
+
+    # assert
+    assert result == "report"
+    assert reloaded._vectors.filename is not None
+    reloaded.close()
+
+
+def test_run_pipeline_serves_rephrased_query_from_cache():
+    # prepare
+    calls: List[str] = []
+
+    def fake_invoke(state, config):
+        calls.append(state["query"])
+        result = PipelineResult(
+            query=state["query"],
+            infosphere="english",
+            sources=[],
+            claims={"left": [Claim(text="A claim.", source_ids=[])]},
+            fact_checks=[],
+            synthesis=f"synthesis for {state['query']}",
+        )
+        return {"result": result}
+
+    cache = _cache()
+    set_semantic_cache(cache)
+
+    # execute
+    try:
+        with patch("geopoliticai.graph.get_compiled_graph") as compiled:
+            compiled.return_value.invoke.side_effect = fake_invoke
+            first = run_pipeline("Polish election results 2027")
+            second = run_pipeline("results of the 2027 Polish election", structured=True)
+    finally:
+        set_semantic_cache(None)
+
+    # assert
+    assert calls == ["Polish election results 2027"]
+    assert second.claims["left"] == [Claim(text="A claim.", source_ids=[])]
+    assert second.text == first
+
+
+@pytest.mark.parametrize("dim", [64, 512])
+def test_hashing_embedder_returns_unit_vectors(dim):
+    # execute
+    vectors = HashingEmbedder(dim).embed(["Polish election results 2027", ""])
+
+    # assert
+    assert vectors.shape == (2, dim)
+    assert abs(float((vectors[0] ** 2).sum()) - 1.0) < 1e-5
+    assert float(abs(vectors[1]).sum()) == 0.0
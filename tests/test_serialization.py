@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import pytest
+
+from geopoliticai import cli, serialization
+from geopoliticai.models import Claim, FactCheckResult, PipelineResult, Source
+from geopoliticai.serialization import JSON, MSGPACK, TEXT, dumps, loads, negotiate
+
+
+def _result() -> PipelineResult:
+    claim = Claim(text="Claim with ünïcode.", source_ids=["S1"])
+    return PipelineResult(
+        query="Test query",
+        infosphere="english",
+        sources=[Source(id="S1", title="One", url="https://example.com/1", notes="n")],
+        claims={"left": [claim], "centrist": [], "right": [], "people": []},
+        fact_checks=[FactCheckResult(claim=claim, verdict="TRUE", rationale="ok")],
+        synthesis="Synthesis.",
+    )
+
+
+@pytest.mark.parametrize("media_type", [JSON, MSGPACK])
+def test_result_round_trips(media_type):
+    # prepare
+    result = _result()
+
+    # execute
+    decoded = loads(dumps(result, media_type, {"trace": {"stages": []}}), media_type)
+
+    # assert
+    assert decoded == result
+    assert decoded.text == result.text
+
+
+def test_loads_rejects_other_schema_version():
+    # prepare
+    data = dumps(_result()).replace(b'"schema_version":1', b'"schema_version":99')
+
+    # execute / assert
+    with pytest.raises(ValueError, match="schema version"):
+        loads(data)
+
+
+def test_text_report_is_rendered_lazily_once():
+    # prepare
+    result = _result()
+
+    # execute
+    dumps(result)
+    rendered_after_dumps = "text" in vars(result)
+    text = result.text
+
+    # assert
+    assert not rendered_after_dumps
+    assert result.text is text
+    assert "Claim with ünïcode." in text
+
+
+@pytest.mark.parametrize(
+    "accept,expected",
+    [
+        (None, JSON),
+        ("*/*", JSON),
+        ("application/x-msgpack", MSGPACK),
+        ("text/plain, application/json;q=0.5", TEXT),
+        ("text/*;q=0.2, application/msgpack;q=0.8", MSGPACK),
+        ("text/plain;q=0, */*", JSON),
+        ("image/png", None),
+    ],
+)
+def test_negotiate(accept, expected):
+    assert negotiate(accept, (JSON, MSGPACK, TEXT)) == expected
+
+
+def test_cli_rejects_msgpack_before_running(monkeypatch, capsys):
+    # prepare
+    monkeypatch.setattr(serialization, "ormsgpack", None)
+    monkeypatch.setattr(serialization, "msgpack", None)
+    monkeypatch.setattr(
+        cli, "require_env", lambda: pytest.fail("checked the environment first")
+    )
+
+    # execute
+    with pytest.raises(SystemExit) as exited:
+        cli.main(["Query", "--format", "msgpack"])
+
+    # assert
+    assert exited.value.code == 2
+    assert "needs ormsgpack or msgpack" in capsys.readouterr().err
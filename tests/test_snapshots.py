@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import replace
+from typing import List
+
+import pytest
+
+from geopoliticai.graph import arun_pipeline, run_pipeline
+from geopoliticai.models import Claim, FactCheckResult
+from geopoliticai.snapshots import (
+    RunSnapshot,
+    SnapshotStore,
+    set_snapshot_store,
+    sources_fingerprint,
+)
+from tests.test_graph import (
+    _all_seed_sources,
+    _make_fake_allm_json,
+    _make_fake_llm_json,
+    _patched_allm,
+    _patched_llm,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite3"))
+    set_snapshot_store(store)
+    yield store
+    set_snapshot_store(None)
+    store.close()
+
+
+def _counting_llm_json(calls: List[str]):
+    fake_llm_json = _make_fake_llm_json("english")
+
+    def llm_json(system: str, user: str, temperature: float = 0.2) -> dict:
+        if "Task: Provide 3-5 analytically cautious claims" in user:
+            calls.append("claims")
+        elif "Task: Fact-check each claim" in user:
+            calls.append("fact_check")
+        return fake_llm_json(system, user, temperature)
+
+    return llm_json
+
+
+def test_unchanged_rerun_skips_claims_and_fact_checks(store):
+    # prepare
+    calls: List[str] = []
+    seed_sources = _all_seed_sources()
+
+    # execute
+    with _patched_llm(_counting_llm_json(calls)):
+        first = run_pipeline("Test query", seed_sources=seed_sources, incremental=True)
+        first_calls = list(calls)
+        calls.clear()
+        second = run_pipeline("Test query", seed_sources=seed_sources, incremental=True)
+
+    # assert
+    assert first_calls.count("claims") == 4
+    assert first_calls.count("fact_check") == 1
+    assert calls == []
+    assert second == first
+
+
+def test_changed_perspective_rebuilds_only_its_claims(store):
+    # prepare
+    calls: List[str] = []
+    seed_sources = _all_seed_sources()
+    with _patched_llm(_counting_llm_json(calls)):
+        run_pipeline("Test query", seed_sources=seed_sources, incremental=True)
+    calls.clear()
+    seed_sources["left"][0] = replace(seed_sources["left"][0], notes="Updated story.")
+    fake_llm_json = _make_fake_llm_json("english")
+    checked: List[str] = []
+
+    def llm_json(system: str, user: str, temperature: float = 0.2) -> dict:
+        if "Task: Provide 3-5 analytically cautious claims" in user:
+            calls.append("claims")
+            if "perspective: leftist" in user:
+                return {"claims": [{"text": "New left claim.", "source_ids": ["S1"]}]}
+        elif "Task: Fact-check each claim" in user:
+            checked.append(user.split("Claims:", 1)[1])
+        return fake_llm_json(system, user, temperature)
+
+    # execute
+    with _patched_llm(llm_json):
+        output = run_pipeline("Test query", seed_sources=seed_sources, incremental=True)
+
+    # assert
+    assert calls == ["claims"]
+    assert len(checked) == 1
+    assert "New left claim." in checked[0]
+    assert "Centrist claim" not in checked[0]
+    assert "New left claim." in output
+    assert output.count("PARTIALLY TRUE") == 4
+    snapshot = store.get("test query", "english")
+    assert snapshot is not None
+    assert snapshot.claims["left"][0].text == "New left claim."
+
+
+def test_reordered_sources_keep_the_fingerprint():
+    # prepare
+    sources = _all_seed_sources()["left"]
+    reordered = [
+        replace(source, notes=f"  {source.notes}\n", url=source.url + "/")
+        for source in reversed(sources)
+    ]
+    changed = [replace(sources[0], notes="Updated story.")] + sources[1:]
+
+    # assert
+    assert len(sources) > 1
+    assert sources_fingerprint(reordered) == sources_fingerprint(sources)
+    assert sources_fingerprint(changed) != sources_fingerprint(sources)
+
+
+def test_reordered_rerun_reuses_claims(store):
+    # prepare
+    calls: List[str] = []
+    seed_sources = _all_seed_sources()
+    with _patched_llm(_counting_llm_json(calls)):
+        run_pipeline("Test query", seed_sources=seed_sources, incremental=True)
+        calls.clear()
+        seed_sources = {key: list(reversed(value)) for key, value in seed_sources.items()}
+
+        # execute
+        run_pipeline("Test query", seed_sources=seed_sources, incremental=True)
+
+    # assert
+    assert calls == []
+
+
+def test_changed_fact_sources_recheck_all_claims(store):
+    # prepare
+    calls: List[str] = []
+    seed_sources = _all_seed_sources()
+    with _patched_llm(_counting_llm_json(calls)):
+        run_pipeline("Test query", seed_sources=seed_sources, incremental=True)
+        calls.clear()
+        seed_sources["fact"].pop()
+
+        # execute
+        run_pipeline("Test query", seed_sources=seed_sources, incremental=True)
+
+    # assert
+    assert calls == ["fact_check"]
+
+
+def test_async_incremental_rerun_reuses_snapshot(store):
+    # prepare
+    seed_sources = _all_seed_sources()
+    calls: List[str] = []
+    fake_allm_json = _make_fake_allm_json("english")
+
+    async def allm_json(system: str, user: str, temperature: float = 0.2) -> dict:
+        calls.append(user)
+        return await fake_allm_json(system, user, temperature)
+
+    # execute
+    with _patched_allm(allm_json):
+        first = asyncio.run(
+            arun_pipeline("Test query", seed_sources=seed_sources, incremental=True)
+        )
+        calls.clear()
+        second = asyncio.run(
+            arun_pipeline("Test query", seed_sources=seed_sources, incremental=True)
+        )
+
+    # assert
+    assert second == first
+    assert len(calls) == 1  # only the synthesis runs again
+
+
+def test_snapshot_round_trips_through_json():
+    # prepare
+    sources = _all_seed_sources()
+    claim = Claim(text="A claim.", source_ids=["S1"])
+    snapshot = RunSnapshot(
+        query="q",
+        infosphere="english",
+        fingerprints={"left": sources_fingerprint(sources["left"])},
+        claims={"left": [claim]},
+        fact_checks=[FactCheckResult(claim=claim, verdict="TRUE", rationale="ok")],
+    )
+
+    # execute
+    restored = RunSnapshot.from_json(snapshot.to_json())
+
+    # assert
+    assert restored == snapshot
+    assert restored.reusable_claims("left", sources["left"]) == [claim]
+    assert restored.reusable_claims("left", sources["right"]) is None
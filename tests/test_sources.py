@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from typing import List
+from unittest.mock import patch
+
+from geopoliticai.fact_check import fact_checker
+from geopoliticai.models import Claim, Source
+from geopoliticai.render import merge_sources
+from geopoliticai.search import _parse_results
+from geopoliticai.sources import (
+    SourceRegistry,
+    canonical_url,
+    source_id,
+)
+from tests.test_graph import _make_fake_llm_json
+
+
+def _source(url: str, title: str = "Title") -> Source:
+    return Source(id=source_id(url), title=title, url=url, notes=f"Notes for {title}.")
+
+
+def test_canonical_url_ignores_scheme_www_tracking_and_slash():
+    assert canonical_url("http://www.Example.com/a/?utm_source=x&b=2&a=1#top") == (
+        canonical_url("https://example.com/a?a=1&b=2")
+    )
+    assert canonical_url("https://example.com/a") != canonical_url("https://example.com/b")
+
+
+def test_search_results_get_ids_shared_across_perspectives():
+    # prepare
+    response = {
+        "results": [
+            {"title": "Story", "url": "https://www.example.com/story/", "content": "x"},
+            {"title": "Other", "url": "https://example.com/other", "content": "y"},
+        ]
+    }
+    repeated = {
+        "results": [{"title": "Story", "url": "http://example.com/story", "content": "x"}]
+    }
+
+    # execute
+    left = _parse_results("left", response)
+    right = _parse_results("right", repeated)
+
+    # assert
+    assert left[0].id == right[0].id == source_id("https://example.com/story")
+    assert left[0].id != left[1].id
+
+
+def test_source_ids_do_not_collide_across_many_urls():
+    # execute
+    ids = {source_id(f"https://example.com/story/{i}") for i in range(20000)}
+
+    # assert
+    assert len(ids) == 20000
+    assert all(len(sid) == 11 for sid in ids)
+
+
+def test_registry_indexes_by_id_and_canonical_url():
+    # prepare
+    first = _source("https://example.com/a", "First")
+    repeat = _source("https://www.example.com/a/", "Repeat")
+    other = _source("https://example.com/b", "Other")
+
+    # execute
+    registry = SourceRegistry([first, repeat, other])
+
+    # assert
+    assert registry.sources() == [first, other]
+    assert registry.get(first.id) is first
+    assert registry.find("http://example.com/a?utm_medium=x") is first
+    assert registry.resolve([other.id, "S-missing", other.id, first.id]) == [other, first]
+    assert first.id in registry and len(registry) == 2
+
+
+def test_merge_sources_keeps_perspective_order_and_dedupes():
+    # prepare
+    shared = _source("https://example.com/shared", "Shared")
+    state = {
+        "left_sources": [_source("https://example.com/l", "Left"), shared],
+        "centrist_sources": [],
+        "right_sources": [shared, _source("https://example.com/r", "Right")],
+        "people_sources": [],
+        "fact_sources": [_source("https://example.com/f", "Fact")],
+    }
+
+    # execute
+    merged = merge_sources(state)
+
+    # assert
+    assert [s.title for s in merged] == ["Left", "Shared", "Right", "Fact"]
+
+
+def test_fact_check_prompt_includes_cited_perspective_sources():
+    # prepare
+    cited = _source("https://example.com/cited", "Cited report")
+    uncited = _source("https://example.com/uncited", "Uncited report")
+    fact = _source("https://example.com/fact", "Fact source")
+    state = {
+        "query": "Test query",
+        "left_sources": [cited, uncited],
+        "left_claims": [Claim(text="A left claim.", source_ids=[cited.id])],
+        "centrist_claims": [],
+        "right_claims": [],
+        "people_claims": [],
+        "fact_sources": [fact],
+    }
+    prompts: List[str] = []
+    fake = _make_fake_llm_json("english")
+
+    def llm_json(system: str, user: str, temperature: float = 0.2) -> dict:
+        prompts.append(user)
+        return fake(system, user, temperature)
+
+    # execute
+    with patch("geopoliticai.fact_check.llm_json", llm_json):
+        result = fact_checker(state)
+
+    # assert
+    assert f"{fact.id}: Fact source" in prompts[0]
+    assert f"{cited.id}: Cited report" in prompts[0]
+    assert "Uncited report" not in prompts[0]
+    assert set(result) == {"all_claims", "source_registry", "fact_checks"}
+